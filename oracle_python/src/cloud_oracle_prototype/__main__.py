@@ -1,12 +1,16 @@
 import argparse
 
+from cloud_oracle_prototype.util import enable_compile_cache
+
 
 def main():
     parser = argparse.ArgumentParser(prog="cloud_oracle_prototype", description="Prototype of a cloud oracle")
     parser.add_argument("--output-dir", required=True, help="Base output directory")
     parser.add_argument("--verbose", type=int, default=1, help="Verbosity level")
-    parser.add_argument("--all", action="store_true", help="Run all experiments. Alternatively use: --minimization --simulation --drift")
+    parser.add_argument("--all", action="store_true", help="Run all experiments. Alternatively use: --minimization --simulation --drift --precomputation --daemon")
     parser.add_argument("--dry-run", action="store_true", help="Do not run experiments, only print them")
+    parser.add_argument("--compile-cache-dir", help="Base directory of the on-disk cache of compiled kernels, defaults to ~/.cache/cloud_oracle_prototype/inductor")
+    parser.add_argument("--no-compile-cache", action="store_true", help="Do not cache compiled kernels on disk")
     
     args_use_case_1 = parser.add_argument_group("Use case: Minimization", "Configure and run minimization experiments, i.e., minimizing access latency under different numbers of data centers and client data centers.")
     args_use_case_1.add_argument("--minimization", action="store_true", help="Run minimization experiments")
@@ -14,6 +18,14 @@ def main():
     args_use_case_1.add_argument("--do-ilp", action="store_true", help="Run experiments with the ILP")
     args_use_case_1.add_argument("--do-data-center-scaling", action="store_true", help="Run experiments with different numbers of data centers")
     args_use_case_1.add_argument("--do-client-data-center-scaling", action="store_true", help="Run experiments with different numbers of client data centers")
+    args_use_case_1.add_argument("--do-batch-scaling", action="store_true", help="Run experiments with large batches of workloads using the tiled oracle query")
+    args_use_case_1.add_argument("--do-micro-batching", action="store_true", help="Run experiments with micro-batched single-workload requests")
+    args_use_case_1.add_argument("--do-caching", action="store_true", help="Run experiments with cached results of repeated workloads")
+    args_use_case_1.add_argument("--do-sharding", action="store_true", help="Run experiments with the planes sharded across worker processes")
+    args_use_case_1.add_argument("--do-distribution", action="store_true", help="Run experiments with the planes sharded across nodes, which are launched as local processes")
+    args_use_case_1.add_argument("--do-precision", action="store_true", help="Run experiments with float16, bfloat16, float32 and quantized int8 planes")
+    args_use_case_1.add_argument("--do-compile-start", action="store_true", help="Run experiments with cold and warm compilation with and without shape bucketing")
+    args_use_case_1.add_argument("--do-backends", action="store_true", help="Run experiments with the compiled, eager and NumPy backends")
 
     args_simulation = parser.add_argument_group("Use case: Simulation", "Configure and run simulation experiments, i.e., simulating the improvement in access latency with increasing number of samples.")
     args_simulation.add_argument("--simulation", action="store_true", help="Run simulation experiments")
@@ -21,14 +33,23 @@ def main():
     args_drift = parser.add_argument_group("Use case: Drift", "Configure and run drift experiments, i.e., minimizing access latency for drifting paramters under different numbers of data centers and client data centers.")
     args_drift.add_argument("--drift", action="store_true", help="Run drift experiments")
 
+    args_precomputation = parser.add_argument_group("Precomputation", "Configure and run precomputation experiments, i.e., precomputing the oracle with the vectorized Python engine for comparison with the Rust implementation.")
+    args_precomputation.add_argument("--precomputation", action="store_true", help="Run precomputation experiments")
+
+    args_daemon = parser.add_argument_group("Daemon", "Configure and run daemon experiments, i.e., comparing queries served by the oracle daemon with in-process queries.")
+    args_daemon.add_argument("--daemon", action="store_true", help="Run daemon experiments")
+
     args = parser.parse_args()
 
     base_output_dir = args.output_dir
 
+    if not args.no_compile_cache:
+        enable_compile_cache(args.compile_cache_dir)
+
     experiments = []
     if args.all or args.minimization:
         from cloud_oracle_prototype.experiments.use_case_minimization import use_case_minimization
-        experiments.extend(use_case_minimization.generate_experiments(output_dir=base_output_dir, do_ilp=args.do_ilp or args.all, do_oracle=args.do_oracle or args.all, do_data_center_scaling=args.do_data_center_scaling or args.all, do_client_data_center_scaling=args.do_client_data_center_scaling or args.all, verbose=args.verbose))
+        experiments.extend(use_case_minimization.generate_experiments(output_dir=base_output_dir, do_ilp=args.do_ilp or args.all, do_oracle=args.do_oracle or args.all, do_data_center_scaling=args.do_data_center_scaling or args.all, do_client_data_center_scaling=args.do_client_data_center_scaling or args.all, do_batch_scaling=args.do_batch_scaling or args.all, do_micro_batching=args.do_micro_batching or args.all, do_caching=args.do_caching or args.all, do_sharding=args.do_sharding or args.all, do_distribution=args.do_distribution or args.all, do_precision=args.do_precision or args.all, do_compile_start=args.do_compile_start or args.all, do_backends=args.do_backends or args.all, verbose=args.verbose))
 
     if args.all or args.simulation:
         from cloud_oracle_prototype.experiments.use_case_simulation import use_case_simulation
@@ -38,6 +59,14 @@ def main():
         from cloud_oracle_prototype.experiments.use_case_drift import use_case_drift
         experiments.extend(use_case_drift.generate_experiments(output_dir=base_output_dir, verbose=args.verbose))
 
+    if args.all or args.precomputation:
+        from cloud_oracle_prototype.experiments.use_case_precomputation import use_case_precomputation
+        experiments.extend(use_case_precomputation.generate_experiments(output_dir=base_output_dir, verbose=args.verbose))
+
+    if args.all or args.daemon:
+        from cloud_oracle_prototype.experiments.use_case_daemon import use_case_daemon
+        experiments.extend(use_case_daemon.generate_experiments(output_dir=base_output_dir, verbose=args.verbose))
+
     print(f"Running {len(experiments)} experiments")
     if args.verbose > 1 or args.dry_run:
         for experiment in experiments:
@@ -0,0 +1,138 @@
+import asyncio
+import collections
+import time
+import torch
+
+from cloud_oracle_prototype.queries.minimization_query import init_query, minimization_query
+
+class MinimizationBatcher:
+    """
+    Asyncio front end that collects single-workload minimization requests into batches.
+
+    A batch is executed once it holds max_batch_size requests or the first request of the batch waited max_wait_s.
+    Larger batches and longer waits increase the throughput at the cost of tail latency.
+    Batches are padded to max_batch_size with zero workloads, s.t., the compiled query is traced only once.
+    """
+
+    def __init__(self, *, planes: torch.Tensor, max_batch_size: int, max_wait_s: float, device: torch.device, dtype: torch.dtype, tile_size: int = None, max_latencies: int = 10**5):
+        self.planes = planes
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_s
+        self.tile_size = tile_size
+
+        (self.outputs, self.outputs_index, self.inputs) = init_query(planes=planes, batch_size=max_batch_size, num_functions=planes.shape[0], num_params=planes.shape[1], device=device, dtype=dtype)
+
+        self.queue = None
+        self.task = None
+
+        # Statistics
+        self.latencies = collections.deque(maxlen=max_latencies)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Resets the statistics, e.g., after the warmup.
+        """
+        self.latencies.clear()
+        self.num_requests = 0
+        self.num_batches = 0
+        self.first_enqueue_time = None
+        self.last_completion_time = None
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        await self.queue.put(None)
+        await self.task
+        self.task = None
+
+    async def minimize(self, workload: torch.Tensor) -> (int, float):
+        """
+        Submits a single workload and waits for its batch to be executed.
+
+        Args:
+            workload (torch.Tensor): The workload, shape (num_params,).
+
+        Returns:
+            (index, cost): The index of the minimal decision and its cost.
+        """
+        if workload.shape != (self.planes.shape[1],):
+            raise ValueError(f"Workload has shape {tuple(workload.shape)} but should have shape {(self.planes.shape[1],)}")
+
+        enqueue_time = time.perf_counter()
+        if self.first_enqueue_time is None:
+            self.first_enqueue_time = enqueue_time
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((workload, future, enqueue_time))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            request = await self.queue.get()
+            if request is None:
+                break
+
+            # Collect requests until the batch is full or the first request waited too long
+            batch = [request]
+            deadline = loop.time() + self.max_wait_s
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    request = self.queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self.queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+
+            # Execute the query off the event loop, s.t., new requests are queued meanwhile
+            workloads = [workload for (workload, _, _) in batch]
+            try:
+                (indexes, costs) = await loop.run_in_executor(None, self._execute, workloads)
+            except Exception as error:
+                # Fail the requests of this batch and keep serving the following batches. Every request gets its own exception
+                # without the traceback of this coroutine, since callers that clear the frames of the traceback would close it
+                for (_, future, _) in batch:
+                    if not future.cancelled():
+                        future.set_exception(RuntimeError(f"Batch failed: {error!r}"))
+                continue
+
+            end_time = time.perf_counter()
+            for (i, (_, future, enqueue_time)) in enumerate(batch):
+                self.latencies.append(end_time - enqueue_time)
+                if not future.cancelled():
+                    future.set_result((indexes[i], costs[i]))
+
+            self.num_requests += len(batch)
+            self.num_batches += 1
+            self.last_completion_time = end_time
+
+    def _execute(self, workloads):
+        batch_size = len(workloads)
+        self.inputs[:batch_size] = torch.stack(workloads).to(self.inputs.device, self.inputs.dtype)
+        self.inputs[batch_size:].zero_()
+
+        minimization_query(planes=self.planes, inputs=self.inputs, outputs=self.outputs, outputs_index=self.outputs_index, tile_size=self.tile_size)
+
+        return (self.outputs_index[:batch_size, 0].tolist(), self.outputs[:batch_size, 0].tolist())
+
+    def get_stats(self) -> dict:
+        """
+        Returns the number of requests and batches, the mean batch size, the throughput in requests per second,
+        and the median and 99th percentile latency in seconds since the last reset of the statistics.
+        The throughput is measured from the first request to the last executed batch, i.e., without idle time before and after.
+        """
+        stats = {"num_requests": self.num_requests, "num_batches": self.num_batches}
+        if self.num_batches > 0:
+            latencies = torch.tensor(list(self.latencies), dtype=torch.float64)
+            stats["mean_batch_size"] = self.num_requests / self.num_batches
+            stats["throughput"] = self.num_requests / (self.last_completion_time - self.first_enqueue_time)
+            stats["latency_p50"] = latencies.quantile(0.5).item()
+            stats["latency_p99"] = latencies.quantile(0.99).item()
+        return stats
@@ -0,0 +1,24 @@
+import torch
+
+# Batch sizes the queries are compiled for when bucketing, larger batches are padded to the next power of two
+BATCH_BUCKETS = (1, 8, 64, 512, 4096)
+
+def bucket_size(size: int, buckets=None) -> int:
+    """
+    Returns the smallest bucket that holds size, or the next power of two if there are no buckets or size exceeds all buckets.
+    """
+    if buckets is not None:
+        for bucket in sorted(buckets):
+            if bucket >= size:
+                return bucket
+    return 1 << max(0, size - 1).bit_length()
+
+def pad_planes(planes: torch.Tensor, *, size: int) -> torch.Tensor:
+    """
+    Pads the planes with decisions of the maximum finite cost to the given number of decisions, s.t., they are never minimal
+    for nonnegative workloads with a nonzero cost and the padding does not change the minimal decisions.
+    """
+    if planes.shape[0] >= size:
+        return planes
+    padding = torch.full((size - planes.shape[0], planes.shape[1]), torch.finfo(planes.dtype).max, device=planes.device, dtype=planes.dtype)
+    return torch.cat([planes, padding])
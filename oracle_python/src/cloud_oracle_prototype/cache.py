@@ -0,0 +1,110 @@
+import collections
+import torch
+
+from cloud_oracle_prototype.queries.minimization_query import minimization_query
+
+class MinimizationCache:
+    """
+    Bounded LRU cache of minimization results in front of `minimization_query`.
+
+    Results are keyed by the workload vector or, if a quantization step is set, by the workload vector rounded
+    to multiples of the step. With quantization, workloads of the same bucket share the result of the first
+    workload of the bucket. The cache is invalidated if the planes are replaced, or if their owner passes a new version
+    of the planes, e.g., a counter incremented on every in-place modification. Otherwise, in-place modifications require `invalidate`.
+    """
+
+    def __init__(self, *, max_size: int, quantization: float = None, tile_size: int = None):
+        self.max_size = max_size
+        self.quantization = quantization
+        self.tile_size = tile_size
+
+        self.entries = collections.OrderedDict()
+        self.planes = None
+        self.planes_version = None
+
+        self.hits = 0
+        self.misses = 0
+
+        # Buffers for computing the misses, allocated per batch size
+        self.buffers = {}
+
+    def invalidate(self):
+        """
+        Discards all cached results, e.g., after the planes were modified in place.
+        """
+        self.entries.clear()
+
+    def _keys(self, inputs: torch.Tensor):
+        if self.quantization is not None:
+            inputs = torch.round(inputs.float() / self.quantization).to(torch.int64)
+        elif inputs.dtype == torch.bfloat16:
+            # Exact conversion to a data type supported by numpy
+            inputs = inputs.float()
+        inputs = inputs.cpu().contiguous()
+        return [inputs[i].numpy().tobytes() for i in range(inputs.shape[0])]
+
+    def query(self, *, planes: torch.Tensor, inputs: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor, planes_version: int = None):
+        """
+        Computes the minimum cost and the index of the minimal decision for each workload in the batch,
+        like `minimization_query`, but only for the workloads that are not cached.
+
+        Args:
+            planes_version: The version of the planes as maintained by their owner, which invalidates the cache when it changes.
+
+        Returns:
+            (outputs, outputs_index): The minimum costs and the indexes of the minimal decisions.
+        """
+
+        # Invalidate if the planes were replaced or their owner changed their version
+        if planes is not self.planes or planes_version != self.planes_version:
+            self.invalidate()
+            self.planes = planes
+            self.planes_version = planes_version
+
+        keys = self._keys(inputs)
+        misses = []
+        for (i, key) in enumerate(keys):
+            entry = self.entries.get(key)
+            if entry is None:
+                misses.append(i)
+            else:
+                self.entries.move_to_end(key)
+                outputs[i, 0] = entry[0]
+                outputs_index[i, 0] = entry[1]
+
+        self.hits += len(keys) - len(misses)
+        self.misses += len(misses)
+
+        if misses:
+            # Compute the misses in one batch, padded to the batch size to reuse the compiled query
+            batch_size = inputs.shape[0]
+            if batch_size not in self.buffers:
+                self.buffers[batch_size] = (torch.empty_like(outputs), torch.empty_like(outputs_index), torch.zeros_like(inputs))
+            (miss_outputs, miss_outputs_index, miss_inputs) = self.buffers[batch_size]
+
+            miss_rows = torch.tensor(misses, device=inputs.device)
+            miss_inputs[:len(misses)] = inputs[miss_rows]
+            miss_inputs[len(misses):].zero_()
+            minimization_query(planes=planes, inputs=miss_inputs, outputs=miss_outputs, outputs_index=miss_outputs_index, tile_size=self.tile_size)
+
+            outputs[miss_rows] = miss_outputs[:len(misses)]
+            outputs_index[miss_rows] = miss_outputs_index[:len(misses)]
+
+            miss_values = miss_outputs[:len(misses), 0].tolist()
+            miss_indexes = miss_outputs_index[:len(misses), 0].tolist()
+            for (j, i) in enumerate(misses):
+                self.entries[keys[i]] = (miss_values[j], miss_indexes[j])
+                self.entries.move_to_end(keys[i])
+
+            # Evict the least recently used entries
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+        return (outputs, outputs_index)
+
+    def get_stats(self) -> dict:
+        """
+        Returns the number of cached entries, hits, misses, and the hit ratio.
+        """
+        total = self.hits + self.misses
+        return {"cache_entries": len(self.entries), "cache_hits": self.hits, "cache_misses": self.misses, "cache_hit_ratio": self.hits / total if total > 0 else 0.0}
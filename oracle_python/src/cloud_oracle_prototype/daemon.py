@@ -0,0 +1,320 @@
+import argparse
+import os
+import socket
+import socketserver
+import threading
+import time
+import torch
+
+from cloud_oracle_prototype import protocol
+from cloud_oracle_prototype.oracle_file import load_oracle
+from cloud_oracle_prototype.queries import minimization_query, simulation_query
+from cloud_oracle_prototype.queries.directed_drift_query import directed_drift_query
+from cloud_oracle_prototype.queries.conservative_drift_query import conservative_drift_query
+from cloud_oracle_prototype.util import enable_compile_cache, load_device, use_compile_cache
+
+class OracleDaemon:
+    """
+    Long-lived query server that keeps the planes of an oracle and the compiled query kernels resident.
+
+    The daemon serves the minimization, simulation and drift queries via the binary protocol of `protocol`
+    over a Unix socket or TCP. Queries are executed one at a time, since they share preallocated buffers and
+    the drift queries temporarily modify the planes.
+    """
+
+    def __init__(self, *, planes: torch.Tensor, planes_other: torch.Tensor = None, device: torch.device, dtype: torch.dtype, batch_sizes=(1,), verbose: int = 0):
+        self.planes = planes.to(device=device, dtype=dtype)
+        self.planes_other = planes_other.to(device=device, dtype=dtype) if planes_other is not None else None
+        self.device = device
+        self.dtype = dtype
+        self.batch_sizes = batch_sizes
+        self.verbose = verbose
+
+        self.lock = threading.Lock()
+        self.latencies_ns = {opcode: [] for opcode in [protocol.OP_MINIMIZE, protocol.OP_SIMULATE, protocol.OP_DIRECTED_DRIFT, protocol.OP_CONSERVATIVE_DRIFT, protocol.OP_PARTIAL_SIMULATE]}
+
+        # Query state per batch size
+        self.minimization_states = {}
+        self.simulation_states = {}
+        self.partial_simulation_states = {}
+
+        self.server = None
+
+    def warmup(self):
+        """
+        Traces and compiles the query kernels for the configured batch sizes before serving the first request.
+        """
+        num_params = self.planes.shape[1]
+        for batch_size in self.batch_sizes:
+            workloads = torch.ones((batch_size, num_params), dtype=torch.float32)
+            self.handle(protocol.OP_MINIMIZE, workloads)
+            if self.planes_other is not None:
+                self.handle(protocol.OP_SIMULATE, workloads)
+                self.handle(protocol.OP_PARTIAL_SIMULATE, workloads)
+
+        self.handle(protocol.OP_DIRECTED_DRIFT, torch.ones((2, num_params), dtype=torch.float32))
+        self.handle(protocol.OP_CONSERVATIVE_DRIFT, torch.ones((1, num_params), dtype=torch.float32))
+
+        # Do not report the latencies of the warmup
+        for latencies in self.latencies_ns.values():
+            latencies.clear()
+
+    def handle(self, opcode: int, values: torch.Tensor) -> (int, int, bytes):
+        """
+        Executes a request.
+
+        Args:
+            opcode (int): The operation of the request.
+            values (torch.Tensor): The float32 values of the request, shape (rows, num_params).
+
+        Returns:
+            (status, latency_ns, payload): The status, the latency of the query, and the payload of the response.
+        """
+        try:
+            assert values.shape[1] == self.planes.shape[1], f"Request has {values.shape[1]} parameters but the oracle has {self.planes.shape[1]}"
+
+            with self.lock:
+                start_time = time.perf_counter_ns()
+
+                if opcode == protocol.OP_MINIMIZE:
+                    payload = self._minimize(values)
+                elif opcode == protocol.OP_SIMULATE:
+                    payload = self._simulate(values)
+                elif opcode == protocol.OP_DIRECTED_DRIFT:
+                    payload = self._directed_drift(values)
+                elif opcode == protocol.OP_CONSERVATIVE_DRIFT:
+                    payload = self._conservative_drift(values)
+                elif opcode == protocol.OP_PARTIAL_SIMULATE:
+                    payload = self._partial_simulate(values)
+                else:
+                    raise ValueError(f"Unknown operation {opcode}")
+
+                latency_ns = time.perf_counter_ns() - start_time
+                self.latencies_ns[opcode].append(latency_ns)
+
+            if self.verbose > 1:
+                print(f"Operation {opcode} with {values.shape[0]} rows took {latency_ns / 1e6:.3f} ms")
+
+            return (protocol.STATUS_OK, latency_ns, payload)
+        except Exception as e:
+            return (protocol.STATUS_ERROR, 0, str(e).encode("utf-8"))
+
+    def _minimize(self, values: torch.Tensor) -> bytes:
+        batch_size = values.shape[0]
+        if batch_size not in self.minimization_states:
+            self.minimization_states[batch_size] = minimization_query.init_query(planes=self.planes, batch_size=batch_size, num_functions=self.planes.shape[0], num_params=self.planes.shape[1], device=self.device, dtype=self.dtype)
+        (outputs, outputs_index, inputs) = self.minimization_states[batch_size]
+
+        inputs.copy_(values)
+        minimization_query.minimization_query(planes=self.planes, inputs=inputs, outputs=outputs, outputs_index=outputs_index)
+
+        # Indexes first to keep the int64 values aligned
+        return protocol.encode_tensor(outputs_index, dtype=torch.int64) + protocol.encode_tensor(outputs)
+
+    def _simulate(self, values: torch.Tensor) -> bytes:
+        assert self.planes_other is not None, "Simulation requires the other planes"
+
+        batch_size = values.shape[0]
+        if batch_size not in self.simulation_states:
+            self.simulation_states[batch_size] = simulation_query.init_query(planes=self.planes, planes_other=self.planes_other, batch_size=batch_size, num_params=self.planes.shape[1] - 1, device=self.device, dtype=self.dtype)
+        (outputs, inputs) = self.simulation_states[batch_size]
+
+        inputs.copy_(values)
+        percentiles = simulation_query.simulation_query(planes=self.planes, planes_other=self.planes_other, inputs=inputs, outputs=outputs)
+
+        return protocol.encode_tensor(torch.tensor(percentiles))
+
+    def _partial_simulate(self, values: torch.Tensor) -> bytes:
+        assert self.planes_other is not None, "Simulation requires the other planes"
+
+        batch_size = values.shape[0]
+        if batch_size not in self.partial_simulation_states:
+            state = minimization_query.init_query(planes=self.planes, batch_size=batch_size, num_functions=self.planes.shape[0], num_params=self.planes.shape[1], device=self.device, dtype=self.dtype)
+            state_other = minimization_query.init_query(planes=self.planes_other, batch_size=batch_size, num_functions=self.planes_other.shape[0], num_params=self.planes_other.shape[1], device=self.device, dtype=self.dtype)
+            self.partial_simulation_states[batch_size] = (state, state_other)
+        ((outputs, outputs_index, inputs), (outputs_other, outputs_index_other, _)) = self.partial_simulation_states[batch_size]
+
+        inputs.copy_(values)
+        minimization_query.minimization_query(planes=self.planes, inputs=inputs, outputs=outputs, outputs_index=outputs_index)
+        minimization_query.minimization_query(planes=self.planes_other, inputs=inputs, outputs=outputs_other, outputs_index=outputs_index_other)
+
+        return protocol.encode_tensor(outputs) + protocol.encode_tensor(outputs_other)
+
+    def _directed_drift(self, values: torch.Tensor) -> bytes:
+        assert values.shape[0] == 2, "Directed drift requires the current parameter and the drift"
+
+        current_parameter = values[0].to(device=self.device, dtype=self.dtype)
+        drift = values[1].to(device=self.device, dtype=self.dtype)
+        distance, next_index = directed_drift_query(current_parameter=current_parameter, drift=drift, planes=self.planes)
+
+        return protocol.encode_tensor(next_index.view(1), dtype=torch.int64) + protocol.encode_tensor(distance.view(1))
+
+    def _conservative_drift(self, values: torch.Tensor) -> bytes:
+        assert values.shape[0] == 1, "Conservative drift requires the current parameter"
+
+        current_parameter = values[0].to(device=self.device, dtype=self.dtype)
+        distance, next_index = conservative_drift_query(current_parameter=current_parameter, planes=self.planes)
+
+        return protocol.encode_tensor(next_index.view(1), dtype=torch.int64) + protocol.encode_tensor(distance.view(1))
+
+    def serve(self, address):
+        """
+        Serves requests until `shutdown` is called.
+
+        Args:
+            address: The path of a Unix socket, or a (host, port) tuple for TCP.
+        """
+        daemon = self
+
+        class RequestHandler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    request = protocol.recv_request(self.request)
+                    if request is None:
+                        return
+                    (opcode, values) = request
+                    (status, latency_ns, payload) = daemon.handle(opcode, values)
+                    protocol.send_response(self.request, status=status, latency_ns=latency_ns, payload=payload)
+
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.unlink(address)
+            self.server = socketserver.ThreadingUnixStreamServer(address, RequestHandler)
+        else:
+            socketserver.ThreadingTCPServer.allow_reuse_address = True
+            self.server = socketserver.ThreadingTCPServer(address, RequestHandler)
+        self.server.daemon_threads = True
+
+        if self.verbose > 0:
+            print(f"Serving oracle with {self.planes.shape[0]} decisions and {self.planes.shape[1]} parameters on {address}")
+
+        self.server.serve_forever()
+
+    def shutdown(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def get_latency_stats(self) -> dict:
+        """
+        Returns the number of requests and the mean and 99th percentile latency in seconds per operation.
+        """
+        stats = {}
+        for opcode, latencies in self.latencies_ns.items():
+            if latencies:
+                latencies_s = torch.tensor(latencies, dtype=torch.float64) / 1e9
+                stats[opcode] = {"count": len(latencies), "mean": latencies_s.mean().item(), "p99": latencies_s.quantile(0.99).item()}
+        return stats
+
+class OracleClient:
+    """
+    Client of the oracle daemon. Every call returns the results, the latency of the query in the daemon,
+    and the round-trip latency in seconds.
+    """
+
+    def __init__(self, address):
+        if isinstance(address, str):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.connect(address)
+
+    def close(self):
+        self.sock.close()
+
+    def _request(self, *, opcode: int, values: torch.Tensor):
+        start_time = time.perf_counter()
+        protocol.send_request(self.sock, opcode=opcode, values=values)
+        (payload, latency_ns) = protocol.recv_response(self.sock)
+        round_trip_latency = time.perf_counter() - start_time
+        return (payload, latency_ns / 1e9, round_trip_latency)
+
+    def minimize(self, inputs: torch.Tensor):
+        """
+        Returns:
+            (outputs, outputs_index, latency, round_trip_latency): The minimum costs and indexes of the minimal decisions, shape (batch_size, 1).
+        """
+        batch_size = inputs.shape[0]
+        (payload, latency, round_trip_latency) = self._request(opcode=protocol.OP_MINIMIZE, values=inputs)
+        outputs_index = protocol.decode_tensor(payload, dtype=torch.int64, shape=(batch_size, 1), count=batch_size)
+        outputs = protocol.decode_tensor(payload, shape=(batch_size, 1), offset=batch_size * 8)
+        return (outputs, outputs_index, latency, round_trip_latency)
+
+    def simulate(self, inputs: torch.Tensor):
+        """
+        Returns:
+            (percentiles, latency, round_trip_latency): The 2.5, 50, and 97.5 percentiles of the savings.
+        """
+        (payload, latency, round_trip_latency) = self._request(opcode=protocol.OP_SIMULATE, values=inputs)
+        return (protocol.decode_tensor(payload).tolist(), latency, round_trip_latency)
+
+    def directed_drift(self, *, current_parameter: torch.Tensor, drift: torch.Tensor):
+        """
+        Returns:
+            (distance, next_index, latency, round_trip_latency): The distance to and index of the next optimal decision.
+        """
+        values = torch.stack([current_parameter.float().cpu(), drift.float().cpu()])
+        (payload, latency, round_trip_latency) = self._request(opcode=protocol.OP_DIRECTED_DRIFT, values=values)
+        return self._decode_drift(payload) + (latency, round_trip_latency)
+
+    def conservative_drift(self, *, current_parameter: torch.Tensor):
+        """
+        Returns:
+            (distance, next_index, latency, round_trip_latency): The distance to and index of the next optimal decision.
+        """
+        values = current_parameter.float().cpu().view(1, -1)
+        (payload, latency, round_trip_latency) = self._request(opcode=protocol.OP_CONSERVATIVE_DRIFT, values=values)
+        return self._decode_drift(payload) + (latency, round_trip_latency)
+
+    def _decode_drift(self, payload):
+        next_index = protocol.decode_tensor(payload, dtype=torch.int64, count=1).item()
+        distance = protocol.decode_tensor(payload, offset=8, count=1).item()
+        return (distance, next_index)
+
+def main():
+    parser = argparse.ArgumentParser(prog="cloud_oracle_prototype.daemon", description="Long-lived query server of a cloud oracle")
+    parser.add_argument("--oracle", required=True, help="Oracle file with the planes")
+    parser.add_argument("--oracle-other", help="Oracle file with the other planes for simulation queries")
+    parser.add_argument("--socket", help="Path of the Unix socket to serve on")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to serve on via TCP")
+    parser.add_argument("--port", type=int, help="Port to serve on via TCP")
+    parser.add_argument("--device", default="cpu", help="Device of the oracle")
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads(), help="Number of threads")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1], help="Batch sizes to compile the queries for at startup")
+    parser.add_argument("--compile-cache-dir", help="Base directory of the on-disk cache of compiled kernels, defaults to ~/.cache/cloud_oracle_prototype/inductor")
+    parser.add_argument("--verbose", type=int, default=1, help="Verbosity level")
+    args = parser.parse_args()
+
+    if (args.socket is None) == (args.port is None):
+        parser.error("Specify either --socket or --port")
+
+    device = load_device(args.device)
+    torch.set_num_threads(args.threads)
+
+    # Restarts reuse the kernels compiled by previous runs
+    enable_compile_cache(args.compile_cache_dir)
+    use_compile_cache(device.type)
+
+    planes, _, _ = load_oracle(args.oracle, device=device)
+    planes_other = load_oracle(args.oracle_other, device=device)[0] if args.oracle_other else None
+
+    daemon = OracleDaemon(planes=planes, planes_other=planes_other, device=device, dtype=planes.dtype, batch_sizes=args.batch_sizes, verbose=args.verbose)
+
+    start_time = time.perf_counter()
+    daemon.warmup()
+    if args.verbose > 0:
+        print(f"Warmup took {time.perf_counter() - start_time:.3f} s")
+
+    address = args.socket if args.socket is not None else (args.host, args.port)
+    try:
+        daemon.serve(address)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.verbose > 0:
+            print(daemon.get_latency_stats())
+
+if __name__ == "__main__":
+    main()
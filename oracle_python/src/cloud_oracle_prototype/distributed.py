@@ -0,0 +1,207 @@
+import argparse
+import socket
+import subprocess
+import sys
+import time
+import torch
+
+from cloud_oracle_prototype import protocol
+from cloud_oracle_prototype.daemon import OracleDaemon
+from cloud_oracle_prototype.oracle_file import load_oracle_header, load_oracle_rows
+from cloud_oracle_prototype.queries.simulation_query import compute_percentiles
+from cloud_oracle_prototype.sharding import shard_offsets
+from cloud_oracle_prototype.util import load_device
+
+def load_oracle_shard(filename: str, *, rank: int, num_shards: int):
+    """
+    Loads the row-wise shard of an oracle file by memory-mapping only the part of the file with the shard.
+
+    Returns:
+        (planes, offset): The planes of the shard and the index of its first decision in the oracle.
+    """
+    offsets = shard_offsets(load_oracle_header(filename)["num_functions"], num_shards)
+    planes, _ = load_oracle_rows(filename, start=offsets[rank], stop=offsets[rank + 1])
+    return (planes, offsets[rank])
+
+class DistributedOracle:
+    """
+    Coordinator of an oracle whose decisions are sharded across nodes, where every node serves its shard with an `OracleDaemon` via TCP.
+
+    Every batch is sent to all nodes before waiting for the first response, s.t., the shards are queried concurrently.
+    The coordinator merges the partial minima of the shards, and offers the same queries as `ShardedOracle`.
+
+    The coordinator does not distribute the oracle itself. Every node reads its shard from an oracle file at the same path,
+    e.g., on a shared file system or a copy per node, and maps only the part of the file with its shard.
+    """
+
+    def __init__(self, *, addresses, offsets, processes=None, connect_timeout_s: float = 600.0):
+        """
+        Args:
+            addresses: The (host, port) of each node.
+            offsets: The index of the first decision of the shard of each node.
+            processes: The processes of the nodes if they were launched locally, which are terminated by `stop`.
+            connect_timeout_s (float): How long to wait for the nodes, which only accept connections after compiling their queries.
+        """
+        assert len(addresses) == len(offsets), "Every node requires the offset of its shard"
+
+        self.addresses = addresses
+        self.offsets = torch.tensor(offsets, dtype=torch.int64).view(-1, 1, 1)
+        self.processes = processes if processes is not None else []
+        self.connect_timeout_s = connect_timeout_s
+        self.sockets = []
+
+    @staticmethod
+    def launch_local(*, oracle_filename: str, oracle_other_filename: str = None, num_nodes: int, device: str = "cpu", threads_per_node: int = 1, batch_sizes=(1,), host: str = "127.0.0.1", connect_timeout_s: float = 600.0):
+        """
+        Launches every node as a local process, e.g., for testing and benchmarking on a single machine.
+
+        Returns:
+            DistributedOracle: The coordinator of the local nodes, which still needs to be started.
+        """
+        num_functions = load_oracle_header(oracle_filename)["num_functions"]
+        offsets = shard_offsets(num_functions, num_nodes)[:-1]
+
+        addresses = []
+        processes = []
+        for rank in range(num_nodes):
+            port = _find_free_port(host)
+            command = [sys.executable, "-m", "cloud_oracle_prototype.distributed", "--oracle", oracle_filename, "--rank", str(rank), "--num-shards", str(num_nodes), "--host", host, "--port", str(port), "--device", device, "--threads", str(threads_per_node), "--batch-sizes", *[str(batch_size) for batch_size in batch_sizes], "--verbose", "0"]
+            if oracle_other_filename is not None:
+                command.extend(["--oracle-other", oracle_other_filename])
+
+            processes.append(subprocess.Popen(command))
+            addresses.append((host, port))
+
+        return DistributedOracle(addresses=addresses, offsets=offsets, processes=processes, connect_timeout_s=connect_timeout_s)
+
+    def start(self):
+        deadline = time.perf_counter() + self.connect_timeout_s
+        for address in self.addresses:
+            self.sockets.append(_connect(address, deadline=deadline, processes=self.processes))
+
+    def stop(self):
+        for sock in self.sockets:
+            sock.close()
+        self.sockets = []
+
+        for process in self.processes:
+            process.terminate()
+            process.wait()
+        self.processes = []
+
+    def minimization_query(self, *, inputs: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor):
+        """
+        Computes the minimum cost and the index of the minimal decision for each workload in the batch over all nodes.
+
+        Args:
+            inputs (torch.Tensor): The workloads, shape (batch_size, num_params).
+            outputs (torch.Tensor): The minimum costs, shape (batch_size, 1).
+            outputs_index (torch.Tensor): The indexes of the minimal decisions, shape (batch_size, 1).
+
+        Returns:
+            (outputs, outputs_index): The minimum costs and the indexes of the minimal decisions.
+        """
+        batch_size = inputs.shape[0]
+        payloads = self._fan_out(protocol.OP_MINIMIZE, inputs)
+
+        # Indexes are local to the shard of a node
+        indexes = torch.stack([protocol.decode_tensor(payload, dtype=torch.int64, shape=(batch_size, 1), count=batch_size) for payload in payloads]) + self.offsets
+        values = torch.stack([protocol.decode_tensor(payload, shape=(batch_size, 1), offset=batch_size * 8) for payload in payloads])
+
+        # Merge the partial minima
+        values, nodes = values.min(dim=0)
+        outputs.copy_(values)
+        outputs_index.copy_(indexes.gather(0, nodes.unsqueeze(0)).squeeze(0))
+
+        return (outputs, outputs_index)
+
+    def simulation_query(self, *, inputs: torch.Tensor, outputs: torch.Tensor):
+        """
+        Simulates the ratio of the minimum cost with the planes to the minimum cost with the other planes over all nodes.
+
+        Args:
+            inputs (torch.Tensor): The workloads, shape (batch_size, num_params+1).
+            outputs (torch.Tensor): The ratios, shape (batch_size, 1).
+
+        Returns:
+            List[float]: The 2.5th, 50th and 97.5th percentile of the ratios.
+        """
+        batch_size = inputs.shape[0]
+        payloads = self._fan_out(protocol.OP_PARTIAL_SIMULATE, inputs)
+
+        # Merge the partial minima with the planes and the other planes
+        partial_minima = torch.stack([protocol.decode_tensor(payload, shape=(2, batch_size, 1)) for payload in payloads])
+        min_new, min_other = partial_minima.amin(dim=0)
+        torch.divide(min_new.to(outputs.device, outputs.dtype), min_other.to(outputs.device, outputs.dtype), out=outputs)
+
+        return compute_percentiles(outputs)
+
+    def _fan_out(self, opcode: int, inputs: torch.Tensor):
+        values = inputs.float().cpu()
+        for sock in self.sockets:
+            protocol.send_request(sock, opcode=opcode, values=values)
+
+        # Receive the responses of all nodes before raising, s.t., no response of this batch is left for the next one
+        payloads = []
+        errors = []
+        for sock in self.sockets:
+            try:
+                payloads.append(protocol.recv_response(sock)[0])
+            except RuntimeError as error:
+                errors.append(error)
+        if errors:
+            raise errors[0]
+        return payloads
+
+def _find_free_port(host: str) -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+def _connect(address, *, deadline: float, processes) -> socket.socket:
+    # Retry until the node compiled its queries and accepts connections
+    while True:
+        try:
+            sock = socket.create_connection(address)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return sock
+        except ConnectionRefusedError:
+            for process in processes:
+                if process.poll() is not None:
+                    raise RuntimeError(f"Node exited with code {process.returncode} before accepting connections")
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"Node at {address} did not accept connections in time")
+            time.sleep(0.1)
+
+def main():
+    parser = argparse.ArgumentParser(prog="cloud_oracle_prototype.distributed", description="Node serving a shard of a distributed cloud oracle")
+    parser.add_argument("--oracle", required=True, help="Oracle file with the planes")
+    parser.add_argument("--oracle-other", help="Oracle file with the other planes for simulation queries")
+    parser.add_argument("--rank", type=int, required=True, help="Index of the shard of this node")
+    parser.add_argument("--num-shards", type=int, required=True, help="Number of shards, i.e., nodes")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to serve on")
+    parser.add_argument("--port", type=int, required=True, help="Port to serve on")
+    parser.add_argument("--device", default="cpu", help="Device of the shard")
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads(), help="Number of threads")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1], help="Batch sizes to compile the queries for at startup")
+    parser.add_argument("--verbose", type=int, default=1, help="Verbosity level")
+    args = parser.parse_args()
+
+    device = load_device(args.device)
+    torch.set_num_threads(args.threads)
+
+    planes, offset = load_oracle_shard(args.oracle, rank=args.rank, num_shards=args.num_shards)
+    planes_other = load_oracle_shard(args.oracle_other, rank=args.rank, num_shards=args.num_shards)[0] if args.oracle_other else None
+    if args.verbose > 0:
+        print(f"Shard {args.rank} of {args.num_shards} holds {planes.shape[0]} decisions starting at {offset}")
+
+    # Serve the shard like a single oracle, the coordinator adds the offset to the indexes
+    daemon = OracleDaemon(planes=planes, planes_other=planes_other, device=device, dtype=planes.dtype, batch_sizes=args.batch_sizes, verbose=args.verbose)
+    daemon.warmup()
+    try:
+        daemon.serve((args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,22 @@ def load_linear_functions(*, num_functions, num_pieces = 1, num_params, coeff_mi
 
     return functions_tensor
 
+def load_latencies(*, num_data_centers, num_client_data_centers, latency_min = 0, latency_max = 1, dtype, device, random=False):
+
+    # Shape of the tensor: (num_data_centers, num_client_data_centers)
+    shape = (num_data_centers, num_client_data_centers)
+
+    latencies_tensor = torch.empty(shape, dtype=dtype, device=device)
+
+    if random:
+        # Fill with random values
+        latencies_tensor.uniform_(latency_min, latency_max)
+    else:
+        # Fill with identical latencies, s.t., no placement is dominated
+        latencies_tensor.fill_(latency_max)
+
+    return latencies_tensor
+
 def load_linear_function_as_batch_tensor(**kwargs):
     tensor = load_linear_functions(**kwargs)
     # Reshape tensor for batch, to (1, num_functions, num_pieces)
@@ -38,4 +54,21 @@ def load_planes_with_savings(*, num_functions: int, num_functions_other: int, nu
     planes[:, 0:end_a] *= percent_change_A
     planes[:, end_a:end_b] *= percent_change_B
 
-    return (planes, planes_other)
\ No newline at end of file
+    return (planes, planes_other)
+
+def load_scenarios_with_savings(*, num_functions: int, num_functions_other: int, num_params: int, device: str, dtype, percent_data_centers_A: float, percent_data_centers_B: float, percent_changes_A, percent_changes_B) -> (torch.Tensor, torch.Tensor):
+    """
+    Loads a stack of scenarios like `load_planes_with_savings`, one for each pair of changes of data centers A and B.
+
+    Returns:
+        (planes, planes_other): The planes of all scenarios, shape (num_scenarios, num_functions, num_params+1), and the other planes.
+    """
+    assert len(percent_changes_A) == len(percent_changes_B), "Every scenario requires a change of data centers A and B"
+
+    planes_other = None
+    scenarios = []
+    for percent_change_A, percent_change_B in zip(percent_changes_A, percent_changes_B):
+        planes, planes_other = load_planes_with_savings(num_functions=num_functions, num_functions_other=num_functions_other, num_params=num_params, device=device, dtype=dtype, percent_data_centers_A=percent_data_centers_A, percent_data_centers_B=percent_data_centers_B, percent_change_A=percent_change_A, percent_change_B=percent_change_B)
+        scenarios.append(planes)
+
+    return (torch.stack(scenarios), planes_other)
@@ -1,5 +1,6 @@
 import itertools
 import os
+import shutil
 from typing import Any, Callable, Dict, List
 import pandas as pd
 import torch
@@ -8,7 +9,7 @@ import time
 from abc import ABC, abstractmethod
 from tqdm import tqdm
 
-from cloud_oracle_prototype.util import check_device_type_available
+from cloud_oracle_prototype.util import check_device_type_available, set_compile_cache_dir, use_compile_cache
 
 class Experiment(ABC):
     num_iterations: int
@@ -65,7 +66,31 @@ class Experiment(ABC):
     def get_name(self) -> str:
         pass
 
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Returns additional metrics of the last executed arguments, which are stored alongside the timings.
+        """
+        return {}
+
+    def reset_metrics(self):
+        """
+        Resets the additional metrics after the warmup, s.t., they only cover the measured iterations.
+        """
+        pass
+
+    def cleanup(self):
+        """
+        Releases the resources of the last loaded arguments, e.g., servers or worker processes. Called after the benchmark, also if it fails.
+        """
+        pass
+
     def benchmark(self):
+        try:
+            self._benchmark()
+        finally:
+            self.cleanup()
+
+    def _benchmark(self):
 
         measurements = []
 
@@ -80,11 +105,30 @@ class Experiment(ABC):
             if self.verbose > 0:
                 print(f"Running {num_iterations} iterations with arguments: {load_kwargs}")
 
-            # Load the benchmark for arguments
-            (workload, batch_size, device) = self.load(**load_kwargs)
-
-            # Warmup
-            self._run(workload=workload, num_iterations=self.num_warmups, device=device)
+            # Either "cold" or "warm" to measure the compilation with an empty or populated compile cache, which is recorded but not passed to load
+            compile_start = load_kwargs.get("compile_start")
+            previous_cache_dir = os.environ.get("TORCHINDUCTOR_CACHE_DIR")
+            cache_dir = use_compile_cache(load_kwargs.get("device", "cpu"), cold=compile_start == "cold")
+
+            try:
+                # Load the benchmark for arguments
+                (workload, batch_size, device) = self.load(**{name: value for name, value in load_kwargs.items() if name != "compile_start"})
+
+                if compile_start == "warm":
+                    # Populate the compile cache and discard the compiled kernels in memory
+                    self._run(workload=workload, num_iterations=1, device=device)
+                    torch._dynamo.reset()
+
+                # Warmup, which includes the compilation
+                warmup_start_time = time.perf_counter()
+                self._run(workload=workload, num_iterations=self.num_warmups, device=device)
+                warmup_time = time.perf_counter() - warmup_start_time
+                self.reset_metrics()
+            finally:
+                # Remove the empty cache of a cold start and restore the previous cache, also if loading fails
+                if compile_start == "cold":
+                    shutil.rmtree(cache_dir, ignore_errors=True)
+                    set_compile_cache_dir(previous_cache_dir)
 
             # Execute
             elapsed_time, results = self._run(workload=workload, num_iterations=num_iterations, device=device)
@@ -92,8 +136,10 @@ class Experiment(ABC):
             time_per_simulation = elapsed_time / num_iterations
 
             # Store results
+            load_kwargs["warmup_time"] = warmup_time
             load_kwargs["elapsed_time"] = elapsed_time
             load_kwargs["time_per_simulation"] = time_per_simulation
+            load_kwargs.update(self.get_metrics())
             if self.keep_results:
                 load_kwargs["results"] = results
 
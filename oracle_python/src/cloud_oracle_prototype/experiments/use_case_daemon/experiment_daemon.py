@@ -0,0 +1,105 @@
+from enum import Enum
+import os
+import tempfile
+import threading
+import time
+import torch
+
+from cloud_oracle_prototype.daemon import OracleDaemon, OracleClient
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+from cloud_oracle_prototype.queries.minimization_query import init_query, minimization_query
+from cloud_oracle_prototype.experiments.experiment import Experiment
+from cloud_oracle_prototype.experiments.util import compute_combinations
+
+class ServingType(Enum):
+    IN_PROCESS = "In-process"
+    DAEMON = "Daemon"
+
+class DaemonExperiment(Experiment):
+
+    def __init__(self, *, output_filename, num_warmups=1, verbose=0, experiment_args):
+        super().__init__(output_filename=output_filename, num_warmups=num_warmups, verbose=verbose, experiment_args=experiment_args)
+
+        self.daemon = None
+        self.client = None
+        self.thread = None
+        self.socket_dir = None
+
+    def __str__(self):
+        return self.pretty_str()
+
+    def __repr__(self):
+        return self.__repr__()
+
+    def get_benchmark_args(self):
+        return self.experiment_args
+
+    def get_name(self):
+        return f"Daemon Experiment"
+
+    def cleanup(self):
+        self._stop_daemon()
+        if self.socket_dir is not None:
+            self.socket_dir.cleanup()
+            self.socket_dir = None
+
+    def load(self, *, serving: ServingType, threads, batch_size, device, dtype, num_data_centers, num_client_data_centers, **kwargs):
+
+        # Stop the daemon of the previous arguments
+        self._stop_daemon()
+
+        # Load data
+        num_params = num_client_data_centers * 2
+        num_functions = compute_combinations(num_data_centers, 2)
+        data = load_linear_functions(device=device, dtype=dtype, num_functions=num_functions, num_params=num_params, as_planes=False, **kwargs)
+
+        # Set number of threads
+        torch.set_num_threads(threads)
+
+        if serving == ServingType.IN_PROCESS:
+            (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=num_functions, num_params=num_params, device=device, dtype=dtype)
+            inputs.zero_()
+
+            # Create workload lambda
+            workload = lambda _: minimization_query(planes=data, inputs=inputs, outputs=outputs, outputs_index=output_indexes)
+        elif serving == ServingType.DAEMON:
+            self.daemon = OracleDaemon(planes=data, device=device, dtype=dtype, batch_sizes=[batch_size], verbose=self.verbose)
+            self.daemon.warmup()
+
+            if self.socket_dir is None:
+                self.socket_dir = tempfile.TemporaryDirectory()
+            address = os.path.join(self.socket_dir.name, "oracle.sock")
+            self.thread = threading.Thread(target=self.daemon.serve, args=(address,), daemon=True)
+            self.thread.start()
+            self.client = self._connect(address)
+
+            inputs = torch.zeros((batch_size, num_params), dtype=torch.float32)
+
+            # Create workload lambda
+            workload = lambda _: self.client.minimize(inputs)
+        else:
+            raise ValueError(f"Unknown serving type {serving}")
+
+        return (workload, batch_size, device)
+
+    def _connect(self, address, timeout_s=10.0):
+        # Wait for the daemon to listen on the socket
+        deadline = time.time() + timeout_s
+        while True:
+            try:
+                return OracleClient(address)
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.01)
+
+    def _stop_daemon(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+        if self.daemon is not None:
+            self.daemon.shutdown()
+            self.daemon = None
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,31 @@
+import os
+from typing import List
+import torch
+from cloud_oracle_prototype.experiments.use_case_daemon.experiment_daemon import DaemonExperiment, ServingType
+
+shared_arguments = {
+    "num_iterations": [1000],
+    "threads": [40],
+    "device": ["cpu"],
+    "dtype": [torch.float16],
+    "serving": [ServingType.IN_PROCESS, ServingType.DAEMON],
+    "batch_size": [1, 64],
+}
+
+arguments_data_center_scaling = {
+    "num_data_centers": [2, 10, 100, 300],
+    "num_client_data_centers": [300],
+}
+
+def generate_experiments(*, output_dir: str, verbose: int = 1, num_warmups: int = 1) -> List[DaemonExperiment]:
+    output_dir_daemon = os.path.join(output_dir, "use_case_daemon")
+    os.makedirs(output_dir_daemon, exist_ok=True)
+
+    experiments = []
+
+    output_filename_data_center_scaling = os.path.join(output_dir_daemon, "data_center_scaling.csv")
+    args = {**shared_arguments, **arguments_data_center_scaling}
+    data_center_scaling_experiment = DaemonExperiment(output_filename=output_filename_data_center_scaling, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(data_center_scaling_experiment)
+
+    return experiments
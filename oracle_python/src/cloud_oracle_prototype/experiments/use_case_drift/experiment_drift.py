@@ -2,8 +2,9 @@ from typing import Dict, List, Any
 import torch
 
 from cloud_oracle_prototype.dummy_data import load_linear_functions
-from cloud_oracle_prototype.queries.directed_drift_query import directed_drift_query
-from cloud_oracle_prototype.queries.conservative_drift_query import conservative_drift_query
+from cloud_oracle_prototype.queries.directed_drift_query import batched_directed_drift_query, directed_drift_query
+from cloud_oracle_prototype.queries.conservative_drift_query import batched_conservative_drift_query, conservative_drift_query
+from cloud_oracle_prototype.queries.backends import select_backend
 from cloud_oracle_prototype.experiments.experiment import Experiment
 from cloud_oracle_prototype.experiments.util import compute_combinations
 from enum import Enum
@@ -19,6 +20,8 @@ class DriftExperiment(Experiment):
     def __init__(self, *, output_filename, num_warmups=1, verbose=0, experiment_args):
         super().__init__(output_filename=output_filename, num_warmups=num_warmups, verbose=verbose, experiment_args=experiment_args)
 
+        self.selected_backend = None
+
     def __str__(self):
         return self.pretty_str()
         
@@ -30,11 +33,17 @@ class DriftExperiment(Experiment):
     
     def get_name(self):
         return f"Drift Experiment"
+
+    def get_metrics(self):
+        if self.selected_backend is None:
+            return {}
+        return {"selected_backend": self.selected_backend.value}
     
-    def load(self, *, drift_type: DriftType, threads, device, dtype, num_data_centers, num_client_data_centers, **kwargs):
+    def load(self, *, drift_type: DriftType, threads, device, dtype, num_data_centers, num_client_data_centers, backend=None, batch_size: int = 1, **kwargs):
+
+        self.selected_backend = None
 
         # Load data
-        batch_size = 1
         num_params = num_client_data_centers * 2
         num_functions = compute_combinations(num_data_centers, 2)
 
@@ -47,13 +56,39 @@ class DriftExperiment(Experiment):
         
         # Create workload lambda
 
-        if drift_type == DriftType.DIRECTED:
+        if batch_size > 1:
+            # One batched query for the current parameters of all objects
+            current_parameters = torch.zeros((batch_size, num_params+1), dtype=dtype, device=device)
+            if drift_type == DriftType.DIRECTED:
+                drifts = torch.ones((batch_size, num_params+1), dtype=dtype, device=device)
+                if backend is None:
+                    workload = lambda _: batched_directed_drift_query(current_parameters=current_parameters, planes=data, drifts=drifts)
+                else:
+                    (query_backend, self.selected_backend) = select_backend(backend, run=lambda instance: instance.batched_directed_drift_query(current_parameters=current_parameters, planes=data, drifts=drifts), device=device)
+                    workload = lambda _: query_backend.batched_directed_drift_query(current_parameters=current_parameters, planes=data, drifts=drifts)
+            elif drift_type == DriftType.UNDIRECTED:
+                if backend is None:
+                    workload = lambda _: batched_conservative_drift_query(current_parameters=current_parameters, planes=data)
+                else:
+                    (query_backend, self.selected_backend) = select_backend(backend, run=lambda instance: instance.batched_conservative_drift_query(current_parameters=current_parameters, planes=data), device=device)
+                    workload = lambda _: query_backend.batched_conservative_drift_query(current_parameters=current_parameters, planes=data)
+            else:
+                raise ValueError(f"Unknown drift type {drift_type}")
+        elif drift_type == DriftType.DIRECTED:
             # Also allocate drift
             drift = torch.ones(num_params+1, dtype=dtype, device=device)
             # Create workload lambda
-            workload = lambda _: directed_drift_query(current_parameter=current_parameter, planes=data, drift=drift)
+            if backend is None:
+                workload = lambda _: directed_drift_query(current_parameter=current_parameter, planes=data, drift=drift)
+            else:
+                (query_backend, self.selected_backend) = select_backend(backend, run=lambda instance: instance.directed_drift_query(current_parameter=current_parameter, planes=data, drift=drift), device=device)
+                workload = lambda _: query_backend.directed_drift_query(current_parameter=current_parameter, planes=data, drift=drift)
         elif drift_type == DriftType.UNDIRECTED:
-            workload = lambda _: conservative_drift_query(current_parameter=current_parameter, planes=data)
+            if backend is None:
+                workload = lambda _: conservative_drift_query(current_parameter=current_parameter, planes=data)
+            else:
+                (query_backend, self.selected_backend) = select_backend(backend, run=lambda instance: instance.conservative_drift_query(current_parameter=current_parameter, planes=data), device=device)
+                workload = lambda _: query_backend.conservative_drift_query(current_parameter=current_parameter, planes=data)
         else:
             raise ValueError(f"Unknown drift type {drift_type}")
 
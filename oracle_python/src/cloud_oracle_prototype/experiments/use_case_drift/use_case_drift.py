@@ -2,6 +2,7 @@ import os
 from typing import List
 import torch
 from cloud_oracle_prototype.experiments.use_case_drift.experiment_drift import DriftExperiment, DriftType
+from cloud_oracle_prototype.queries.backends import BackendType
 
 shared_arguments = {
     "num_iterations": [100],
@@ -21,6 +22,22 @@ arguments_client_data_center_scaling = {
     "num_client_data_centers": [2, 10, 100, 300, 10**3],
 }
 
+# Compare the backends on the CPU
+arguments_backend = {
+    "device": ["cpu"],
+    "dtype": [torch.float32],
+    "num_data_centers": [10, 100, 300],
+    "num_client_data_centers": [10, 300],
+    "backend": [BackendType.COMPILED, BackendType.EAGER, BackendType.NUMPY, BackendType.AUTO],
+}
+
+# Batched queries for the current parameters of many objects
+arguments_batch_scaling = {
+    "num_data_centers": [300],
+    "num_client_data_centers": [300],
+    "batch_size": [1, 10, 100, 10**3],
+}
+
 def generate_experiments(*, output_dir: str, verbose: int = 1, num_warmups: int = 1,) -> List[DriftExperiment]:
     output_dir_use_case_1 = os.path.join(output_dir, "use_case_drift")
     os.makedirs(output_dir_use_case_1, exist_ok=True)
@@ -37,4 +54,14 @@ def generate_experiments(*, output_dir: str, verbose: int = 1, num_warmups: int
     client_data_center_scaling_experiment = DriftExperiment(output_filename=output_filename_client_data_center_scaling, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
     experiments.append(client_data_center_scaling_experiment)
 
+    output_filename_backend = os.path.join(output_dir_use_case_1, "backend_oracle.csv")
+    args = {**shared_arguments, **arguments_backend}
+    backend_experiment = DriftExperiment(output_filename=output_filename_backend, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(backend_experiment)
+
+    output_filename_batch_scaling = os.path.join(output_dir_use_case_1, "batch_scaling_oracle.csv")
+    args = {**shared_arguments, **arguments_batch_scaling}
+    batch_scaling_experiment = DriftExperiment(output_filename=output_filename_batch_scaling, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(batch_scaling_experiment)
+
     return experiments
\ No newline at end of file
@@ -1,17 +1,38 @@
+import asyncio
+import os
+import tempfile
 from enum import Enum
 from typing import Dict, List, Any
 import torch
 import cvxpy as cp
 import numpy as np
 
-from cloud_oracle_prototype.dummy_data import load_linear_functions
-from cloud_oracle_prototype.queries.minimization_query import init_query, minimization_query
+from cloud_oracle_prototype.dummy_data import load_latencies, load_linear_functions
+from cloud_oracle_prototype.queries.minimization_query import init_query, load_random_inputs, minimization_query
+from cloud_oracle_prototype.queries import approximate_minimization_query, factorized_minimization_query, incremental_minimization_query, point_location_query, pruned_minimization_query, quantized_minimization_query
+from cloud_oracle_prototype.oracle_file import load_oracle, save_oracle
+from cloud_oracle_prototype.batching import MinimizationBatcher
+from cloud_oracle_prototype.bucketing import BATCH_BUCKETS, bucket_size, pad_planes
+from cloud_oracle_prototype.cache import MinimizationCache
+from cloud_oracle_prototype.sharding import ShardedOracle
+from cloud_oracle_prototype.distributed import DistributedOracle
+from cloud_oracle_prototype.queries.backends import select_backend
 from cloud_oracle_prototype.queries.minimization_ilp import init_ilp, minimize_ilp
 from cloud_oracle_prototype.experiments.experiment import Experiment
 from cloud_oracle_prototype.experiments.util import compute_combinations
 
 class ApproachType(Enum):
     ORACLE = "Oracle"
+    ORACLE_FACTORIZED = "Oracle (factorized)"
+    ORACLE_MICRO_BATCHED = "Oracle (micro-batched)"
+    ORACLE_CACHED = "Oracle (cached)"
+    ORACLE_INCREMENTAL = "Oracle (incremental)"
+    ORACLE_PRUNED = "Oracle (pruned)"
+    ORACLE_APPROXIMATE = "Oracle (approximate)"
+    ORACLE_POINT_LOCATION = "Oracle (point location)"
+    ORACLE_SHARDED = "Oracle (sharded)"
+    ORACLE_DISTRIBUTED = "Oracle (distributed)"
+    ORACLE_QUANTIZED = "Oracle (quantized)"
     ILP = "ILP"
 
 class MinimizationExperiment(Experiment):
@@ -20,6 +41,10 @@ class MinimizationExperiment(Experiment):
         super().__init__(output_filename=output_filename, num_warmups=num_warmups, verbose=verbose, experiment_args=experiment_args)
 
         self.approach = None
+        self.metrics_loader = None
+        self.sharded_oracle = None
+        self.batcher = None
+        self.batcher_loop = None
 
     def __str__(self):
         return self.pretty_str()
@@ -32,36 +57,396 @@ class MinimizationExperiment(Experiment):
     
     def get_name(self):
         return f"Minimization Experiment"
+
+    def get_metrics(self):
+        if self.metrics_loader is None:
+            return {}
+        return self.metrics_loader()
+
+    def reset_metrics(self):
+        if self.batcher is not None:
+            self.batcher.reset_stats()
+
+    def cleanup(self):
+        self._stop_batcher()
+        self._stop_sharded_oracle()
+
+    def _stop_batcher(self):
+        if self.batcher is not None:
+            self.batcher_loop.run_until_complete(self.batcher.stop())
+            self.batcher_loop.close()
+            self.batcher = None
+            self.batcher_loop = None
+
+    def _stop_sharded_oracle(self):
+        if self.sharded_oracle is not None:
+            self.sharded_oracle.stop()
+            self.sharded_oracle = None
     
     def load(self, *, approach: ApproachType, **kwargs):
 
+        self.metrics_loader = None
+
+        # Stop the batcher of the previous arguments
+        self._stop_batcher()
+
+        # Stop the workers or nodes of the previous arguments
+        self._stop_sharded_oracle()
+
         if approach == ApproachType.ORACLE:
             return self._load_oracle(**kwargs)
+        elif approach == ApproachType.ORACLE_FACTORIZED:
+            return self._load_oracle_factorized(**kwargs)
+        elif approach == ApproachType.ORACLE_MICRO_BATCHED:
+            return self._load_oracle_micro_batched(**kwargs)
+        elif approach == ApproachType.ORACLE_CACHED:
+            return self._load_oracle_cached(**kwargs)
+        elif approach == ApproachType.ORACLE_INCREMENTAL:
+            return self._load_oracle_incremental(**kwargs)
+        elif approach == ApproachType.ORACLE_PRUNED:
+            return self._load_oracle_pruned(**kwargs)
+        elif approach == ApproachType.ORACLE_APPROXIMATE:
+            return self._load_oracle_approximate(**kwargs)
+        elif approach == ApproachType.ORACLE_POINT_LOCATION:
+            return self._load_oracle_point_location(**kwargs)
+        elif approach == ApproachType.ORACLE_SHARDED:
+            return self._load_oracle_sharded(**kwargs)
+        elif approach == ApproachType.ORACLE_DISTRIBUTED:
+            return self._load_oracle_distributed(**kwargs)
+        elif approach == ApproachType.ORACLE_QUANTIZED:
+            return self._load_oracle_quantized(**kwargs)
         elif approach == ApproachType.ILP:
             return self._load_ilp(**kwargs)
         else:
             raise ValueError(f"Unknown approach {approach}")
         
-    def _load_oracle(self,*, threads, batch_size, device, dtype, num_data_centers, num_client_data_centers, **kwargs):
+    def _load_oracle(self,*, threads, batch_size, device, dtype, num_data_centers, num_client_data_centers, tile_size=None, oracle_filename=None, density=None, sparse_threshold=0, bucketing=False, backend=None, seed=42, **kwargs):
+
+        # Load data
+        if oracle_filename is not None:
+            # Load precomputed oracle from file, which is memory-mapped on CPU
+            data, _, _ = load_oracle(oracle_filename, device=device)
+            data = data.to(dtype)
+            (num_functions, num_params) = data.shape
+            if self.verbose > 0:
+                print(f"Loaded {num_functions} functions with {num_params} parameters from {oracle_filename}")
+        else:
+            num_params = num_client_data_centers * 2
+            num_functions = compute_combinations(num_data_centers, 2)
+
+            if self.verbose > 0:
+                print(f"Loading {num_functions} functions with {num_params} parameters for {num_data_centers} data centers and {num_client_data_centers} client data centers")
+            data = load_linear_functions(device=device, dtype=dtype, num_functions=num_functions, num_params=num_params, as_planes=False, **kwargs)
+
+        # Set number of threads
+        torch.set_num_threads(threads)
+
+        # Pad the decisions and the batch to bucket sizes, s.t., different sizes share few compiled kernels
+        query_batch_size = batch_size
+        if bucketing:
+            data = pad_planes(data, size=bucket_size(num_functions))
+            query_batch_size = bucket_size(batch_size, BATCH_BUCKETS)
+
+        # Initialize query state
+        (outputs, output_indexes, inputs)= init_query(planes=data, batch_size=query_batch_size, num_functions=data.shape[0], num_params=num_params, device=device, dtype=dtype)
+
+        if density is None:
+            inputs.zero_()
+        else:
+            # Sparse workloads, where only a fraction of the client data centers issue reads and writes
+            torch.manual_seed(seed)
+            load_random_inputs(inputs)
+            is_active = torch.rand((query_batch_size, num_params // 2, 1), device=device) < density
+            inputs.view(query_batch_size, num_params // 2, 2).mul_(is_active)
+            inputs[batch_size:].zero_()
+        
+        # Create workload lambda
+        if backend is None:
+            workload = lambda _: minimization_query(planes=data, inputs=inputs, outputs=outputs, outputs_index=output_indexes, tile_size=tile_size, sparse_threshold=sparse_threshold)
+        else:
+            # Dense query with the given or autotuned backend
+            (query_backend, selected_backend) = select_backend(backend, run=lambda instance: instance.minimization_query(planes=data, inputs=inputs, outputs=outputs, outputs_index=output_indexes), device=device)
+            workload = lambda _: query_backend.minimization_query(planes=data, inputs=inputs, outputs=outputs, outputs_index=output_indexes)
+            self.metrics_loader = lambda: {"selected_backend": selected_backend.value}
+
+        return (workload, batch_size, device)
+
+    def _load_oracle_factorized(self, *, threads, batch_size, device, dtype, num_data_centers, num_client_data_centers, block_size=2**14, **kwargs):
 
         # Load data
         num_params = num_client_data_centers * 2
-        num_functions = compute_combinations(num_data_centers, 2)
 
         if self.verbose > 0:
-            print(f"Loading {num_functions} functions with {num_params} parameters for {num_data_centers} data centers and {num_client_data_centers} client data centers")
+            print(f"Loading latencies of {num_data_centers} data centers and {num_client_data_centers} client data centers")
+        latencies = load_latencies(device=device, dtype=dtype, num_data_centers=num_data_centers, num_client_data_centers=num_client_data_centers, **kwargs)
+
+        # Set number of threads
+        torch.set_num_threads(threads)
+
+        # Initialize query state
+        (outputs, output_indexes, inputs, pairs) = factorized_minimization_query.init_query(latencies=latencies, batch_size=batch_size, num_params=num_params, device=device, dtype=dtype)
+
+        inputs.zero_()
+
+        # Create workload lambda
+        workload = lambda _: factorized_minimization_query.factorized_minimization_query(latencies=latencies, pairs=pairs, inputs=inputs, outputs=outputs, outputs_index=output_indexes, block_size=block_size)
+
+        return (workload, batch_size, device)
+
+    def _load_oracle_micro_batched(self, *, threads, batch_size, device, dtype, num_data_centers, num_client_data_centers, max_wait_ms, num_requests, **kwargs):
+
+        # Load data
+        num_params = num_client_data_centers * 2
+        num_functions = compute_combinations(num_data_centers, 2)
+        data = load_linear_functions(device=device, dtype=dtype, num_functions=num_functions, num_params=num_params, as_planes=False, **kwargs)
+
+        # Set number of threads
+        torch.set_num_threads(threads)
+
+        # The batch size is the maximum size of the micro-batches
+        loop = asyncio.new_event_loop()
+        batcher = MinimizationBatcher(planes=data, max_batch_size=batch_size, max_wait_s=max_wait_ms / 1000, device=device, dtype=dtype)
+        loop.run_until_complete(batcher.start())
+        (self.batcher, self.batcher_loop) = (batcher, loop)
+
+        workloads = torch.zeros((num_requests, num_params), device=device, dtype=dtype)
+
+        async def submit_requests():
+            # Concurrent single-workload requests, e.g., of independent clients
+            return await asyncio.gather(*[batcher.minimize(workload) for workload in workloads])
+
+        # Create workload lambda
+        workload = lambda _: loop.run_until_complete(submit_requests())
+        self.metrics_loader = batcher.get_stats
+
+        return (workload, batch_size, device)
+
+    def _load_oracle_cached(self, *, threads, batch_size, device, dtype, num_data_centers, num_client_data_centers, cache_size, num_profiles, quantization=None, seed=42, **kwargs):
+
+        # Load data
+        num_params = num_client_data_centers * 2
+        num_functions = compute_combinations(num_data_centers, 2)
         data = load_linear_functions(device=device, dtype=dtype, num_functions=num_functions, num_params=num_params, as_planes=False, **kwargs)
 
         # Set number of threads
         torch.set_num_threads(threads)
 
         # Initialize query state
-        (outputs, output_indexes, inputs)= init_query(planes=data, batch_size=batch_size, num_functions=num_functions, num_params=num_params, device=device, dtype=dtype)
+        (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=num_functions, num_params=num_params, device=device, dtype=dtype)
+
+        # Workloads repeat a limited number of read/write frequency profiles
+        torch.manual_seed(seed)
+        profiles = torch.empty((num_profiles, num_params), device=device, dtype=dtype).exponential_()
+        profile_offsets = torch.arange(batch_size, device=device)
+
+        cache = MinimizationCache(max_size=cache_size, quantization=quantization)
+
+        def query(i):
+            inputs.copy_(profiles[(i * batch_size + profile_offsets) % num_profiles])
+            return cache.query(planes=data, inputs=inputs, outputs=outputs, outputs_index=output_indexes)
+
+        # Create workload lambda
+        workload = lambda i: query(i)
+        self.metrics_loader = cache.get_stats
 
+        return (workload, batch_size, device)
+
+    def _load_oracle_incremental(self, *, threads, batch_size, device, dtype, num_data_centers, num_client_data_centers, num_changed_client_data_centers, seed=42, **kwargs):
+
+        # Load data
+        num_params = num_client_data_centers * 2
+        num_functions = compute_combinations(num_data_centers, 2)
+        data = load_linear_functions(device=device, dtype=dtype, num_functions=num_functions, num_params=num_params, as_planes=False, **kwargs)
+
+        # Set number of threads
+        torch.set_num_threads(threads)
+
+        # Initialize query state for the tracked workloads
+        torch.manual_seed(seed)
+        inputs = torch.empty((batch_size, num_params), device=device, dtype=dtype).exponential_()
+        (planes_t, costs, outputs, output_indexes) = incremental_minimization_query.init_query(planes=data, inputs=inputs)
+
+        # Every update changes the write and read frequency of the same number of client data centers for all workloads
+        workload_indexes = torch.arange(batch_size, device=device)
+        num_changed = min(num_changed_client_data_centers, num_client_data_centers)
+        changed_client_data_centers = torch.randperm(num_client_data_centers, device=device)[:num_changed]
+        columns = torch.stack([2 * changed_client_data_centers, 2 * changed_client_data_centers + 1], dim=1).view(-1)
+        values = torch.empty((batch_size, columns.shape[0]), device=device, dtype=dtype).exponential_()
+
+        # Create workload lambda
+        workload = lambda _: incremental_minimization_query.incremental_minimization_query(planes_t=planes_t, costs=costs, inputs=inputs, workload_indexes=workload_indexes, columns=columns, values=values, outputs=outputs, outputs_index=output_indexes)
+
+        return (workload, batch_size, device)
+
+    def _load_oracle_pruned(self, *, threads, batch_size, device, dtype, num_data_centers, num_client_data_centers, group_size=256, tile_size=16, density=1.0, seed=42, **kwargs):
+
+        # Load data
+        num_params = num_client_data_centers * 2
+        num_functions = compute_combinations(num_data_centers, 2)
+        data = load_linear_functions(device=device, dtype=dtype, num_functions=num_functions, num_params=num_params, as_planes=False, **kwargs)
+
+        # Set number of threads
+        torch.set_num_threads(threads)
+
+        # Initialize query state and the pruning index
+        (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=num_functions, num_params=num_params, device=device, dtype=dtype)
+        index = pruned_minimization_query.init_index(planes=data, group_size=group_size)
+
+        # Same workloads as the oracle with the given density
+        torch.manual_seed(seed)
+        load_random_inputs(inputs)
+        is_active = torch.rand((batch_size, num_params // 2, 1), device=device) < density
+        inputs.view(batch_size, num_params // 2, 2).mul_(is_active)
+
+        pruning_ratios = []
+        def query():
+            (_, _, pruning_ratio) = pruned_minimization_query.pruned_minimization_query(index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes, tile_size=tile_size)
+            pruning_ratios.append(pruning_ratio)
+
+        # Create workload lambda
+        workload = lambda _: query()
+        self.metrics_loader = lambda: {"pruning_ratio": sum(pruning_ratios) / len(pruning_ratios)}
+
+        return (workload, batch_size, device)
+
+    def _load_oracle_approximate(self, *, threads, batch_size, device, dtype, num_data_centers, num_client_data_centers, num_probes, num_lists=None, density=1.0, seed=42, **kwargs):
+
+        # Load data
+        num_params = num_client_data_centers * 2
+        num_functions = compute_combinations(num_data_centers, 2)
+        data = load_linear_functions(device=device, dtype=dtype, num_functions=num_functions, num_params=num_params, as_planes=False, **kwargs)
+
+        # Set number of threads
+        torch.set_num_threads(threads)
+
+        # Initialize query state and the inverted-file index
+        (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=num_functions, num_params=num_params, device=device, dtype=dtype)
+        index = approximate_minimization_query.init_index(planes=data, num_lists=num_lists, seed=seed)
+
+        # Same workloads as the oracle with the given density
+        torch.manual_seed(seed)
+        load_random_inputs(inputs)
+        is_active = torch.rand((batch_size, num_params // 2, 1), device=device) < density
+        inputs.view(batch_size, num_params // 2, 2).mul_(is_active)
+
+        # Recall of the minimal cost compared to the exact query
+        approximate_minimization_query.approximate_minimization_query(planes=data, index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes, num_probes=num_probes)
+        (exact_outputs, _) = minimization_query(planes=data, inputs=inputs, outputs=torch.empty_like(outputs), outputs_index=torch.empty_like(output_indexes))
+        recall = torch.isclose(outputs.float(), exact_outputs.float(), rtol=1e-3).float().mean().item()
+
+        # Create workload lambda
+        workload = lambda _: approximate_minimization_query.approximate_minimization_query(planes=data, index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes, num_probes=num_probes)
+        self.metrics_loader = lambda: {"recall": recall, "num_lists": index[0].shape[0]}
+
+        return (workload, batch_size, device)
+
+    def _load_oracle_point_location(self, *, threads, batch_size, device, dtype, num_data_centers, num_client_data_centers, max_dim=8, leaf_size=8, max_depth=12, density=1.0, seed=42, **kwargs):
+
+        # Load data
+        num_params = num_client_data_centers * 2
+        num_functions = compute_combinations(num_data_centers, 2)
+        data = load_linear_functions(device=device, dtype=dtype, num_functions=num_functions, num_params=num_params, as_planes=False, **kwargs)
+
+        # Set number of threads
+        torch.set_num_threads(threads)
+
+        # Initialize query state and the point-location tree, which is only built for few parameters
+        (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=num_functions, num_params=num_params, device=device, dtype=dtype)
+        index = point_location_query.init_index(planes=data, max_dim=max_dim, leaf_size=leaf_size, max_depth=max_depth)
+
+        # Same workloads as the oracle with the given density
+        torch.manual_seed(seed)
+        load_random_inputs(inputs)
+        is_active = torch.rand((batch_size, num_params // 2, 1), device=device) < density
+        inputs.view(batch_size, num_params // 2, 2).mul_(is_active)
+
+        # Create workload lambda
+        workload = lambda _: point_location_query.point_location_query(planes=data, index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes)
+        if index is None:
+            self.metrics_loader = lambda: {"num_leaves": 0, "max_leaf_size": num_functions}
+        else:
+            leaf_sizes = index[3].diff()
+            self.metrics_loader = lambda: {"num_leaves": leaf_sizes.shape[0], "max_leaf_size": leaf_sizes.max().item()}
+
+        return (workload, batch_size, device)
+
+    def _load_oracle_sharded(self, *, threads, batch_size, device, dtype, num_data_centers, num_client_data_centers, num_workers, **kwargs):
+        assert device == "cpu", "Sharded oracle only runs on the CPU"
+
+        # Load data
+        num_params = num_client_data_centers * 2
+        num_functions = compute_combinations(num_data_centers, 2)
+        data = load_linear_functions(device=device, dtype=dtype, num_functions=num_functions, num_params=num_params, as_planes=False, **kwargs)
+
+        # Split the threads among the workers
+        self.sharded_oracle = ShardedOracle(planes=data, num_workers=num_workers, max_batch_size=batch_size, threads_per_worker=max(1, threads // num_workers))
+        self.sharded_oracle.start()
+
+        # Initialize query state
+        (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=num_functions, num_params=num_params, device=device, dtype=dtype)
         inputs.zero_()
-        
+
+        # Create workload lambda
+        oracle = self.sharded_oracle
+        workload = lambda _: oracle.minimization_query(inputs=inputs, outputs=outputs, outputs_index=output_indexes)
+
+        return (workload, batch_size, device)
+
+    def _load_oracle_distributed(self, *, threads, batch_size, device, dtype, num_data_centers, num_client_data_centers, num_nodes, **kwargs):
+
+        # Load data
+        num_params = num_client_data_centers * 2
+        num_functions = compute_combinations(num_data_centers, 2)
+        data = load_linear_functions(device=device, dtype=dtype, num_functions=num_functions, num_params=num_params, as_planes=False, **kwargs)
+
+        # Launch every node as a local process, which loads its shard from the oracle file
+        with tempfile.TemporaryDirectory() as temp_dir:
+            oracle_filename = os.path.join(temp_dir, "oracle.bin")
+            save_oracle(oracle_filename, planes=data)
+
+            self.sharded_oracle = DistributedOracle.launch_local(oracle_filename=oracle_filename, num_nodes=num_nodes, device=device, threads_per_node=max(1, threads // num_nodes), batch_sizes=[batch_size])
+            self.sharded_oracle.start()
+
+        # Initialize query state
+        (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=num_functions, num_params=num_params, device=device, dtype=dtype)
+        inputs.zero_()
+
+        # Create workload lambda
+        oracle = self.sharded_oracle
+        workload = lambda _: oracle.minimization_query(inputs=inputs, outputs=outputs, outputs_index=output_indexes)
+
+        return (workload, batch_size, device)
+
+    def _load_oracle_quantized(self, *, threads, batch_size, device, dtype, num_data_centers, num_client_data_centers, granularity="row", rescore_exact=True, density=1.0, seed=42, **kwargs):
+
+        # Load data, which is quantized to int8
+        num_params = num_client_data_centers * 2
+        num_functions = compute_combinations(num_data_centers, 2)
+        data = load_linear_functions(device=device, dtype=dtype, num_functions=num_functions, num_params=num_params, as_planes=False, **kwargs)
+
+        # Set number of threads
+        torch.set_num_threads(threads)
+
+        # Initialize query state and the quantized planes
+        (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=num_functions, num_params=num_params, device=device, dtype=torch.float32)
+        index = quantized_minimization_query.init_index(planes=data, granularity=granularity)
+        planes_exact = data if rescore_exact else None
+
+        # Same workloads as the oracle with the given density
+        torch.manual_seed(seed)
+        load_random_inputs(inputs)
+        is_active = torch.rand((batch_size, num_params // 2, 1), device=device) < density
+        inputs.view(batch_size, num_params // 2, 2).mul_(is_active)
+
+        rescoring_ratios = []
+        def query():
+            (_, _, rescoring_ratio) = quantized_minimization_query.quantized_minimization_query(index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes, planes_exact=planes_exact)
+            rescoring_ratios.append(rescoring_ratio)
+
         # Create workload lambda
-        workload = lambda _: minimization_query(planes=data, inputs=inputs, outputs=outputs, outputs_index=output_indexes)
+        workload = lambda _: query()
+        memory_bytes = sum(tensor.numel() * tensor.element_size() for tensor in index)
+        self.metrics_loader = lambda: {"rescoring_ratio": sum(rescoring_ratios) / len(rescoring_ratios), "memory_bytes": memory_bytes}
 
         return (workload, batch_size, device)
 
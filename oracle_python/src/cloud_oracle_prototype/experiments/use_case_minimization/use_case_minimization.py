@@ -3,6 +3,8 @@ from typing import List
 import torch
 import cvxpy as cp
 from cloud_oracle_prototype.experiments.use_case_minimization.experiment_minimization import MinimizationExperiment, ApproachType
+from cloud_oracle_prototype.queries.backends import BackendType
+from cloud_oracle_prototype.queries.minimization_query import SPARSE_THRESHOLD
 
 shared_arguments = {
     "num_iterations": [100],
@@ -21,18 +23,163 @@ arguments_client_data_center_scaling = {
     "num_client_data_centers": [2, 10, 100, 300, 10**3],
 }
 
+arguments_batch_scaling = {
+    "num_data_centers": [10**3],
+    "num_client_data_centers": [300],
+    "batch_size": [1, 10**3, 10**5],
+    "tile_size": [2**12, 2**14],
+    "num_iterations": [10],
+}
+
 arguments_oracle = {
     "approach": [ApproachType.ORACLE],
     "dtype": [torch.float16],
 }
 
+arguments_oracle_factorized = {
+    "approach": [ApproachType.ORACLE_FACTORIZED],
+    "dtype": [torch.float16],
+}
+
+arguments_data_center_scaling_factorized = {
+    "num_data_centers": [2, 10, 100, 300, 10**3, 3*10**3],
+    "num_client_data_centers": [300],
+}
+
+arguments_oracle_micro_batched = {
+    "approach": [ApproachType.ORACLE_MICRO_BATCHED],
+    "dtype": [torch.float16],
+    "num_data_centers": [300],
+    "num_client_data_centers": [300],
+    "batch_size": [1, 16, 64, 256],
+    "max_wait_ms": [0.1, 1, 10],
+    "num_requests": [1024],
+    "num_iterations": [10],
+}
+
+arguments_oracle_cached = {
+    "approach": [ApproachType.ORACLE_CACHED],
+    "dtype": [torch.float16],
+    "num_data_centers": [300],
+    "num_client_data_centers": [300],
+    "batch_size": [1, 64],
+    "num_profiles": [100, 10**4],
+    "cache_size": [10**3],
+    "quantization": [None, 0.1],
+}
+
+arguments_oracle_sparse = {
+    "approach": [ApproachType.ORACLE],
+    "dtype": [torch.float16],
+    "density": [0.01, 0.1, 0.5],
+    "sparse_threshold": [0, SPARSE_THRESHOLD],
+}
+
+arguments_oracle_incremental = {
+    "approach": [ApproachType.ORACLE_INCREMENTAL],
+    "dtype": [torch.float16],
+    "num_changed_client_data_centers": [1, 10],
+}
+
+# Compare pruned and exhaustive oracle on the same random planes and workloads
+arguments_oracle_pruned = {
+    "approach": [ApproachType.ORACLE, ApproachType.ORACLE_PRUNED],
+    "dtype": [torch.float16],
+    "random": [True],
+    "density": [1.0],
+    "batch_size": [1, 64],
+}
+
+arguments_oracle_approximate = {
+    "approach": [ApproachType.ORACLE_APPROXIMATE],
+    "dtype": [torch.float16],
+    "random": [True],
+    "density": [1.0],
+    "batch_size": [1, 64],
+    "num_probes": [1, 8, 32],
+}
+
+# Compare point location and exhaustive oracle, the tree is only built for few client data centers
+arguments_oracle_point_location = {
+    "approach": [ApproachType.ORACLE, ApproachType.ORACLE_POINT_LOCATION],
+    "dtype": [torch.float32],
+    "random": [True],
+    "density": [1.0],
+    "batch_size": [1, 64],
+}
+
+# Scaling over the number of worker processes on the CPU, compared to intra-op threads of a single process
+arguments_oracle_sharded = {
+    "approach": [ApproachType.ORACLE_SHARDED],
+    "device": ["cpu"],
+    "dtype": [torch.float32],
+    "num_data_centers": [300],
+    "num_client_data_centers": [300],
+    "batch_size": [1, 64],
+    "num_workers": [1, 2, 4, 8, 16, 32, 40],
+}
+
+# Scaling over the number of nodes, which are launched as local processes
+arguments_oracle_distributed = {
+    "approach": [ApproachType.ORACLE_DISTRIBUTED],
+    "device": ["cpu"],
+    "dtype": [torch.float32],
+    "num_data_centers": [300],
+    "num_client_data_centers": [300],
+    "batch_size": [1, 64],
+    "num_nodes": [1, 2, 4, 8],
+}
+
+# Compare the precision of the planes on the same random planes and workloads
+arguments_oracle_precision = {
+    "approach": [ApproachType.ORACLE],
+    "dtype": [torch.float16, torch.bfloat16, torch.float32],
+    "random": [True],
+    "density": [1.0],
+    "batch_size": [1, 64],
+}
+
+# Rescoring with the dequantized planes is only exact with respect to the quantized oracle, rescoring with the exact planes is exact
+arguments_oracle_quantized = {
+    "approach": [ApproachType.ORACLE_QUANTIZED],
+    "dtype": [torch.float32],
+    "random": [True],
+    "density": [1.0],
+    "batch_size": [1, 64],
+    "granularity": ["row", "column"],
+    "rescore_exact": [False, True],
+}
+
+# Cold and warm start of the compilation with and without bucketing, where batch sizes of 3 and 50 are padded to 8 and 64
+arguments_oracle_compile_start = {
+    "approach": [ApproachType.ORACLE],
+    "dtype": [torch.float16],
+    "num_data_centers": [100, 300],
+    "num_client_data_centers": [300],
+    "batch_size": [1, 3, 50, 64],
+    "bucketing": [False, True],
+    "compile_start": ["cold", "warm"],
+    "num_iterations": [10],
+}
+
+# Compare the backends for small to large oracles on the CPU
+arguments_oracle_backend = {
+    "approach": [ApproachType.ORACLE],
+    "device": ["cpu"],
+    "dtype": [torch.float32],
+    "num_data_centers": [10, 100, 300],
+    "num_client_data_centers": [10, 300],
+    "batch_size": [1, 64],
+    "backend": [BackendType.COMPILED, BackendType.EAGER, BackendType.NUMPY, BackendType.AUTO],
+}
+
 arguments_ilp = {
     "approach": [ApproachType.ILP],
     "solver": [cp.GUROBI],
     "num_iterations": [1],
 }
 
-def generate_experiments(*, output_dir: str, verbose: int = 1, num_warmups: int = 1, do_ilp = True, do_oracle = True, do_data_center_scaling = True, do_client_data_center_scaling = True) -> List[MinimizationExperiment]:
+def generate_experiments(*, output_dir: str, verbose: int = 1, num_warmups: int = 1, do_ilp = True, do_oracle = True, do_data_center_scaling = True, do_client_data_center_scaling = True, do_batch_scaling = True, do_micro_batching = True, do_caching = True, do_sharding = True, do_distribution = True, do_precision = True, do_compile_start = True, do_backends = True) -> List[MinimizationExperiment]:
     output_dir_use_case_1 = os.path.join(output_dir, "use_case_minimization")
     os.makedirs(output_dir_use_case_1, exist_ok=True)
 
@@ -44,12 +191,96 @@ def generate_experiments(*, output_dir: str, verbose: int = 1, num_warmups: int
             data_center_scaling_experiment = MinimizationExperiment(output_filename=output_filename_data_center_scaling, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
             experiments.append(data_center_scaling_experiment)
 
+            output_filename_data_center_scaling_factorized = os.path.join(output_dir_use_case_1, "data_center_scaling_oracle_factorized.csv")
+            args = {**shared_arguments, **arguments_data_center_scaling_factorized, **arguments_oracle_factorized}
+            data_center_scaling_factorized_experiment = MinimizationExperiment(output_filename=output_filename_data_center_scaling_factorized, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(data_center_scaling_factorized_experiment)
+
+            output_filename_data_center_scaling_pruned = os.path.join(output_dir_use_case_1, "data_center_scaling_oracle_pruned.csv")
+            args = {**shared_arguments, **arguments_data_center_scaling, **arguments_oracle_pruned}
+            data_center_scaling_pruned_experiment = MinimizationExperiment(output_filename=output_filename_data_center_scaling_pruned, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(data_center_scaling_pruned_experiment)
+
+            # Compare to the exhaustive oracle of the pruned experiment
+            output_filename_data_center_scaling_approximate = os.path.join(output_dir_use_case_1, "data_center_scaling_oracle_approximate.csv")
+            args = {**shared_arguments, **arguments_data_center_scaling, **arguments_oracle_approximate}
+            data_center_scaling_approximate_experiment = MinimizationExperiment(output_filename=output_filename_data_center_scaling_approximate, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(data_center_scaling_approximate_experiment)
+
         if do_client_data_center_scaling:
             output_filename_client_data_center_scaling = os.path.join(output_dir_use_case_1, "client_data_center_scaling_oracle.csv")
             args = {**shared_arguments, **arguments_client_data_center_scaling, **arguments_oracle}
             client_data_center_scaling_experiment = MinimizationExperiment(output_filename=output_filename_client_data_center_scaling, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
             experiments.append(client_data_center_scaling_experiment)
 
+            output_filename_client_data_center_scaling_incremental = os.path.join(output_dir_use_case_1, "client_data_center_scaling_oracle_incremental.csv")
+            args = {**shared_arguments, **arguments_client_data_center_scaling, **arguments_oracle_incremental}
+            client_data_center_scaling_incremental_experiment = MinimizationExperiment(output_filename=output_filename_client_data_center_scaling_incremental, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(client_data_center_scaling_incremental_experiment)
+
+            output_filename_client_data_center_scaling_sparse = os.path.join(output_dir_use_case_1, "client_data_center_scaling_oracle_sparse.csv")
+            args = {**shared_arguments, **arguments_client_data_center_scaling, **arguments_oracle_sparse}
+            client_data_center_scaling_sparse_experiment = MinimizationExperiment(output_filename=output_filename_client_data_center_scaling_sparse, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(client_data_center_scaling_sparse_experiment)
+
+            output_filename_client_data_center_scaling_point_location = os.path.join(output_dir_use_case_1, "client_data_center_scaling_oracle_point_location.csv")
+            args = {**shared_arguments, **arguments_client_data_center_scaling, **arguments_oracle_point_location}
+            client_data_center_scaling_point_location_experiment = MinimizationExperiment(output_filename=output_filename_client_data_center_scaling_point_location, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(client_data_center_scaling_point_location_experiment)
+
+        if do_batch_scaling:
+            output_filename_batch_scaling = os.path.join(output_dir_use_case_1, "batch_scaling_oracle.csv")
+            args = {**shared_arguments, **arguments_oracle, **arguments_batch_scaling}
+            batch_scaling_experiment = MinimizationExperiment(output_filename=output_filename_batch_scaling, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(batch_scaling_experiment)
+
+        if do_micro_batching:
+            output_filename_micro_batching = os.path.join(output_dir_use_case_1, "micro_batching_oracle.csv")
+            args = {**shared_arguments, **arguments_oracle_micro_batched}
+            micro_batching_experiment = MinimizationExperiment(output_filename=output_filename_micro_batching, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(micro_batching_experiment)
+
+        if do_caching:
+            output_filename_caching = os.path.join(output_dir_use_case_1, "caching_oracle.csv")
+            args = {**shared_arguments, **arguments_oracle_cached}
+            caching_experiment = MinimizationExperiment(output_filename=output_filename_caching, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(caching_experiment)
+
+        if do_sharding:
+            output_filename_sharding = os.path.join(output_dir_use_case_1, "sharding_oracle.csv")
+            args = {**shared_arguments, **arguments_oracle_sharded}
+            sharding_experiment = MinimizationExperiment(output_filename=output_filename_sharding, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(sharding_experiment)
+
+        if do_distribution:
+            output_filename_distribution = os.path.join(output_dir_use_case_1, "distribution_oracle.csv")
+            args = {**shared_arguments, **arguments_oracle_distributed}
+            distribution_experiment = MinimizationExperiment(output_filename=output_filename_distribution, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(distribution_experiment)
+
+        if do_precision:
+            output_filename_precision = os.path.join(output_dir_use_case_1, "precision_oracle.csv")
+            args = {**shared_arguments, **arguments_client_data_center_scaling, **arguments_oracle_precision}
+            precision_experiment = MinimizationExperiment(output_filename=output_filename_precision, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(precision_experiment)
+
+            output_filename_precision_quantized = os.path.join(output_dir_use_case_1, "precision_oracle_quantized.csv")
+            args = {**shared_arguments, **arguments_client_data_center_scaling, **arguments_oracle_quantized}
+            precision_quantized_experiment = MinimizationExperiment(output_filename=output_filename_precision_quantized, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(precision_quantized_experiment)
+
+        if do_compile_start:
+            output_filename_compile_start = os.path.join(output_dir_use_case_1, "compile_start_oracle.csv")
+            args = {**shared_arguments, **arguments_oracle_compile_start}
+            compile_start_experiment = MinimizationExperiment(output_filename=output_filename_compile_start, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(compile_start_experiment)
+
+        if do_backends:
+            output_filename_backends = os.path.join(output_dir_use_case_1, "backends_oracle.csv")
+            args = {**shared_arguments, **arguments_oracle_backend}
+            backends_experiment = MinimizationExperiment(output_filename=output_filename_backends, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+            experiments.append(backends_experiment)
+
     if do_ilp:
         if do_data_center_scaling:
             output_filename_data_center_scaling = os.path.join(output_dir_use_case_1, "data_center_scaling_ilp.csv")
@@ -0,0 +1,47 @@
+from enum import Enum
+import torch
+
+from cloud_oracle_prototype.dummy_data import load_latencies
+from cloud_oracle_prototype.precomputation import precompute_oracle
+from cloud_oracle_prototype.experiments.experiment import Experiment
+
+class PrecomputationType(Enum):
+    ENUMERATION = "Enumeration only"
+    FILTERING = "Enumeration and filtering"
+
+class PrecomputationExperiment(Experiment):
+
+    def __init__(self, *, output_filename, num_warmups=1, verbose=0, experiment_args):
+        super().__init__(output_filename=output_filename, num_warmups=num_warmups, verbose=verbose, experiment_args=experiment_args)
+
+    def __str__(self):
+        return self.pretty_str()
+
+    def __repr__(self):
+        return self.__repr__()
+
+    def get_benchmark_args(self):
+        return self.experiment_args
+
+    def get_name(self):
+        return f"Precomputation Experiment"
+
+    def load(self, *, implementation: PrecomputationType, threads, device, dtype, num_data_centers, num_client_data_centers, distance_constraint, block_size=256):
+
+        # Load data as in the Rust precomputation:
+        # All pairs of data centers fulfill the distance constraint, except for the diagonal
+        linear_index = torch.arange(num_data_centers * num_data_centers, device=device).view(num_data_centers, num_data_centers)
+        distances = linear_index + distance_constraint * 2
+        distances.fill_diagonal_(0)
+        # All latencies are identical, s.t., no placement is dominated
+        latencies = load_latencies(num_data_centers=num_data_centers, num_client_data_centers=num_client_data_centers, latency_max=1.0, dtype=torch.float32, device=device)
+
+        # Set number of threads
+        torch.set_num_threads(threads)
+
+        filter_dominated = implementation == PrecomputationType.FILTERING
+
+        # Create workload lambda
+        workload = lambda _: precompute_oracle(latencies=latencies, distances=distances, distance_constraint=distance_constraint, dtype=dtype, filter_dominated=filter_dominated, block_size=block_size)
+
+        return (workload, 1, device)
@@ -0,0 +1,42 @@
+import os
+from typing import List
+import torch
+from cloud_oracle_prototype.experiments.use_case_precomputation.experiment_precomputation import PrecomputationExperiment, PrecomputationType
+
+# Same configuration as the Rust precomputation in precomputation/src/main.rs
+shared_arguments = {
+    "num_iterations": [5],
+    "threads": [40],
+    "device": ["cpu"],
+    "dtype": [torch.float16],
+    "distance_constraint": [200],
+    "num_client_data_centers": [2, 10, 100, 300, 10**3],
+}
+
+arguments_enumeration = {
+    "implementation": [PrecomputationType.ENUMERATION],
+    "num_data_centers": [2, 10, 100, 300, 10**3],
+}
+
+arguments_filtering = {
+    "implementation": [PrecomputationType.FILTERING],
+    "num_data_centers": [2, 10, 100, 300],
+}
+
+def generate_experiments(*, output_dir: str, verbose: int = 1, num_warmups: int = 1) -> List[PrecomputationExperiment]:
+    output_dir_precomputation = os.path.join(output_dir, "precomputation")
+    os.makedirs(output_dir_precomputation, exist_ok=True)
+
+    experiments = []
+
+    output_filename_enumeration = os.path.join(output_dir_precomputation, "precomputation_python_enumeration.csv")
+    args = {**shared_arguments, **arguments_enumeration}
+    enumeration_experiment = PrecomputationExperiment(output_filename=output_filename_enumeration, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(enumeration_experiment)
+
+    output_filename_filtering = os.path.join(output_dir_precomputation, "precomputation_python_filtering.csv")
+    args = {**shared_arguments, **arguments_filtering}
+    filtering_experiment = PrecomputationExperiment(output_filename=output_filename_filtering, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(filtering_experiment)
+
+    return experiments
@@ -1,17 +1,39 @@
+import os
+import tempfile
 from enum import Enum
 from typing import Dict, List, Any
 import torch
 
-from cloud_oracle_prototype.dummy_data import load_planes_with_savings
-from cloud_oracle_prototype.queries.simulation_query import init_query, simulation_query
+from cloud_oracle_prototype.dummy_data import load_planes_with_savings, load_scenarios_with_savings
+from cloud_oracle_prototype.queries.simulation_query import SimulationSession, bootstrap_intervals, init_query, simulation_query
+from cloud_oracle_prototype.queries.backends import select_backend
+from cloud_oracle_prototype.queries import multi_scenario_simulation_query, what_if_simulation_query
+from cloud_oracle_prototype.queries.adaptive_simulation_query import SamplerType, WorkloadSampler, adaptive_simulation_query
+from cloud_oracle_prototype.queries.streaming_simulation_query import generate_chunks, load_chunks, streaming_simulation_query
+from cloud_oracle_prototype.oracle_file import save_oracle
+from cloud_oracle_prototype.sharding import ShardedOracle
+from cloud_oracle_prototype.distributed import DistributedOracle
 from cloud_oracle_prototype.experiments.experiment import Experiment
 from cloud_oracle_prototype.experiments.util import compute_combinations
 
+class SimulationMode(Enum):
+    BATCH = "Batch"
+    STREAMING = "Streaming"
+    CACHED_BASELINE = "Cached baseline"
+    SCENARIO_LOOP = "Scenarios (loop)"
+    MULTI_SCENARIO = "Scenarios (batched)"
+    WHAT_IF = "What-if"
+    ADAPTIVE = "Adaptive"
+
 class SimulationExperiment(Experiment):
     
     def __init__(self, *, output_filename, num_warmups=1, verbose=0, experiment_args):
         super().__init__(output_filename=output_filename, num_warmups=num_warmups, verbose=verbose, keep_results=True, experiment_args=experiment_args)
 
+        self.sharded_oracle = None
+        self.selected_backend = None
+        self.metrics = {}
+
     def __str__(self):
         return self.pretty_str()
         
@@ -23,8 +45,33 @@ class SimulationExperiment(Experiment):
     
     def get_name(self):
         return f"Simulation Experiment"
+
+    def get_metrics(self):
+        if self.selected_backend is None:
+            return self.metrics
+        return {**self.metrics, "selected_backend": self.selected_backend.value}
+
+    def cleanup(self):
+        self._stop_sharded_oracle()
+
+    def _stop_sharded_oracle(self):
+        if self.sharded_oracle is not None:
+            self.sharded_oracle.stop()
+            self.sharded_oracle = None
         
-    def load(self,*, threads, batch_size, device, dtype, num_data_centers, num_data_centers_other, num_client_data_centers, percent_data_centers_A: float, percent_data_centers_B: float, percent_change_A: float, percent_change_B: float, seed = 42):
+    def load(self,*, threads, batch_size, device, dtype, num_data_centers, num_data_centers_other, num_client_data_centers, percent_data_centers_A: float, percent_data_centers_B: float, percent_change_A: float, percent_change_B: float, num_workers: int = None, num_nodes: int = None, backend = None, mode: SimulationMode = SimulationMode.BATCH, chunk_size: int = None, sketch_k: int = 200, num_scenarios: int = 1, num_changed_columns: int = None, sampler: SamplerType = SamplerType.NORMAL, round_size: int = None, target_width: float = None, num_bootstrap: int = 0, trace: str = None, seed = 42):
+
+        # Stop the workers or nodes of the previous arguments
+        self._stop_sharded_oracle()
+        self.selected_backend = None
+        self.metrics = {}
+
+        # Bootstrap intervals require the ratios of a single trace in the outputs
+        if num_bootstrap > 0 and mode not in [SimulationMode.BATCH, SimulationMode.CACHED_BASELINE, SimulationMode.WHAT_IF]:
+            raise ValueError(f"Bootstrap intervals are not supported in mode {mode.value}")
+
+        if mode in [SimulationMode.SCENARIO_LOOP, SimulationMode.MULTI_SCENARIO]:
+            return self._load_scenarios(threads=threads, batch_size=batch_size, device=device, dtype=dtype, num_data_centers=num_data_centers, num_data_centers_other=num_data_centers_other, num_client_data_centers=num_client_data_centers, percent_data_centers_A=percent_data_centers_A, percent_data_centers_B=percent_data_centers_B, percent_change_A=percent_change_A, percent_change_B=percent_change_B, num_scenarios=num_scenarios, batched=mode == SimulationMode.MULTI_SCENARIO)
 
         # Load data
         num_params = num_client_data_centers * 2
@@ -36,13 +83,118 @@ class SimulationExperiment(Experiment):
         # Set number of threads
         torch.set_num_threads(threads)
 
+        if mode == SimulationMode.STREAMING:
+            # The batch size is the length of the trace, which is generated or read from the trace file chunk by chunk
+            def simulate():
+                if trace is None:
+                    chunks = generate_chunks(num_samples=batch_size, chunk_size=chunk_size, num_params=num_params, device=device, dtype=dtype, seed=seed)
+                else:
+                    chunks = load_chunks(trace, chunk_size=chunk_size, device=device, dtype=dtype)
+                (percentiles, rank_error, _) = streaming_simulation_query(planes=planes, planes_other=planes_other, chunks=chunks, k=sketch_k)
+                self.metrics = {"rank_error": rank_error}
+                return percentiles
+
+            workload = lambda _: simulate()
+            return (workload, batch_size, device)
+
+        if mode == SimulationMode.ADAPTIVE:
+            # The batch size is the maximum length of the trace, which is drawn in rounds until the percentiles converged
+            def simulate():
+                workload_sampler = WorkloadSampler(sampler=sampler, num_params=num_params, device=device, dtype=dtype, seed=seed)
+                (percentiles, intervals, num_samples) = adaptive_simulation_query(planes=planes, planes_other=planes_other, sampler=workload_sampler, round_size=round_size, max_samples=batch_size, target_width=target_width)
+                self.metrics = {"num_samples": num_samples, "samples_saved": batch_size - num_samples, "interval_width": max(upper - lower for (lower, upper) in intervals)}
+                return percentiles
+
+            workload = lambda _: simulate()
+            return (workload, batch_size, device)
+
         # Initialize query state
-        (outputs, inputs)= init_query(planes=planes, planes_other=planes_other, batch_size=batch_size, num_params=num_params, device=device, dtype=dtype)
+        (outputs, inputs)= init_query(planes=planes, planes_other=planes_other, batch_size=batch_size, num_params=num_params, device=device, dtype=dtype, trace=trace)
+
+        if mode == SimulationMode.WHAT_IF:
+            # Scale the first columns of the other planes by the change of data centers A, relative to the unchanged other planes
+            (costs, baseline, outputs) = what_if_simulation_query.init_query(planes=planes_other, inputs=inputs)
+            columns = torch.arange(num_changed_columns, device=device)
+            deltas = what_if_simulation_query.scale_columns(planes=planes_other, columns=columns, scale=percent_change_A)
+            def simulate():
+                return what_if_simulation_query.what_if_simulation_query(costs=costs, baseline=baseline, inputs=inputs, columns=columns, deltas=deltas, outputs=outputs)
+        elif mode == SimulationMode.CACHED_BASELINE:
+            # Evaluating a scenario of new planes reuses the baseline of the trace with the other planes
+            session = SimulationSession(planes_other=planes_other, inputs=inputs)
+            def simulate():
+                return session.simulate(planes=planes, outputs=outputs)
+        elif num_nodes is not None:
+            # Launch every node as a local process, which loads its shards from the oracle files
+            with tempfile.TemporaryDirectory() as temp_dir:
+                oracle_filename = os.path.join(temp_dir, "oracle.bin")
+                oracle_other_filename = os.path.join(temp_dir, "oracle_other.bin")
+                save_oracle(oracle_filename, planes=planes, as_planes=True)
+                save_oracle(oracle_other_filename, planes=planes_other, as_planes=True)
+
+                self.sharded_oracle = DistributedOracle.launch_local(oracle_filename=oracle_filename, oracle_other_filename=oracle_other_filename, num_nodes=num_nodes, device=device, threads_per_node=max(1, threads // num_nodes), batch_sizes=[batch_size])
+                self.sharded_oracle.start()
+
+            oracle = self.sharded_oracle
+            def simulate():
+                return oracle.simulation_query(inputs=inputs, outputs=outputs)
+        elif backend is not None:
+            # Given or autotuned backend
+            (query_backend, self.selected_backend) = select_backend(backend, run=lambda instance: instance.simulation_query(planes=planes, planes_other=planes_other, inputs=inputs, outputs=outputs), device=device)
+            def simulate():
+                return query_backend.simulation_query(planes=planes, planes_other=planes_other, inputs=inputs, outputs=outputs)
+        elif num_workers is None:
+            def simulate():
+                return simulation_query(planes=planes, planes_other=planes_other, inputs=inputs, outputs=outputs)
+        else:
+            # Split the planes and the threads among worker processes
+            assert device == "cpu", "Sharded oracle only runs on the CPU"
+            self.sharded_oracle = ShardedOracle(planes=planes, planes_other=planes_other, num_workers=num_workers, max_batch_size=batch_size, threads_per_worker=max(1, threads // num_workers))
+            self.sharded_oracle.start()
+
+            oracle = self.sharded_oracle
+            def simulate():
+                return oracle.simulation_query(inputs=inputs, outputs=outputs)
 
-        def simulate():
-            return simulation_query(planes=planes, planes_other=planes_other, inputs=inputs, outputs=outputs)
+        if num_bootstrap > 0:
+            # Bootstrap intervals of the percentiles from the ratios, which every backend and oracle of these modes writes to the outputs
+            simulate_percentiles = simulate
+            def simulate():
+                percentiles = simulate_percentiles()
+                intervals = bootstrap_intervals(outputs, num_bootstrap=num_bootstrap)
+                self.metrics = {"interval_width": max(upper - lower for (lower, upper) in intervals)}
+                return percentiles
         
         # Create workload lambda
         workload = lambda _: simulate()
 
-        return (workload, batch_size, device)
\ No newline at end of file
+        return (workload, batch_size, device)
+
+    def _load_scenarios(self, *, threads, batch_size, device, dtype, num_data_centers, num_data_centers_other, num_client_data_centers, percent_data_centers_A: float, percent_data_centers_B: float, percent_change_A: float, percent_change_B: float, num_scenarios: int, batched: bool):
+
+        # Load scenarios, which vary the change of data centers A between the change of B and A
+        num_params = num_client_data_centers * 2
+        num_functions = compute_combinations(num_data_centers, 2)
+        num_functions_other = compute_combinations(num_data_centers_other, 2)
+
+        percent_changes_A = torch.linspace(percent_change_B, percent_change_A, num_scenarios).tolist()
+        percent_changes_B = [percent_change_B] * num_scenarios
+        planes, planes_other = load_scenarios_with_savings(num_functions=num_functions, num_functions_other=num_functions_other, num_params=num_params, device=device, dtype=dtype, percent_data_centers_A=percent_data_centers_A, percent_data_centers_B=percent_data_centers_B, percent_changes_A=percent_changes_A, percent_changes_B=percent_changes_B)
+
+        # Set number of threads
+        torch.set_num_threads(threads)
+
+        # Initialize query state, where the baseline of the trace is shared by all scenarios
+        (outputs, inputs) = multi_scenario_simulation_query.init_query(planes=planes, planes_other=planes_other, batch_size=batch_size, num_params=num_params, device=device, dtype=dtype)
+        session = SimulationSession(planes_other=planes_other, inputs=inputs)
+
+        if batched:
+            def simulate():
+                return multi_scenario_simulation_query.multi_scenario_simulation_query(planes=planes, baseline=session.get_baseline(), inputs=inputs, outputs=outputs)
+        else:
+            def simulate():
+                return [session.simulate(planes=planes[scenario], outputs=outputs[scenario].view(-1, 1)) for scenario in range(num_scenarios)]
+
+        # Create workload lambda
+        workload = lambda _: simulate()
+
+        return (workload, batch_size, device)
@@ -2,7 +2,9 @@ import os
 from typing import List
 import torch
 
-from cloud_oracle_prototype.experiments.use_case_simulation.experiment_simulation import SimulationExperiment
+from cloud_oracle_prototype.experiments.use_case_simulation.experiment_simulation import SimulationExperiment, SimulationMode
+from cloud_oracle_prototype.queries.backends import BackendType
+from cloud_oracle_prototype.queries.adaptive_simulation_query import SamplerType
 
 shared_arguments = {
     "threads": [40],
@@ -19,6 +21,75 @@ shared_arguments = {
     "num_iterations": [1],
 }
 
+# Scaling over the number of worker processes on the CPU
+arguments_sharded = {
+    "batch_size": [1, 10**2, 10**3],
+    "device": ["cpu"],
+    "dtype": [torch.float32],
+    "num_workers": [1, 2, 4, 8, 16, 32, 40],
+}
+
+# Scaling over the number of nodes, which are launched as local processes
+arguments_distributed = {
+    "batch_size": [1, 10**2, 10**3],
+    "device": ["cpu"],
+    "dtype": [torch.float32],
+    "num_nodes": [1, 2, 4, 8],
+}
+
+# Compare the backends on the CPU
+arguments_backend = {
+    "device": ["cpu"],
+    "dtype": [torch.float32],
+    "backend": [BackendType.COMPILED, BackendType.EAGER, BackendType.NUMPY, BackendType.AUTO],
+}
+
+# Traces beyond the largest batch, which are consumed in chunks into a quantile sketch
+arguments_streaming = {
+    "batch_size": [10**4, 10**5, 10**6, 10**7],
+    "mode": [SimulationMode.STREAMING],
+    "chunk_size": [10**4, 10**5],
+    "sketch_k": [200],
+}
+
+# Scenario sweeps, where the baseline of the trace is computed once
+arguments_cached_baseline = {
+    "mode": [SimulationMode.BATCH, SimulationMode.CACHED_BASELINE],
+}
+
+# Scenario planning with a loop over the scenarios or a single batched pass
+arguments_scenarios = {
+    "batch_size": [10**2, 10**3],
+    "mode": [SimulationMode.SCENARIO_LOOP, SimulationMode.MULTI_SCENARIO],
+    "num_scenarios": [1, 8, 32],
+}
+
+# What-if changes of few to all columns, compared to the full simulation
+arguments_what_if = {
+    "batch_size": [10**2, 10**3],
+    "mode": [SimulationMode.WHAT_IF],
+    "num_changed_columns": [2, 20, 180, 600],
+}
+
+# Adaptive number of samples up to the batch size, compared to the fixed batch size of the baseline
+arguments_adaptive_baseline = {
+    "batch_size": [10**4, 10**5, 10**6],
+    "mode": [SimulationMode.BATCH],
+}
+
+arguments_adaptive = {
+    "batch_size": [10**4, 10**5, 10**6],
+    "mode": [SimulationMode.ADAPTIVE],
+    "sampler": [SamplerType.SOBOL, SamplerType.NORMAL],
+    "round_size": [10**3],
+    "target_width": [0.01, 0.001],
+}
+
+# Overhead of bootstrap confidence intervals over the plain simulation
+arguments_bootstrap = {
+    "num_bootstrap": [0, 100, 1000],
+}
+
 def generate_experiments(*, output_dir, num_warmups=1, verbose=0) -> List[SimulationExperiment]:
     output_dir_use_case_1 = os.path.join(output_dir, "use_case_simulation")
     os.makedirs(output_dir_use_case_1, exist_ok=True)
@@ -30,4 +101,54 @@ def generate_experiments(*, output_dir, num_warmups=1, verbose=0) -> List[Simula
     experiment = SimulationExperiment(output_filename=output_filename, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
     experiments.append(experiment)
 
+    output_filename_sharded = os.path.join(output_dir_use_case_1, "simulation_sharded.csv")
+    args = {**shared_arguments, **arguments_sharded}
+    experiment_sharded = SimulationExperiment(output_filename=output_filename_sharded, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(experiment_sharded)
+
+    output_filename_distributed = os.path.join(output_dir_use_case_1, "simulation_distributed.csv")
+    args = {**shared_arguments, **arguments_distributed}
+    experiment_distributed = SimulationExperiment(output_filename=output_filename_distributed, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(experiment_distributed)
+
+    output_filename_backend = os.path.join(output_dir_use_case_1, "simulation_backend.csv")
+    args = {**shared_arguments, **arguments_backend}
+    experiment_backend = SimulationExperiment(output_filename=output_filename_backend, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(experiment_backend)
+
+    output_filename_streaming = os.path.join(output_dir_use_case_1, "simulation_streaming.csv")
+    args = {**shared_arguments, **arguments_streaming}
+    experiment_streaming = SimulationExperiment(output_filename=output_filename_streaming, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(experiment_streaming)
+
+    output_filename_cached_baseline = os.path.join(output_dir_use_case_1, "simulation_cached_baseline.csv")
+    args = {**shared_arguments, **arguments_cached_baseline}
+    experiment_cached_baseline = SimulationExperiment(output_filename=output_filename_cached_baseline, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(experiment_cached_baseline)
+
+    output_filename_scenarios = os.path.join(output_dir_use_case_1, "simulation_scenarios.csv")
+    args = {**shared_arguments, **arguments_scenarios}
+    experiment_scenarios = SimulationExperiment(output_filename=output_filename_scenarios, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(experiment_scenarios)
+
+    output_filename_what_if = os.path.join(output_dir_use_case_1, "simulation_what_if.csv")
+    args = {**shared_arguments, **arguments_what_if}
+    experiment_what_if = SimulationExperiment(output_filename=output_filename_what_if, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(experiment_what_if)
+
+    output_filename_adaptive_baseline = os.path.join(output_dir_use_case_1, "simulation_adaptive_baseline.csv")
+    args = {**shared_arguments, **arguments_adaptive_baseline}
+    experiment_adaptive_baseline = SimulationExperiment(output_filename=output_filename_adaptive_baseline, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(experiment_adaptive_baseline)
+
+    output_filename_adaptive = os.path.join(output_dir_use_case_1, "simulation_adaptive.csv")
+    args = {**shared_arguments, **arguments_adaptive}
+    experiment_adaptive = SimulationExperiment(output_filename=output_filename_adaptive, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(experiment_adaptive)
+
+    output_filename_bootstrap = os.path.join(output_dir_use_case_1, "simulation_bootstrap.csv")
+    args = {**shared_arguments, **arguments_bootstrap}
+    experiment_bootstrap = SimulationExperiment(output_filename=output_filename_bootstrap, num_warmups=num_warmups, verbose=verbose, experiment_args=args)
+    experiments.append(experiment_bootstrap)
+
     return experiments
\ No newline at end of file
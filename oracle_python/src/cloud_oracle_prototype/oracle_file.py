@@ -0,0 +1,165 @@
+import json
+import mmap
+import struct
+import torch
+
+# File layout: magic, version, header length, JSON header, and the 64-byte aligned planes and pairs
+ORACLE_FILE_MAGIC = b"CLORACLE"
+ORACLE_FILE_VERSION = 1
+ORACLE_FILE_ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sII")
+
+def _align(offset: int) -> int:
+    return (offset + ORACLE_FILE_ALIGNMENT - 1) // ORACLE_FILE_ALIGNMENT * ORACLE_FILE_ALIGNMENT
+
+def _dtype_to_str(dtype: torch.dtype) -> str:
+    return str(dtype).replace("torch.", "")
+
+def _str_to_dtype(name: str) -> torch.dtype:
+    dtype = getattr(torch, name, None)
+    if not isinstance(dtype, torch.dtype):
+        raise ValueError(f"Unknown data type {name}")
+    return dtype
+
+def _tensor_bytes(tensor: torch.Tensor):
+    # Raw bytes of the tensor in memory order, also for data types without numpy equivalent, e.g., bfloat16
+    return tensor.detach().cpu().contiguous().view(-1).view(torch.uint8).numpy()
+
+def save_oracle(filename: str, *, planes: torch.Tensor, pairs: torch.Tensor = None, as_planes: bool = False, normalized: bool = False, **metadata):
+    """
+    Saves the oracle in the versioned on-disk format, which can be loaded without copying by `load_oracle`.
+
+    Args:
+        filename (str): The path of the oracle file.
+        planes (torch.Tensor): The planes of the decisions, shape (num_functions, num_params).
+        pairs (torch.Tensor): The data center pair of each decision, shape (num_functions, 2).
+        as_planes (bool): Whether the planes contain the additional dimension of planes.
+        normalized (bool): Whether the planes are normalized.
+        **metadata: Additional JSON-serializable metadata, e.g., the number of data centers.
+    """
+    assert planes.dim() == 2, f"Planes has shape {planes.shape} but should have shape (num_functions, num_params)"
+    if pairs is not None:
+        assert pairs.shape == (planes.shape[0], 2), f"Pairs has shape {pairs.shape} but should have shape {(planes.shape[0], 2)}"
+
+    header = {
+        "version": ORACLE_FILE_VERSION,
+        "dtype": _dtype_to_str(planes.dtype),
+        "num_functions": planes.shape[0],
+        "num_params": planes.shape[1],
+        "as_planes": as_planes,
+        "normalized": normalized,
+        "pairs_dtype": _dtype_to_str(pairs.dtype) if pairs is not None else None,
+        "metadata": metadata,
+    }
+
+    # Reserve space in the header for the offsets of the sections, which depend on the length of the header itself
+    header["planes_offset"] = 0
+    header["pairs_offset"] = 0
+    header_length = len(json.dumps(header).encode("utf-8")) + 64
+    planes_offset = _align(_PREAMBLE.size + header_length)
+    planes_nbytes = planes.numel() * planes.element_size()
+    pairs_offset = _align(planes_offset + planes_nbytes)
+    header["planes_offset"] = planes_offset
+    header["pairs_offset"] = pairs_offset if pairs is not None else None
+
+    header_bytes = json.dumps(header).encode("utf-8").ljust(header_length, b" ")
+
+    with open(filename, "wb") as f:
+        f.write(_PREAMBLE.pack(ORACLE_FILE_MAGIC, ORACLE_FILE_VERSION, header_length))
+        f.write(header_bytes)
+        f.seek(planes_offset)
+        f.write(_tensor_bytes(planes))
+        if pairs is not None:
+            f.seek(pairs_offset)
+            f.write(_tensor_bytes(pairs))
+
+def load_oracle_header(filename: str) -> dict:
+    """
+    Reads the header of an oracle file.
+
+    Args:
+        filename (str): The path of the oracle file.
+
+    Returns:
+        dict: The header with data type, shapes, offsets, flags, and metadata.
+    """
+    with open(filename, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError(f"File {filename} is not an oracle file")
+        magic, version, header_length = _PREAMBLE.unpack(preamble)
+        if magic != ORACLE_FILE_MAGIC:
+            raise ValueError(f"File {filename} is not an oracle file")
+        if version != ORACLE_FILE_VERSION:
+            raise ValueError(f"Oracle file {filename} has version {version}, but only version {ORACLE_FILE_VERSION} is supported")
+        return json.loads(f.read(header_length).decode("utf-8"))
+
+def load_oracle(filename: str, *, device: torch.device = None) -> (torch.Tensor, torch.Tensor, dict):
+    """
+    Loads an oracle file by memory-mapping it and wrapping the planes and pairs as tensors without copying.
+
+    The file is mapped copy-on-write, hence all processes loading the same file share its page-cached copy,
+    while in-place modifications of the planes, e.g., by the drift queries, remain private to a process.
+
+    Args:
+        filename (str): The path of the oracle file.
+        device (torch.device): If set to a non-CPU device, the planes and pairs are copied to this device.
+
+    Returns:
+        (planes, pairs, header): The planes, the data center pairs or None, and the header of the oracle.
+    """
+    header = load_oracle_header(filename)
+
+    with open(filename, "rb") as f:
+        # The mapping stays valid after closing the file and is kept alive by the tensors
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    num_functions = header["num_functions"]
+    num_params = header["num_params"]
+    planes = torch.frombuffer(buffer, dtype=_str_to_dtype(header["dtype"]), count=num_functions * num_params, offset=header["planes_offset"])
+    planes = planes.view(num_functions, num_params)
+
+    pairs = None
+    if header["pairs_offset"] is not None:
+        pairs = torch.frombuffer(buffer, dtype=_str_to_dtype(header["pairs_dtype"]), count=num_functions * 2, offset=header["pairs_offset"])
+        pairs = pairs.view(num_functions, 2)
+
+    if device is not None and torch.device(device).type != "cpu":
+        planes = planes.to(device)
+        pairs = pairs.to(device) if pairs is not None else None
+
+    return (planes, pairs, header)
+
+def load_oracle_rows(filename: str, *, start: int, stop: int, device: torch.device = None) -> (torch.Tensor, dict):
+    """
+    Loads the planes of the decisions start to stop of an oracle file by memory-mapping only their part of the file, e.g., the shard of a node.
+
+    Args:
+        filename (str): The path of the oracle file.
+        start (int): The index of the first decision.
+        stop (int): The index after the last decision.
+        device (torch.device): If set to a non-CPU device, the planes are copied to this device.
+
+    Returns:
+        (planes, header): The planes of the decisions, shape (stop - start, num_params), and the header of the oracle.
+    """
+    header = load_oracle_header(filename)
+    assert 0 <= start <= stop <= header["num_functions"], f"Rows {start} to {stop} are out of range for {header['num_functions']} decisions"
+
+    dtype = _str_to_dtype(header["dtype"])
+    num_params = header["num_params"]
+    row_nbytes = num_params * torch.empty((), dtype=dtype).element_size()
+    if start == stop:
+        return (torch.empty((0, num_params), dtype=dtype, device=device), header)
+
+    # The offset of a mapping must be a multiple of the allocation granularity
+    begin = header["planes_offset"] + start * row_nbytes
+    map_offset = begin - begin % mmap.ALLOCATIONGRANULARITY
+    with open(filename, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), begin - map_offset + (stop - start) * row_nbytes, access=mmap.ACCESS_COPY, offset=map_offset)
+
+    planes = torch.frombuffer(buffer, dtype=dtype, count=(stop - start) * num_params, offset=begin - map_offset).view(stop - start, num_params)
+    if device is not None and torch.device(device).type != "cpu":
+        planes = planes.to(device)
+
+    return (planes, header)
@@ -0,0 +1,117 @@
+import torch
+
+def enumerate_data_center_pairs(*, num_data_centers: int, device: torch.device) -> torch.Tensor:
+    """
+    Enumerates all pairs of distinct data centers as placement decisions.
+
+    Args:
+        num_data_centers (int): The number of data centers.
+        device (torch.device): The device of the pairs.
+
+    Returns:
+        torch.Tensor: The data center pairs (d_0, d_1) with d_0 < d_1, shape (num_functions, 2).
+    """
+    return torch.combinations(torch.arange(num_data_centers, device=device), r=2)
+
+def apply_distance_constraint(*, pairs: torch.Tensor, distances: torch.Tensor, distance_constraint: float) -> torch.Tensor:
+    """
+    Keeps the pairs of data centers that are further apart than the distance constraint.
+
+    Args:
+        pairs (torch.Tensor): The data center pairs, shape (num_functions, 2).
+        distances (torch.Tensor): The distances between data centers, shape (num_data_centers, num_data_centers).
+        distance_constraint (float): The minimum distance between the data centers of a pair.
+
+    Returns:
+        torch.Tensor: The valid data center pairs.
+    """
+    is_valid = distances[pairs[:, 0], pairs[:, 1]] > distance_constraint
+    return pairs[is_valid]
+
+def compute_planes(*, latencies: torch.Tensor, pairs: torch.Tensor, as_planes: bool = False) -> torch.Tensor:
+    """
+    Computes the planes of the placement decisions from the latency matrix.
+
+    The planes interleave the write latency, i.e., the maximum latency to both data centers of a pair,
+    and the read latency, i.e., the minimum latency to either data center, of each client data center.
+
+    Args:
+        latencies (torch.Tensor): The latencies between data centers and client data centers, shape (num_data_centers, num_client_data_centers).
+        pairs (torch.Tensor): The data center pairs, shape (num_functions, 2).
+        as_planes (bool): Add a zero intercept as the additional dimension of planes.
+
+    Returns:
+        torch.Tensor: The planes, shape (num_functions, 2 * num_client_data_centers [+ 1]).
+    """
+    latencies_0 = latencies[pairs[:, 0]]
+    latencies_1 = latencies[pairs[:, 1]]
+
+    num_params = 2 * latencies.shape[1]
+    if as_planes:
+        num_params += 1
+
+    planes = torch.zeros((pairs.shape[0], num_params), dtype=latencies.dtype, device=latencies.device)
+    planes[:, 0:2 * latencies.shape[1]:2] = torch.maximum(latencies_0, latencies_1)
+    planes[:, 1:2 * latencies.shape[1]:2] = torch.minimum(latencies_0, latencies_1)
+
+    return planes
+
+def find_dominated(*, planes: torch.Tensor, block_size: int = 256) -> torch.Tensor:
+    """
+    Finds the decisions that are dominated by any other decision by a blocked all-to-all comparison.
+
+    A decision is dominated if another decision has at most its latency for every client data center
+    and strictly lower latency for at least one. For nonnegative workloads, a dominated decision is never the unique minimum.
+    Decisions with identical planes do not dominate each other.
+
+    Args:
+        planes (torch.Tensor): The planes of the decisions, shape (num_functions, num_params).
+        block_size (int): The number of decisions compared at once per side, i.e., the memory is O(block_size^2 * num_params).
+
+    Returns:
+        torch.Tensor: A mask of dominated decisions, shape (num_functions,).
+    """
+    num_functions = planes.shape[0]
+    is_dominated = torch.zeros((num_functions,), dtype=torch.bool, device=planes.device)
+
+    for start in range(0, num_functions, block_size):
+        end = min(start + block_size, num_functions)
+        candidates = planes[start:end].unsqueeze(1)
+
+        for other_start in range(0, num_functions, block_size):
+            other_end = min(other_start + block_size, num_functions)
+            others = planes[other_start:other_end].unsqueeze(0)
+
+            # Shape (block_size, block_size): Whether the other decision dominates the candidate
+            dominates = (others <= candidates).all(dim=2) & (others < candidates).any(dim=2)
+            is_dominated[start:end] |= dominates.any(dim=1)
+
+    return is_dominated
+
+def precompute_oracle(*, latencies: torch.Tensor, distances: torch.Tensor, distance_constraint: float, dtype: torch.dtype, as_planes: bool = False, filter_dominated: bool = True, block_size: int = 256) -> (torch.Tensor, torch.Tensor):
+    """
+    Precomputes the oracle for placing an object in two data centers that minimizes the latency for writing to both and reading from either.
+
+    Args:
+        latencies (torch.Tensor): The latencies between data centers and client data centers, shape (num_data_centers, num_client_data_centers).
+        distances (torch.Tensor): The distances between data centers, shape (num_data_centers, num_data_centers).
+        distance_constraint (float): The minimum distance between the data centers of a placement.
+        dtype (torch.dtype): The data type of the planes.
+        as_planes (bool): Add a zero intercept as the additional dimension of planes.
+        filter_dominated (bool): Remove placements that are dominated by another placement.
+        block_size (int): The block size of the dominance filter.
+
+    Returns:
+        (planes, pairs): The planes of the placements and their data center pairs, which are the inputs of the queries.
+    """
+    pairs = enumerate_data_center_pairs(num_data_centers=latencies.shape[0], device=latencies.device)
+    pairs = apply_distance_constraint(pairs=pairs, distances=distances, distance_constraint=distance_constraint)
+
+    if filter_dominated:
+        # Compare without the intercept, which is identical for all placements
+        is_dominated = find_dominated(planes=compute_planes(latencies=latencies, pairs=pairs), block_size=block_size)
+        pairs = pairs[~is_dominated]
+
+    planes = compute_planes(latencies=latencies, pairs=pairs, as_planes=as_planes).to(dtype)
+
+    return (planes, pairs)
@@ -0,0 +1,87 @@
+import socket
+import struct
+import torch
+
+# Operations of the binary protocol between clients and the oracle daemon or the shards of a distributed oracle
+OP_MINIMIZE = 1
+OP_SIMULATE = 2
+OP_DIRECTED_DRIFT = 3
+OP_CONSERVATIVE_DRIFT = 4
+# Minimum cost of each workload with the planes and the other planes, which are reduced across the shards of a distributed oracle
+OP_PARTIAL_SIMULATE = 5
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# Request: operation, number of rows and columns of the float32 payload
+REQUEST_HEADER = struct.Struct("<BII")
+# Response: status, latency of the query in nanoseconds, length of the payload in bytes
+RESPONSE_HEADER = struct.Struct("<BQI")
+
+def recv_exact(sock: socket.socket, num_bytes: int) -> bytearray:
+    """
+    Receives exactly num_bytes from the socket.
+
+    Returns:
+        bytearray: The received bytes, or None if the connection was closed before the first byte.
+    """
+    buffer = bytearray(num_bytes)
+    view = memoryview(buffer)
+    received = 0
+    while received < num_bytes:
+        count = sock.recv_into(view[received:], num_bytes - received)
+        if count == 0:
+            if received == 0:
+                return None
+            raise ConnectionError(f"Connection closed after {received} of {num_bytes} bytes")
+        received += count
+    return buffer
+
+def encode_tensor(tensor: torch.Tensor, dtype: torch.dtype = torch.float32) -> bytes:
+    return tensor.detach().to(device="cpu", dtype=dtype).contiguous().numpy().tobytes()
+
+def decode_tensor(buffer, *, dtype: torch.dtype = torch.float32, shape=None, offset: int = 0, count: int = -1) -> torch.Tensor:
+    tensor = torch.frombuffer(buffer, dtype=dtype, offset=offset, count=count)
+    if shape is not None:
+        tensor = tensor.view(shape)
+    return tensor
+
+def send_request(sock: socket.socket, *, opcode: int, values: torch.Tensor):
+    rows, cols = values.shape
+    sock.sendall(REQUEST_HEADER.pack(opcode, rows, cols) + encode_tensor(values))
+
+def recv_request(sock: socket.socket):
+    """
+    Receives a request.
+
+    Returns:
+        (opcode, values): The operation and the values of shape (rows, cols), or None if the connection was closed.
+    """
+    header = recv_exact(sock, REQUEST_HEADER.size)
+    if header is None:
+        return None
+    opcode, rows, cols = REQUEST_HEADER.unpack(header)
+    payload = recv_exact(sock, rows * cols * 4) if rows * cols > 0 else bytearray()
+    if payload is None:
+        raise ConnectionError("Connection closed before the payload of the request")
+    values = decode_tensor(payload, shape=(rows, cols)) if rows * cols > 0 else torch.empty((rows, cols), dtype=torch.float32)
+    return (opcode, values)
+
+def send_response(sock: socket.socket, *, status: int, latency_ns: int, payload: bytes):
+    sock.sendall(RESPONSE_HEADER.pack(status, latency_ns, len(payload)) + payload)
+
+def recv_response(sock: socket.socket):
+    """
+    Receives a response and raises a RuntimeError if the request failed.
+
+    Returns:
+        (payload, latency_ns): The payload of the response and the latency of the query.
+    """
+    header = recv_exact(sock, RESPONSE_HEADER.size)
+    if header is None:
+        raise ConnectionError("Connection closed before the response")
+    status, latency_ns, length = RESPONSE_HEADER.unpack(header)
+    payload = recv_exact(sock, length) if length > 0 else bytearray()
+    if status != STATUS_OK:
+        raise RuntimeError(f"Request failed: {payload.decode('utf-8')}")
+    return (payload, latency_ns)
@@ -0,0 +1,101 @@
+import math
+import numpy as np
+import torch
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch of Karnin, Lang, and Liberty (KLL) with O(k log(n/k)) memory.
+
+    Values are appended to the compactor of level 0. Whenever the sketch exceeds its capacity, the lowest full compactor
+    is sorted and every other value is promoted to the next level with twice the weight, starting at a random offset.
+    Lower levels have geometrically smaller capacities, s.t., the rank error is dominated by the top levels.
+    """
+
+    def __init__(self, *, k: int = 200, seed: int = 42):
+        """
+        Args:
+            k (int): The capacity of the top compactor, which controls the rank error.
+            seed (int): The seed of the random offsets of the compactions.
+        """
+        assert k >= 8, "k must be at least 8"
+        self.k = k
+        self.generator = np.random.default_rng(seed)
+        self.compactors = [np.empty(0)]
+        self.num_values = 0
+
+    def update(self, values):
+        """
+        Adds a batch of values, e.g., the savings ratios of a chunk of the trace.
+
+        Args:
+            values: The values as tensor or array of any shape.
+        """
+        if isinstance(values, torch.Tensor):
+            values = values.detach().to(device="cpu", dtype=torch.float64).numpy()
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self.num_values += values.shape[0]
+        self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        """
+        Merges another sketch into this sketch, e.g., of another chunk of the trace processed in parallel.
+        """
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        for level, compactor in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], compactor])
+        self.num_values += other.num_values
+        self._compress()
+
+    def quantiles(self, quantiles) -> list:
+        """
+        Returns the approximate values at the given quantiles, which are between 0 and 1.
+        """
+        assert self.num_values > 0, "Sketch is empty"
+
+        values = np.concatenate(self.compactors)
+        weights = np.concatenate([np.full(compactor.shape[0], 2 ** level, dtype=np.float64) for level, compactor in enumerate(self.compactors)])
+        order = np.argsort(values, kind="stable")
+        values = values[order]
+        cumulative_weights = np.cumsum(weights[order])
+
+        # First value whose rank reaches the quantile
+        positions = np.searchsorted(cumulative_weights, np.asarray(quantiles) * cumulative_weights[-1], side="left")
+        positions = np.minimum(positions, values.shape[0] - 1)
+        return values[positions].tolist()
+
+    def rank_error(self) -> float:
+        """
+        Returns the normalized rank error of the quantiles with 99% confidence, i.e., the returned value of quantile q
+        has a rank between q - error and q + error. The sketch is exact as long as it has not been compacted.
+        """
+        if len(self.compactors) == 1:
+            return 0.0
+        return 2.296 / self.k ** 0.9723
+
+    def num_retained(self) -> int:
+        return sum(compactor.shape[0] for compactor in self.compactors)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _compress(self):
+        while self.num_retained() > sum(self._capacity(level) for level in range(len(self.compactors))):
+            for level, compactor in enumerate(self.compactors):
+                if compactor.shape[0] >= self._capacity(level):
+                    break
+
+            if level + 1 == len(self.compactors):
+                self.compactors.append(np.empty(0))
+
+            # Keep one value at this level if the number of values is odd
+            compactor = np.sort(compactor)
+            remaining = compactor[:compactor.shape[0] % 2]
+            compactor = compactor[compactor.shape[0] % 2:]
+
+            offset = int(self.generator.integers(2))
+            self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], compactor[offset::2]])
+            self.compactors[level] = remaining
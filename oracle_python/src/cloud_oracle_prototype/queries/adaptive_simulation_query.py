@@ -0,0 +1,136 @@
+import math
+from enum import Enum
+import torch
+
+from cloud_oracle_prototype.queries.streaming_simulation_query import _simulation_ratios
+
+class SamplerType(Enum):
+    SOBOL = "sobol"
+    NORMAL = "normal"
+    EXPONENTIAL = "exponential"
+
+class WorkloadSampler:
+    """
+    Draws workloads in rounds, either quasi-randomly from a scrambled Sobol sequence transformed to the normal distribution of
+    `simulation_query.init_query`, or pseudo-randomly from the normal or exponential distribution.
+    """
+
+    def __init__(self, *, sampler: SamplerType, num_params: int, device: torch.device, dtype: torch.dtype, mean: float = 1000, std: float = 100, seed: int = 42):
+        self.sampler = sampler
+        self.num_params = num_params
+        self.device = device
+        self.dtype = dtype
+        self.mean = mean
+        self.std = std
+
+        if sampler == SamplerType.SOBOL:
+            self.engine = torch.quasirandom.SobolEngine(dimension=num_params + 1, scramble=True, seed=seed)
+        else:
+            self.generator = torch.Generator(device=device).manual_seed(seed)
+
+    def draw(self, num_samples: int) -> torch.Tensor:
+        """
+        Returns:
+            torch.Tensor: The workloads, shape (num_samples, num_params+1).
+        """
+        if self.sampler == SamplerType.SOBOL:
+            # Inverse transform of the uniform points, which are clamped to avoid infinite workloads
+            points = self.engine.draw(num_samples, dtype=torch.float32).clamp(1e-6, 1 - 1e-6)
+            inputs = self.mean + self.std * math.sqrt(2) * torch.erfinv(2 * points - 1)
+            return inputs.to(device=self.device, dtype=self.dtype)
+
+        inputs = torch.empty((num_samples, self.num_params + 1), device=self.device, dtype=self.dtype)
+        if self.sampler == SamplerType.NORMAL:
+            return inputs.normal_(mean=self.mean, std=self.std, generator=self.generator)
+        elif self.sampler == SamplerType.EXPONENTIAL:
+            return inputs.exponential_(generator=self.generator)
+        else:
+            raise ValueError(f"Unknown sampler {self.sampler}")
+
+def percentile_intervals(sorted_ratios: torch.Tensor, *, percentiles=(0.025, 0.50, 0.975), confidence: float = 0.95):
+    """
+    Computes distribution-free confidence intervals of the percentiles from order statistics,
+    i.e., the ranks of the bounds follow from the normal approximation of the binomial distribution of the number of samples below the percentile.
+
+    Args:
+        sorted_ratios (torch.Tensor): The sorted ratios, shape (num_samples,).
+        percentiles: The percentiles.
+        confidence (float): The confidence level of the intervals.
+
+    Returns:
+        (lower, upper): The lower and upper bounds of the percentiles, shape (num_percentiles,).
+    """
+    num_samples = sorted_ratios.shape[0]
+    z = math.sqrt(2) * torch.erfinv(torch.tensor(confidence, dtype=torch.float64)).item()
+
+    quantiles = torch.tensor(percentiles, dtype=torch.float64)
+    deviations = z * torch.sqrt(num_samples * quantiles * (1 - quantiles))
+    lower_ranks = torch.floor(num_samples * quantiles - deviations).clamp(0, num_samples - 1).long()
+    upper_ranks = torch.ceil(num_samples * quantiles + deviations).clamp(0, num_samples - 1).long()
+
+    return (sorted_ratios[lower_ranks.to(sorted_ratios.device)], sorted_ratios[upper_ranks.to(sorted_ratios.device)])
+
+def merge_sorted(sorted_ratios: torch.Tensor, new_sorted_ratios: torch.Tensor) -> torch.Tensor:
+    """
+    Merges two sorted tensors in linear time, where each new ratio is placed before the equal ratios of sorted_ratios.
+
+    Returns:
+        torch.Tensor: The sorted union, shape (num_samples + num_new_samples,).
+    """
+    num_new_samples = new_sorted_ratios.shape[0]
+    merged = torch.empty(sorted_ratios.shape[0] + num_new_samples, device=sorted_ratios.device, dtype=sorted_ratios.dtype)
+
+    # Final position of each new ratio, which is its rank among the previous ratios plus the number of new ratios before it
+    positions = torch.searchsorted(sorted_ratios, new_sorted_ratios) + torch.arange(num_new_samples, device=sorted_ratios.device)
+    is_new = torch.zeros(merged.shape[0], device=sorted_ratios.device, dtype=torch.bool)
+    is_new[positions] = True
+
+    merged[positions] = new_sorted_ratios
+    merged[~is_new] = sorted_ratios
+    return merged
+
+def adaptive_simulation_query(*, planes: torch.Tensor, planes_other: torch.Tensor, sampler: WorkloadSampler, round_size: int, max_samples: int, target_width: float, percentiles=(0.025, 0.50, 0.975), confidence: float = 0.95):
+    """
+    Perform a simulation query that draws the trace in rounds until the confidence intervals of all percentiles are narrower than the target width.
+
+    Every round has the same size, s.t., the compiled ratios are reused across rounds, except for a last round truncated to `max_samples`.
+    The number of rounds between two checks of the intervals doubles, and the sorted ratios of the new rounds are merged into the sorted ratios
+    of the previous rounds, s.t., sorting takes O(n log n) in total. Hence, the query draws at most twice the samples it requires.
+    The intervals assume independent samples, hence they are conservative for the scrambled Sobol sequence.
+
+    Args:
+        planes (torch.Tensor): The new planes tensor.
+        planes_other (torch.Tensor): The other planes tensor.
+        sampler (WorkloadSampler): The sampler of the workloads.
+        round_size (int): The number of samples per round.
+        max_samples (int): The number of samples after which the simulation stops regardless of the intervals, e.g., the fixed batch size.
+        target_width (float): The target width of the confidence intervals of the ratios.
+        percentiles: The percentiles to compute.
+        confidence (float): The confidence level of the intervals.
+
+    Returns:
+        (percentile_values, intervals, num_samples): The percentiles of the ratios, the (lower, upper) bounds of each percentile, and the number of samples used.
+    """
+    sorted_ratios = torch.empty(0, device=planes.device, dtype=torch.float32)
+    num_samples = 0
+    num_rounds = 1
+    while num_samples < max_samples:
+        ratios = []
+        for _ in range(num_rounds):
+            size = min(round_size, max_samples - num_samples)
+            if size <= 0:
+                break
+            inputs = sampler.draw(size)
+            ratios.append(_simulation_ratios(planes=planes, planes_other=planes_other, inputs=inputs).float())
+            num_samples += size
+
+        sorted_ratios = merge_sorted(sorted_ratios, torch.sort(torch.cat(ratios)).values)
+        (lower, upper) = percentile_intervals(sorted_ratios, percentiles=percentiles, confidence=confidence)
+        if (upper - lower).max().item() <= target_width:
+            break
+        num_rounds *= 2
+    # Same indexes as compute_percentiles
+    indexes = ((sorted_ratios.shape[0] - 1) * torch.tensor(percentiles, device=sorted_ratios.device, dtype=torch.float32)).round().long()
+    intervals = list(zip(lower.cpu().tolist(), upper.cpu().tolist()))
+
+    return (sorted_ratios[indexes].cpu().tolist(), intervals, num_samples)
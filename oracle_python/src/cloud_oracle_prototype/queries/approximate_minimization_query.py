@@ -0,0 +1,93 @@
+import torch
+
+def init_index(*, planes: torch.Tensor, num_lists: int = None, num_iterations: int = 10, seed: int = 42):
+    """
+    Builds an inverted-file index over the planes by k-means clustering.
+
+    Args:
+        planes (torch.Tensor): The planes of all decisions, shape (num_functions, num_params).
+        num_lists (int): The number of clusters, i.e., inverted lists. Defaults to the square root of num_functions.
+        num_iterations (int): The number of k-means iterations.
+        seed (int): The seed for choosing the initial centroids.
+
+    Returns:
+        (centroids, lists): The centroids, shape (num_lists, num_params), and the decisions of each list padded with num_functions,
+            shape (num_lists, max_list_size).
+    """
+    num_functions = planes.shape[0]
+    if num_lists is None:
+        num_lists = max(1, int(num_functions ** 0.5))
+    num_lists = min(num_lists, num_functions)
+
+    points = planes.float()
+    generator = torch.Generator(device="cpu").manual_seed(seed)
+    centroids = points[torch.randperm(num_functions, generator=generator)[:num_lists].to(planes.device)].clone()
+
+    for _ in range(num_iterations):
+        # Assign to closest centroid, i.e., argmax of p.c - |c|^2 / 2
+        assignments = (torch.matmul(points, centroids.t()) - 0.5 * (centroids ** 2).sum(dim=1)).argmax(dim=1)
+
+        # Update centroids, keeping the centroids of empty clusters
+        sums = torch.zeros_like(centroids).index_add_(0, assignments, points)
+        counts = torch.bincount(assignments, minlength=num_lists)
+        is_nonempty = counts > 0
+        centroids[is_nonempty] = sums[is_nonempty] / counts[is_nonempty].unsqueeze(1)
+
+    assignments = (torch.matmul(points, centroids.t()) - 0.5 * (centroids ** 2).sum(dim=1)).argmax(dim=1)
+
+    # Inverted lists as padded table, where num_functions marks padding
+    counts = torch.bincount(assignments, minlength=num_lists)
+    order = torch.argsort(assignments, stable=True)
+    list_starts = torch.cumsum(counts, dim=0) - counts
+    positions = torch.arange(num_functions, device=planes.device) - list_starts[assignments[order]]
+    lists = torch.full((num_lists, int(counts.max().item())), num_functions, dtype=torch.int64, device=planes.device)
+    lists[assignments[order], positions] = order
+
+    return (centroids.to(planes.dtype), lists)
+
+def approximate_minimization_query(*, planes: torch.Tensor, index, inputs: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor, num_probes: int = 1):
+    """
+    Approximates the minimum cost and the index of the minimal decision for each workload in the batch
+    as a maximum inner product search over the negated planes.
+
+    Each workload probes the inverted lists whose centroids have the lowest cost and rescores the decisions of these lists exactly.
+    More probes increase the recall at the cost of latency. The union of the probed lists of the batch is rescored with a single matmul,
+    and each workload only considers the decisions of its own probes.
+
+    Args:
+        planes (torch.Tensor): The planes of all decisions, shape (num_functions, num_params).
+        index: The inverted-file index of `init_index`.
+        inputs (torch.Tensor): The workloads, shape (batch_size, num_params).
+        outputs (torch.Tensor): The minimum costs among the probed decisions, shape (batch_size, 1).
+        outputs_index (torch.Tensor): The indexes of the minimal probed decisions, shape (batch_size, 1).
+        num_probes (int): The number of inverted lists probed per workload.
+
+    Returns:
+        (outputs, outputs_index): The approximate minimum costs and the indexes of the approximately minimal decisions.
+    """
+    (centroids, lists) = index
+    num_functions = planes.shape[0]
+    num_probes = min(num_probes, centroids.shape[0])
+
+    # Lists with the lowest centroid cost, shape (batch_size, num_probes)
+    probes = torch.matmul(inputs, centroids.t()).topk(num_probes, dim=1, largest=False).indices
+    is_probed = torch.zeros((inputs.shape[0], centroids.shape[0]), dtype=torch.bool, device=inputs.device)
+    is_probed.scatter_(1, probes, True)
+
+    # Union of the decisions in the lists probed by any workload, which are distinct since the lists partition the decisions
+    probed_lists = is_probed.any(dim=0).nonzero().squeeze(1)
+    candidates = lists[probed_lists].flatten()
+    candidate_lists = probed_lists.repeat_interleave(lists.shape[1])
+    is_decision = candidates < num_functions
+    candidates = candidates[is_decision]
+    candidate_lists = candidate_lists[is_decision]
+
+    # Rescore the union exactly and mask the decisions of lists not probed by a workload, shape (batch_size, num_candidates)
+    costs = torch.matmul(inputs, planes[candidates].t())
+    costs.masked_fill_(~is_probed[:, candidate_lists], float("inf"))
+    values, positions = costs.min(dim=1, keepdim=True)
+
+    outputs.copy_(values)
+    outputs_index.copy_(candidates[positions])
+
+    return (outputs, outputs_index)
@@ -0,0 +1,233 @@
+import time
+from enum import Enum
+import numpy as np
+import torch
+
+from cloud_oracle_prototype.queries.minimization_query import _minimization_query_dense
+from cloud_oracle_prototype.queries.simulation_query import compute_percentiles, simulation_query
+from cloud_oracle_prototype.queries.directed_drift_query import batched_directed_drift_query, directed_drift_query
+from cloud_oracle_prototype.queries.conservative_drift_query import batched_conservative_drift_query, conservative_drift_query
+
+class BackendType(Enum):
+    COMPILED = "torch (compiled)"
+    EAGER = "torch (eager)"
+    NUMPY = "numpy"
+    AUTO = "auto"
+
+def _eager(function):
+    # The function wrapped by torch.compile, which runs without tracing and compilation
+    return getattr(function, "_torchdynamo_orig_callable", function)
+
+class TorchBackend:
+    """
+    Executes the queries with torch, either compiled by torch.compile or eagerly, which avoids the compilation for small oracles.
+    """
+
+    def __init__(self, *, compiled: bool = True):
+        self.compiled = compiled
+        self._minimization_query = _minimization_query_dense if compiled else _eager(_minimization_query_dense)
+        self._simulation_query = simulation_query if compiled else _eager(simulation_query)
+        self._directed_drift_query = directed_drift_query if compiled else _eager(directed_drift_query)
+        self._conservative_drift_query = conservative_drift_query if compiled else _eager(conservative_drift_query)
+        self._batched_directed_drift_query = batched_directed_drift_query if compiled else _eager(batched_directed_drift_query)
+        self._batched_conservative_drift_query = batched_conservative_drift_query if compiled else _eager(batched_conservative_drift_query)
+
+    def minimization_query(self, *, planes: torch.Tensor, inputs: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor):
+        return self._minimization_query(planes=planes, inputs=inputs, outputs=outputs, outputs_index=outputs_index)
+
+    def simulation_query(self, *, planes: torch.Tensor, planes_other: torch.Tensor, inputs: torch.Tensor, outputs: torch.Tensor):
+        return self._simulation_query(planes=planes, planes_other=planes_other, inputs=inputs, outputs=outputs)
+
+    def directed_drift_query(self, *, current_parameter: torch.Tensor, drift: torch.Tensor, planes: torch.Tensor):
+        return self._directed_drift_query(current_parameter=current_parameter, drift=drift, planes=planes)
+
+    def conservative_drift_query(self, *, current_parameter: torch.Tensor, planes: torch.Tensor):
+        return self._conservative_drift_query(current_parameter=current_parameter, planes=planes)
+
+    def batched_directed_drift_query(self, *, current_parameters: torch.Tensor, drifts: torch.Tensor, planes: torch.Tensor):
+        return self._batched_directed_drift_query(current_parameters=current_parameters, drifts=drifts, planes=planes)
+
+    def batched_conservative_drift_query(self, *, current_parameters: torch.Tensor, planes: torch.Tensor):
+        return self._batched_conservative_drift_query(current_parameters=current_parameters, planes=planes)
+
+    def invalidate(self):
+        # Nothing is cached, the queries read the planes directly
+        pass
+
+class NumpyBackend:
+    """
+    Executes the queries with NumPy in float32 on the CPU, e.g., with MKL as BLAS.
+
+    The planes are converted once and the conversion is reused for the same planes tensor.
+    After modifying the planes in place, their owner calls `invalidate`.
+    Inputs and outputs remain torch tensors, s.t., the backends are interchangeable.
+    """
+
+    def __init__(self):
+        # Converted planes by id with the tensor, which is kept alive, s.t., its id is not reused
+        self.arrays = {}
+
+    def invalidate(self):
+        """
+        Discards the converted planes, e.g., after the planes were modified in place.
+        """
+        self.arrays.clear()
+
+    def _planes_array(self, planes: torch.Tensor) -> np.ndarray:
+        entry = self.arrays.get(id(planes))
+        if entry is None or entry[0] is not planes:
+            entry = (planes, _to_numpy(planes))
+            self.arrays[id(planes)] = entry
+        return entry[1]
+
+    def minimization_query(self, *, planes: torch.Tensor, inputs: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor):
+        costs = _to_numpy(inputs) @ self._planes_array(planes).T
+        indexes = costs.argmin(axis=1)
+
+        outputs.copy_(torch.from_numpy(costs[np.arange(costs.shape[0]), indexes]).view(-1, 1))
+        outputs_index.copy_(torch.from_numpy(indexes).view(-1, 1))
+
+        return (outputs, outputs_index)
+
+    def simulation_query(self, *, planes: torch.Tensor, planes_other: torch.Tensor, inputs: torch.Tensor, outputs: torch.Tensor):
+        workloads = _to_numpy(inputs)
+        min_new = (workloads @ self._planes_array(planes).T).min(axis=1)
+        min_other = (workloads @ self._planes_array(planes_other).T).min(axis=1)
+
+        outputs.copy_(torch.from_numpy(min_new / min_other).view(-1, 1))
+
+        return compute_percentiles(outputs)
+
+    def directed_drift_query(self, *, current_parameter: torch.Tensor, drift: torch.Tensor, planes: torch.Tensor):
+        planes_array = self._planes_array(planes)
+        parameter = _to_numpy(current_parameter).copy()
+        drift_array = _to_numpy(drift)
+
+        # Current minimum decision and the point on its plane
+        parameter[-1] = 0
+        costs = planes_array @ parameter
+        index = costs.argmin()
+        parameter[-1] = costs[index]
+        current_parameter[-1] = float(costs[index])
+
+        # Ray shooting from the current minimum point in direction of the drift projected onto the current minimum decision
+        projected_drift = drift_array - (drift_array @ planes_array[index]) * planes_array[index]
+        distances = (planes_array @ parameter) / (planes_array @ projected_drift)
+        distances[index] = np.inf
+        next_index = distances.argmin()
+
+        return (torch.tensor(distances[next_index]), torch.tensor(next_index))
+
+    def conservative_drift_query(self, *, current_parameter: torch.Tensor, planes: torch.Tensor):
+        planes_array = self._planes_array(planes)
+        parameter = _to_numpy(current_parameter)
+
+        # Current minimum decision and the point on its plane
+        costs = planes_array @ parameter
+        index = costs.argmin()
+        current_parameter[-1] = float(costs[index])
+
+        alpha = planes_array @ planes_array[index]
+        V = (np.outer(alpha, planes_array[index]) - planes_array) / np.sqrt(1 - alpha ** 2)[:, None]
+        distances = -alpha / (planes_array * V).sum(axis=1)
+        distances[index] = np.inf
+        next_index = distances.argmin()
+
+        return (torch.tensor(distances[next_index]), torch.tensor(next_index))
+
+    def batched_directed_drift_query(self, *, current_parameters: torch.Tensor, drifts: torch.Tensor, planes: torch.Tensor):
+        planes_array = self._planes_array(planes)
+        parameters = _to_numpy(current_parameters).copy()
+        drifts_array = _to_numpy(drifts)
+        rows = np.arange(parameters.shape[0])
+
+        # Current minimum decisions and the points on their planes
+        parameters[:, -1] = 0
+        costs = parameters @ planes_array.T
+        indexes = costs.argmin(axis=1)
+        parameters[:, -1] = costs[rows, indexes]
+        current_parameters[:, -1] = torch.from_numpy(parameters[:, -1].copy())
+
+        # Ray shooting from the current minimum points in direction of the drifts projected onto the current minimum decisions
+        current_planes = planes_array[indexes]
+        projected_drifts = drifts_array - (drifts_array * current_planes).sum(axis=1, keepdims=True) * current_planes
+        distances = (parameters @ planes_array.T) / (projected_drifts @ planes_array.T)
+        distances[rows, indexes] = np.inf
+        next_indexes = distances.argmin(axis=1)
+
+        return (torch.from_numpy(distances[rows, next_indexes]), torch.from_numpy(next_indexes))
+
+    def batched_conservative_drift_query(self, *, current_parameters: torch.Tensor, planes: torch.Tensor):
+        planes_array = self._planes_array(planes)
+        parameters = _to_numpy(current_parameters)
+        rows = np.arange(parameters.shape[0])
+
+        # Current minimum decisions and the points on their planes
+        costs = parameters @ planes_array.T
+        indexes = costs.argmin(axis=1)
+        current_parameters[:, -1] = torch.from_numpy(costs[rows, indexes])
+
+        # Closed form of the distances from alpha and the norms of the planes, see batched_conservative_drift_query
+        alpha = planes_array[indexes] @ planes_array.T
+        norms = (planes_array * planes_array).sum(axis=1)
+        distances = -alpha * np.sqrt(1 - alpha ** 2) / (alpha ** 2 - norms)
+        distances[rows, indexes] = np.inf
+        next_indexes = distances.argmin(axis=1)
+
+        return (torch.from_numpy(distances[rows, next_indexes]), torch.from_numpy(next_indexes))
+
+def _to_numpy(tensor: torch.Tensor) -> np.ndarray:
+    return tensor.detach().to(device="cpu", dtype=torch.float32).numpy()
+
+def load_backend(backend: BackendType):
+    if backend == BackendType.COMPILED:
+        return TorchBackend(compiled=True)
+    elif backend == BackendType.EAGER:
+        return TorchBackend(compiled=False)
+    elif backend == BackendType.NUMPY:
+        return NumpyBackend()
+    else:
+        raise ValueError(f"Unknown backend {backend}, use autotune_backend for automatic selection")
+
+def autotune_backend(*, run, device, backends=(BackendType.COMPILED, BackendType.EAGER, BackendType.NUMPY), num_iterations: int = 3):
+    """
+    Selects the fastest backend for a query by running it a few times with every backend.
+
+    Args:
+        run: Runs the query with the given backend instance.
+        device: The device of the query, where only torch backends run on devices other than the CPU.
+        backends: The candidate backends.
+        num_iterations (int): The number of timed runs after an untimed run, which includes the compilation.
+
+    Returns:
+        (backend, timings): The fastest backend type and the mean time per run of every backend in seconds.
+    """
+    timings = {}
+    for backend in backends:
+        if backend == BackendType.NUMPY and torch.device(device).type != "cpu":
+            continue
+
+        instance = load_backend(backend)
+        run(instance)
+        if torch.device(device).type == "cuda":
+            torch.cuda.synchronize()
+
+        start_time = time.perf_counter()
+        for _ in range(num_iterations):
+            run(instance)
+        if torch.device(device).type == "cuda":
+            torch.cuda.synchronize()
+        timings[backend] = (time.perf_counter() - start_time) / num_iterations
+
+    return (min(timings, key=timings.get), timings)
+
+def select_backend(backend: BackendType, *, run, device):
+    """
+    Loads the given backend, or autotunes the backend if it is `BackendType.AUTO`.
+
+    Returns:
+        (instance, backend): The backend instance and its type.
+    """
+    if backend == BackendType.AUTO:
+        (backend, _) = autotune_backend(run=run, device=device)
+    return (load_backend(backend), backend)
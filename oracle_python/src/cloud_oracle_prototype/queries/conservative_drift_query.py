@@ -23,11 +23,6 @@ def conservative_drift_query(*, current_parameter, planes):
     # Point on plane of current minimum function
     current_parameter[-1] = value
 
-    ## Mask out current minimum function
-    # Copy intercept of current minimum function
-    temp = planes[index][0]
-    planes[index][0] = torch.finfo(planes.dtype).max
-
     # Other, plane, start
     # *, current_parameter, drift, planes
     
@@ -46,14 +41,49 @@ def conservative_drift_query(*, current_parameter, planes):
     # Step 19: Compute distance
     distance = -torch.matmul(planes, planes[index]) / (torch.sum(planes * V, axis=1))
 
+    # Mask out current minimum function
+    distance = distance.index_fill(0, index.view(1), float("inf"))
+
     # Step 20: Find the minimum distance and its index
     min_dist, min_idx = torch.min(distance, dim=0)
 
-    # Restore plane of current minimum function
-    planes[index][0] = temp.item()
-
     return min_dist, min_idx
 
+@torch.compile(options={"trace.graph_diagram": False, "trace.enabled": False}, fullgraph=False, dynamic=False)
+def batched_conservative_drift_query(*, current_parameters: torch.Tensor, planes: torch.Tensor):
+    """
+    Computes the distance and index of the next optimal decision in any drift direction for a batch of current parameters.
+
+    Since sum(planes * V, axis=1) = (alpha^2 - |planes|^2) / sqrt(1 - alpha^2), the distances are computed in closed form
+    from alpha and the norms of the planes, without materializing V for every current parameter.
+
+    Args:
+        current_parameters (torch.Tensor): The current parameters, shape (batch_size, num_params+1).
+        planes (torch.Tensor): The planes matrix, shape (num_functions, num_params+1).
+
+    Returns:
+        distances (torch.Tensor): The distances to the next optimal decisions, shape (batch_size,).
+        next_indexes (torch.Tensor): The indexes of the next optimal decisions, shape (batch_size,).
+    """
+
+    # Get current minimum functions
+    curr = torch.matmul(current_parameters, planes.t()).min(dim=1)
+    indexes = curr.indices
+
+    # Points on planes of current minimum functions
+    current_parameters[:, -1] = curr.values
+
+    # Alpha of every current minimum function and plane, shape (batch_size, num_functions)
+    alpha = torch.matmul(planes[indexes], planes.t())
+    norms = (planes * planes).sum(dim=1)
+    distances = -alpha * torch.sqrt(1 - alpha ** 2) / (alpha ** 2 - norms)
+
+    # Mask out current minimum functions
+    distances = distances.scatter(1, indexes.unsqueeze(1), float("inf"))
+    res = distances.min(dim=1)
+
+    return res.values, res.indices
+
 def load_data(*, num_functions, num_parameters, device, dtype):
     Other = torch.full((n, m), 1/3, dtype=dtype, device=device)  # n x m matrix of 1/3s
     # m vector of 1/3s
@@ -29,19 +29,53 @@ def directed_drift_query(*, current_parameter: torch.Tensor, drift: torch.Tensor
     # Project drift onto current minimum decision
     projected_drift = drift - (torch.dot(drift, planes[index])) * planes[index]
 
-    ## Mask out current minimum decision
-    # Copy intercept of current minimum decision
-    temp = planes[index][0]
-    planes[index][0] = torch.finfo(planes.dtype).max
-
     # Ray shooting from current minimum point in direction of projected drift
-    res = ((planes.matmul(current_parameter)) / (planes.matmul(projected_drift))).min(dim=0)
+    distances = (planes.matmul(current_parameter)) / (planes.matmul(projected_drift))
+
+    # Mask out current minimum decision
+    distances = distances.index_fill(0, index.view(1), float("inf"))
+    res = distances.min(dim=0)
     distance = res[0]
 
     # Index of next optimal decision
     next_index = res.indices.squeeze(dim=-1)
-    
-    # Restore plane of current minimum function
-    planes[index][0] = temp.item()
 
-    return distance, next_index
\ No newline at end of file
+    return distance, next_index
+
+@torch.compile(options={"trace.graph_diagram": False, "trace.enabled": False}, fullgraph=False, dynamic=False)
+def batched_directed_drift_query(*, current_parameters: torch.Tensor, drifts: torch.Tensor, planes: torch.Tensor):
+    """
+    Computes the distance and index of the next optimal decision for a batch of current parameters and drifts,
+    s.t., the planes are scanned once for all objects instead of once per object.
+
+    Args:
+        current_parameters (torch.Tensor): The current parameters, shape (batch_size, num_params+1).
+        drifts (torch.Tensor): The drift vectors, shape (batch_size, num_params+1).
+        planes (torch.Tensor): The planes matrix, shape (num_functions, num_params+1).
+
+    Returns:
+        distances (torch.Tensor): The distances to the next optimal decisions, shape (batch_size,).
+        next_indexes (torch.Tensor): The indexes of the next optimal decisions, shape (batch_size,).
+    """
+
+    current_parameters[:, -1] = 0
+
+    # Get current minimum decisions
+    curr = torch.matmul(current_parameters, planes.t()).min(dim=1)
+    indexes = curr.indices
+
+    # Points on planes of current minimum decisions
+    current_parameters[:, -1] = curr.values
+    current_planes = planes[indexes]
+
+    # Project drifts onto current minimum decisions
+    projected_drifts = drifts - (drifts * current_planes).sum(dim=1, keepdim=True) * current_planes
+
+    # Ray shooting from current minimum points in direction of projected drifts, shape (batch_size, num_functions)
+    distances = torch.matmul(current_parameters, planes.t()) / torch.matmul(projected_drifts, planes.t())
+
+    # Mask out current minimum decisions
+    distances = distances.scatter(1, indexes.unsqueeze(1), float("inf"))
+    res = distances.min(dim=1)
+
+    return res.values, res.indices
\ No newline at end of file
@@ -0,0 +1,76 @@
+import torch
+
+from cloud_oracle_prototype.queries.minimization_query import update_running_minimum
+
+def init_query(*, latencies: torch.Tensor, batch_size: int, num_params: int, device: torch.device, dtype: torch.dtype, pairs: torch.Tensor = None):
+    # Verify that the latencies match the number of parameters, i.e., a write and a read frequency per client data center
+    num_data_centers, num_client_data_centers = latencies.shape
+    assert num_params == 2 * num_client_data_centers, f"Latencies have shape {latencies.shape} but {num_params} parameters are expected"
+
+    # By default, every pair of data centers is a decision of the oracle
+    if pairs is None:
+        pairs = torch.combinations(torch.arange(num_data_centers, device=device), r=2)
+    assert pairs.shape[1] == 2, f"Pairs has shape {pairs.shape} but should have shape (num_functions, 2)"
+
+    outputs = torch.zeros((batch_size, 1), device=device, dtype=dtype)
+    outputs_index = torch.zeros((batch_size, 1), device=device, dtype=torch.int64)
+
+    # Inputs interleave the write and read frequency of each client data center
+    inputs = torch.empty((batch_size, num_params), device=device, dtype=dtype)
+
+    return (outputs, outputs_index, inputs, pairs)
+
+def factorized_minimization_query(*, latencies: torch.Tensor, pairs: torch.Tensor, inputs: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor, block_size: int = 2**14):
+    """
+    Computes the minimum cost and the index of the minimal decision for each workload in the batch,
+    evaluating the planes of the decisions on the fly from the latency matrix.
+
+    The plane of the decision (d_0, d_1) is the element-wise maximum (write latency) and minimum (read latency)
+    of the rows d_0 and d_1 of the latency matrix. Since max(a, b) = a + b - min(a, b), the write cost of a pair
+    is the sum of the write costs of its two data centers minus the write cost of the minimum latencies. Hence, only
+    the minimum latencies of a block of pairs are materialized, and the memory is O(num_data_centers * num_client_data_centers)
+    for the oracle plus O(block_size * (num_client_data_centers + batch_size)) for the evaluation.
+
+    Args:
+        latencies (torch.Tensor): The latencies between data centers and client data centers, shape (num_data_centers, num_client_data_centers).
+        pairs (torch.Tensor): The data center pair of each decision, shape (num_functions, 2).
+        inputs (torch.Tensor): The workloads with interleaved write and read frequencies, shape (batch_size, 2 * num_client_data_centers).
+        outputs (torch.Tensor): The minimum costs, shape (batch_size, 1).
+        outputs_index (torch.Tensor): The indexes of the minimal decisions, i.e., rows of pairs, shape (batch_size, 1).
+        block_size (int): The number of pairs evaluated at once.
+
+    Returns:
+        (outputs, outputs_index): The minimum costs and the indexes of the minimal decisions.
+    """
+
+    write_frequencies = inputs[:, 0::2]
+    read_frequencies = inputs[:, 1::2]
+
+    # Write cost of each workload to each single data center, shape (batch_size, num_data_centers)
+    write_costs = torch.matmul(write_frequencies, latencies.t())
+    # Read frequencies net of the write frequencies, which are applied to the minimum latencies
+    read_minus_write_frequencies = read_frequencies - write_frequencies
+
+    outputs.fill_(float("inf"))
+    outputs_index.zero_()
+
+    num_functions = pairs.shape[0]
+    for start in range(0, num_functions, block_size):
+        end = min(start + block_size, num_functions)
+        block_values, block_indexes = _factorized_block(latencies=latencies, pairs_block=pairs[start:end], write_costs=write_costs, read_minus_write_frequencies=read_minus_write_frequencies)
+        update_running_minimum(values=block_values, indexes=block_indexes, offset=start, outputs=outputs, outputs_index=outputs_index)
+
+    return (outputs, outputs_index)
+
+@torch.compile(options={"trace.graph_diagram": False, "trace.enabled": False}, fullgraph=False, dynamic=False)
+def _factorized_block(*, latencies: torch.Tensor, pairs_block: torch.Tensor, write_costs: torch.Tensor, read_minus_write_frequencies: torch.Tensor):
+    first = pairs_block[:, 0]
+    second = pairs_block[:, 1]
+
+    # Read latency of each pair to each client data center, shape (block_size, num_client_data_centers)
+    read_latencies = torch.minimum(latencies[first], latencies[second])
+
+    # Cost of each workload for each pair of the block, shape (batch_size, block_size)
+    intermediate = write_costs[:, first] + write_costs[:, second] + torch.matmul(read_minus_write_frequencies, read_latencies.t())
+
+    return intermediate.min(dim=1, keepdim=True)
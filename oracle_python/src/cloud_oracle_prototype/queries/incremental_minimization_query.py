@@ -0,0 +1,61 @@
+import torch
+
+def init_query(*, planes: torch.Tensor, inputs: torch.Tensor):
+    """
+    Initializes the state of the incremental minimization for the tracked workloads.
+
+    Args:
+        planes (torch.Tensor): The planes of all decisions, shape (num_functions, num_params).
+        inputs (torch.Tensor): The tracked workloads, shape (num_workloads, num_params). Kept up to date by the query.
+
+    Returns:
+        (planes_t, costs, outputs, outputs_index): The transposed planes for gathering changed columns,
+            the cost of every decision per workload, shape (num_workloads, num_functions),
+            and the minimum cost and index of the minimal decision per workload, shape (num_workloads, 1).
+    """
+    assert planes.shape[1] == inputs.shape[1], f"Planes has {planes.shape[1]} parameters but inputs has {inputs.shape[1]}"
+
+    # Transpose, s.t., the coefficients of a parameter are contiguous
+    planes_t = planes.t().contiguous()
+
+    costs = torch.matmul(inputs, planes_t)
+    outputs, outputs_index = costs.min(dim=1, keepdim=True)
+
+    return (planes_t, costs, outputs, outputs_index)
+
+@torch.compile(options={"trace.graph_diagram": False, "trace.enabled": False}, fullgraph=False, dynamic=False)
+def incremental_minimization_query(*, planes_t: torch.Tensor, costs: torch.Tensor, inputs: torch.Tensor, workload_indexes: torch.Tensor, columns: torch.Tensor, values: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor):
+    """
+    Updates the minimal decisions of the tracked workloads after some of their parameters changed.
+
+    Only the changed columns of the planes are applied as a sparse update to the costs, s.t., the cost of an update
+    scales with the number of changed parameters instead of with num_params. Since every update accumulates rounding errors
+    in the costs, reinitialize the state via `init_query` periodically when using low precision data types.
+
+    Args:
+        planes_t (torch.Tensor): The transposed planes, shape (num_params, num_functions).
+        costs (torch.Tensor): The cost of every decision per workload, shape (num_workloads, num_functions), updated in place.
+        inputs (torch.Tensor): The tracked workloads, shape (num_workloads, num_params), updated in place.
+        workload_indexes (torch.Tensor): The distinct indexes of the updated workloads, shape (num_updates,).
+        columns (torch.Tensor): The indexes of the changed parameters, shape (num_changed,).
+        values (torch.Tensor): The new values of the changed parameters, shape (num_updates, num_changed).
+        outputs (torch.Tensor): The minimum cost per workload, shape (num_workloads, 1), updated in place.
+        outputs_index (torch.Tensor): The index of the minimal decision per workload, shape (num_workloads, 1), updated in place.
+
+    Returns:
+        (outputs, outputs_index): The minimum costs and the indexes of the minimal decisions of all tracked workloads.
+    """
+
+    rows = workload_indexes.view(-1, 1)
+    cols = columns.view(1, -1)
+
+    # Apply the change of the parameters to the costs, shape (num_updates, num_functions)
+    deltas = values - inputs[rows, cols]
+    costs.index_add_(0, workload_indexes, torch.matmul(deltas, planes_t[columns]))
+    inputs[rows, cols] = values
+
+    updated_outputs, updated_outputs_index = costs[workload_indexes].min(dim=1, keepdim=True)
+    outputs[workload_indexes] = updated_outputs
+    outputs_index[workload_indexes] = updated_outputs_index
+
+    return (outputs, outputs_index)
@@ -20,8 +20,43 @@ def init_query(*, planes: torch.Tensor, batch_size: int, num_functions: int, num
 def load_random_inputs(inputs: torch.Tensor):
         return inputs.exponential_()
 
+# Recommended fraction of active parameters up to which dense inputs on the CPU are processed like sparse inputs
+SPARSE_THRESHOLD = 0.25
+
+def minimization_query(*, planes: torch.Tensor, inputs: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor, tile_size: int = None, sparse_threshold: float = 0):
+    """
+    Computes the minimum cost and the index of the minimal decision for each workload in the batch.
+
+    Args:
+        planes (torch.Tensor): The planes of all decisions, shape (num_functions, num_params).
+        inputs (torch.Tensor): The workloads, shape (batch_size, num_params). Either dense, or sparse in COO or CSR layout.
+        outputs (torch.Tensor): The minimum costs, shape (batch_size, 1).
+        outputs_index (torch.Tensor): The indexes of the minimal decisions, shape (batch_size, 1).
+        tile_size (int): If set, walk the planes in tiles of this many decisions and keep a running minimum,
+            s.t., the peak memory is O(batch_size * tile_size) instead of O(batch_size * num_functions).
+        sparse_threshold (float): Dense inputs whose active parameters, i.e., the parameters that are nonzero in any workload,
+            are at most this fraction of all parameters are processed like sparse inputs, e.g., `SPARSE_THRESHOLD` on the CPU.
+            Defaults to 0, which disables the check, since it is an additional pass over the inputs that synchronizes with the device.
+
+    Returns:
+        (outputs, outputs_index): The minimum costs and the indexes of the minimal decisions.
+    """
+
+    if inputs.layout != torch.strided:
+        return _minimization_query_sparse(planes=planes, active=_active_columns(inputs), outputs=outputs, outputs_index=outputs_index, tile_size=tile_size)
+
+    if sparse_threshold > 0:
+        active = _active_columns(inputs)
+        if active[0].shape[0] <= sparse_threshold * inputs.shape[1]:
+            return _minimization_query_sparse(planes=planes, active=active, outputs=outputs, outputs_index=outputs_index, tile_size=tile_size)
+
+    if tile_size is None or tile_size >= planes.shape[0]:
+        return _minimization_query_dense(planes=planes, inputs=inputs, outputs=outputs, outputs_index=outputs_index)
+    else:
+        return _minimization_query_tiled(planes=planes, inputs=inputs, outputs=outputs, outputs_index=outputs_index, tile_size=tile_size)
+
 @torch.compile(options={"trace.graph_diagram": False, "trace.enabled": False}, fullgraph=False, dynamic=False)
-def minimization_query(*, planes: torch.Tensor, inputs: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor):
+def _minimization_query_dense(*, planes: torch.Tensor, inputs: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor):
 
     # Compute cost for each parameter and sum them and take the minimum
     #simulated_outputs[i:batch_size] = torch.matmul(functions, random_inputs).min()
@@ -34,4 +69,89 @@ def minimization_query(*, planes: torch.Tensor, inputs: torch.Tensor, outputs: t
     intermediate = torch.matmul(planes_batch, inputs_batch)
     torch.min(intermediate, dim=1, keepdim=False, out=(outputs, outputs_index))
 
-    return (outputs, outputs_index)
\ No newline at end of file
+    return (outputs, outputs_index)
+
+@torch.compile(options={"trace.graph_diagram": False, "trace.enabled": False}, fullgraph=False, dynamic=False)
+def _minimization_tile(*, planes_tile: torch.Tensor, inputs: torch.Tensor):
+    # Cost of each workload for the decisions of the tile, shape (batch_size, tile_size)
+    intermediate = torch.matmul(inputs, planes_tile.t())
+    return intermediate.min(dim=1, keepdim=True)
+
+def _minimization_query_tiled(*, planes: torch.Tensor, inputs: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor, tile_size: int):
+
+    outputs.fill_(float("inf"))
+    outputs_index.zero_()
+
+    num_functions = planes.shape[0]
+    for start in range(0, num_functions, tile_size):
+        end = min(start + tile_size, num_functions)
+        tile_values, tile_indexes = _minimization_tile(planes_tile=planes[start:end], inputs=inputs)
+        update_running_minimum(values=tile_values, indexes=tile_indexes, offset=start, outputs=outputs, outputs_index=outputs_index)
+
+    return (outputs, outputs_index)
+
+def update_running_minimum(*, values: torch.Tensor, indexes: torch.Tensor, offset: int, outputs: torch.Tensor, outputs_index: torch.Tensor):
+    """
+    Merges the minimum of a tile of decisions into the running minimum.
+
+    Args:
+        values (torch.Tensor): The minimum costs within the tile, shape (batch_size, 1).
+        indexes (torch.Tensor): The indexes of the minimal decisions within the tile, shape (batch_size, 1).
+        offset (int): The index of the first decision of the tile.
+        outputs (torch.Tensor): The running minimum costs, updated in place.
+        outputs_index (torch.Tensor): The indexes of the running minimal decisions, updated in place.
+    """
+
+    # Ties are resolved in favor of the earlier decision
+    is_better = values < outputs
+    torch.where(is_better, values, outputs, out=outputs)
+    torch.where(is_better, indexes + offset, outputs_index, out=outputs_index)
+
+def _active_columns(inputs: torch.Tensor) -> (torch.Tensor, torch.Tensor):
+    """
+    Extracts the parameters that are nonzero in any workload of the batch.
+
+    Returns:
+        (columns, active_inputs): The indexes of the active parameters, shape (num_active,),
+            and the workloads restricted to them, shape (batch_size, num_active).
+    """
+    batch_size = inputs.shape[0]
+
+    if inputs.layout == torch.sparse_csr:
+        crow_indices = inputs.crow_indices()
+        rows = torch.repeat_interleave(torch.arange(batch_size, device=inputs.device), crow_indices[1:] - crow_indices[:-1])
+        cols = inputs.col_indices()
+        values = inputs.values()
+    elif inputs.layout == torch.sparse_coo:
+        inputs = inputs.coalesce()
+        rows, cols = inputs.indices()
+        values = inputs.values()
+    else:
+        # Dense inputs are restricted to the active columns directly
+        columns = (inputs != 0).any(dim=0).nonzero().squeeze(1)
+        return (columns, inputs[:, columns])
+
+    columns, positions = torch.unique(cols, return_inverse=True)
+    active_inputs = torch.zeros((batch_size, columns.shape[0]), device=values.device, dtype=values.dtype)
+    active_inputs[rows, positions] = values
+
+    return (columns, active_inputs)
+
+def _minimization_query_sparse(*, planes: torch.Tensor, active, outputs: torch.Tensor, outputs_index: torch.Tensor, tile_size: int = None):
+
+    # Restrict the planes to the columns of the active parameters, shape (num_functions, num_active)
+    columns, active_inputs = active
+    active_planes = planes[:, columns]
+
+    # Not compiled, since the number of active parameters differs between batches
+    if tile_size is None or tile_size >= planes.shape[0]:
+        intermediate = torch.matmul(active_inputs, active_planes.t())
+        torch.min(intermediate, dim=1, keepdim=True, out=(outputs, outputs_index))
+    else:
+        outputs.fill_(float("inf"))
+        outputs_index.zero_()
+        for start in range(0, planes.shape[0], tile_size):
+            tile_values, tile_indexes = torch.matmul(active_inputs, active_planes[start:start + tile_size].t()).min(dim=1, keepdim=True)
+            update_running_minimum(values=tile_values, indexes=tile_indexes, offset=start, outputs=outputs, outputs_index=outputs_index)
+
+    return (outputs, outputs_index)
@@ -0,0 +1,52 @@
+import torch
+
+from cloud_oracle_prototype.queries.simulation_query import init_query as init_simulation_query, percentile_indexes
+
+def init_query(*, planes: torch.Tensor, planes_other: torch.Tensor, batch_size: int, num_params: int, device: torch.device, dtype: torch.dtype):
+    # Verify that the scenarios have the correct number of parameters
+    assert planes.dim() == 3, f"Planes has shape {planes.shape} but should have shape (num_scenarios, num_functions, num_params+1)"
+
+    outputs = torch.zeros((planes.shape[0], batch_size), device=device, dtype=dtype)
+
+    # Same historic trace as simulation_query.init_query
+    (_, inputs) = init_simulation_query(planes=planes[0], planes_other=planes_other, batch_size=batch_size, num_params=num_params, device=device, dtype=dtype)
+
+    return (outputs, inputs)
+
+def multi_scenario_simulation_query(*, planes: torch.Tensor, baseline: torch.Tensor, inputs: torch.Tensor, outputs: torch.Tensor, max_elements: int = 2**26):
+    """
+    Perform a simulation query for a stack of scenarios of new planes in a single batched pass over the trace.
+
+    The trace is processed in chunks, s.t., the costs of all scenarios and decisions of a chunk are at most `max_elements`.
+
+    Args:
+        planes (torch.Tensor): The new planes of all scenarios, shape (num_scenarios, num_functions, num_params+1).
+        baseline (torch.Tensor): The minimum costs with the other planes of `simulation_query.baseline_query`, shape (batch_size, 1).
+        inputs (torch.Tensor): The inputs tensor, shape (batch_size, num_params+1).
+        outputs (torch.Tensor): The ratios of all scenarios, shape (num_scenarios, batch_size).
+        max_elements (int): The maximum number of costs per chunk.
+
+    Returns:
+        List[List[float]]: The 2.5th, 50th and 97.5th percentile of the ratios of each scenario.
+    """
+    (num_scenarios, num_functions, _) = planes.shape
+    batch_size = inputs.shape[0]
+    chunk_size = max(1, max_elements // (num_scenarios * num_functions))
+
+    # Minimum cost of each scenario and sample, shape (num_scenarios, batch_size)
+    for start in range(0, batch_size, chunk_size):
+        end = min(start + chunk_size, batch_size)
+        _scenario_ratios(planes=planes, baseline=baseline[start:end], inputs=inputs[start:end], outputs=outputs[:, start:end])
+
+    # Percentiles of all scenarios with a single sort and a single transfer, shape (num_scenarios, num_percentiles)
+    sorted_outputs = torch.sort(outputs, dim=1).values
+    percentile_values = sorted_outputs[:, percentile_indexes(batch_size, device=outputs.device)]
+
+    return percentile_values.cpu().tolist()
+
+@torch.compile(options={"trace.graph_diagram": False, "trace.enabled": False}, fullgraph=False, dynamic=False)
+def _scenario_ratios(*, planes: torch.Tensor, baseline: torch.Tensor, inputs: torch.Tensor, outputs: torch.Tensor):
+
+    # Minimum cost of each scenario and sample of the chunk, shape (num_scenarios, chunk_size)
+    min_new = torch.matmul(planes, inputs.t()).amin(dim=1)
+    torch.divide(min_new, baseline.view(1, -1), out=outputs)
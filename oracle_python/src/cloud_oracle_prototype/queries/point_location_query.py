@@ -0,0 +1,124 @@
+import torch
+
+from cloud_oracle_prototype.queries.minimization_query import minimization_query
+
+def init_index(*, planes: torch.Tensor, max_dim: int = 8, leaf_size: int = 8, max_depth: int = 12):
+    """
+    Builds a point-location tree over the lower envelope of the planes for low-dimensional oracles.
+
+    Since the minimal decision does not change when scaling a nonnegative workload, the tree partitions the normalized
+    workloads, which lie in the unit box. Each node is a box that is split in half along its longest side.
+    Within a node, a decision is removed if the best decision at the center of the box is at least as good in every corner of the box,
+    hence the remaining decisions of a leaf always contain a minimal decision for every workload in its box.
+
+    Args:
+        planes (torch.Tensor): The planes of all decisions, shape (num_functions, num_params).
+        max_dim (int): The maximum number of parameters to build a tree for.
+        leaf_size (int): The number of decisions below which a box is not split further.
+        max_depth (int): The maximum depth of the tree.
+
+    Returns:
+        (split_dims, split_values, children, leaf_offsets, leaf_candidates, depth): The tree, where split_dims is -(leaf id + 1) for leaves,
+            or None if there are more than max_dim parameters.
+    """
+    num_functions, num_params = planes.shape
+    if num_params > max_dim:
+        return None
+
+    points = planes.float()
+    split_dims, split_values, children = [], [], []
+    leaf_candidates = []
+    depth = 0
+
+    # Nodes to build as (node id, lower corner, upper corner, candidates, depth)
+    root = (0, torch.zeros(num_params, device=planes.device), torch.ones(num_params, device=planes.device), torch.arange(num_functions, device=planes.device), 0)
+    split_dims.append(0)
+    split_values.append(0.0)
+    children.append([0, 0])
+    stack = [root]
+    while stack:
+        (node, lower, upper, candidates, node_depth) = stack.pop()
+        depth = max(depth, node_depth)
+
+        # Remove decisions that are never better than the best decision at the center within the box
+        candidate_planes = points[candidates]
+        best = torch.matmul(candidate_planes, (lower + upper) / 2).argmin()
+        differences = candidate_planes - candidate_planes[best]
+        min_differences = torch.minimum(differences * lower, differences * upper).sum(dim=1)
+        is_kept = min_differences < 0
+        is_kept[best] = True
+        candidates = candidates[is_kept]
+
+        if candidates.shape[0] <= leaf_size or node_depth >= max_depth:
+            split_dims[node] = -(len(leaf_candidates) + 1)
+            leaf_candidates.append(candidates)
+            continue
+
+        # Split the longest side in half
+        split_dim = int(torch.argmax(upper - lower).item())
+        split_value = ((lower[split_dim] + upper[split_dim]) / 2).item()
+        split_dims[node] = split_dim
+        split_values[node] = split_value
+
+        for side in range(2):
+            child = len(split_dims)
+            split_dims.append(0)
+            split_values.append(0.0)
+            children.append([0, 0])
+            children[node][side] = child
+
+            child_lower, child_upper = lower.clone(), upper.clone()
+            if side == 0:
+                child_upper[split_dim] = split_value
+            else:
+                child_lower[split_dim] = split_value
+            stack.append((child, child_lower, child_upper, candidates, node_depth + 1))
+
+    leaf_sizes = torch.tensor([0] + [c.shape[0] for c in leaf_candidates], device=planes.device)
+    leaf_offsets = torch.cumsum(leaf_sizes, dim=0)
+
+    return (torch.tensor(split_dims, device=planes.device), torch.tensor(split_values, device=planes.device), torch.tensor(children, device=planes.device), leaf_offsets, torch.cat(leaf_candidates), depth)
+
+def point_location_query(*, planes: torch.Tensor, index, inputs: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor):
+    """
+    Computes the minimum cost and the index of the minimal decision for each nonnegative workload in the batch
+    by descending the point-location tree and scanning only the decisions of the leaf.
+    Falls back to `minimization_query` if there is no tree, i.e., the dimension is too high.
+
+    Args:
+        planes (torch.Tensor): The planes of all decisions, shape (num_functions, num_params).
+        index: The point-location tree of `init_index`, or None.
+        inputs (torch.Tensor): The nonnegative workloads, shape (batch_size, num_params).
+        outputs (torch.Tensor): The minimum costs, shape (batch_size, 1).
+        outputs_index (torch.Tensor): The indexes of the minimal decisions, shape (batch_size, 1).
+
+    Returns:
+        (outputs, outputs_index): The minimum costs and the indexes of the minimal decisions.
+    """
+    if index is None:
+        return minimization_query(planes=planes, inputs=inputs, outputs=outputs, outputs_index=outputs_index)
+
+    (split_dims, split_values, children, leaf_offsets, leaf_candidates, depth) = index
+
+    # Normalize workloads into the unit box
+    points = inputs.float()
+    points = points / points.sum(dim=1, keepdim=True).clamp(min=torch.finfo(points.dtype).tiny)
+
+    # Descend the tree with all workloads of the batch at once
+    nodes = torch.zeros(inputs.shape[0], dtype=torch.int64, device=inputs.device)
+    for _ in range(depth):
+        dims = split_dims[nodes]
+        is_leaf = dims < 0
+        go_right = points.gather(1, dims.clamp(min=0).unsqueeze(1)).squeeze(1) >= split_values[nodes]
+        nodes = torch.where(is_leaf, nodes, children[nodes, go_right.long()])
+    leaves = -split_dims[nodes] - 1
+
+    # Scan the decisions of each leaf for its workloads
+    for leaf in torch.unique(leaves).tolist():
+        rows = (leaves == leaf).nonzero().squeeze(1)
+        candidates = leaf_candidates[leaf_offsets[leaf]:leaf_offsets[leaf + 1]]
+        values, positions = torch.matmul(inputs[rows], planes[candidates].t()).min(dim=1, keepdim=True)
+        outputs[rows] = values
+        outputs_index[rows] = candidates[positions]
+
+    return (outputs, outputs_index)
@@ -0,0 +1,98 @@
+import torch
+
+def init_index(*, planes: torch.Tensor, group_size: int = 256):
+    """
+    Builds the pruning index, which groups similar decisions and bounds the cost of each group from below.
+
+    The decisions are sorted by the sum of their coefficients, s.t., neighboring decisions form tight groups.
+    The lower bound of a group is the element-wise minimum of the planes of its decisions, hence for nonnegative workloads,
+    the cost of the lower bound is at most the cost of every decision in the group.
+
+    Args:
+        planes (torch.Tensor): The planes of all decisions, shape (num_functions, num_params).
+        group_size (int): The number of decisions per group.
+
+    Returns:
+        (sorted_planes, order, lower_bounds, group_size): The planes in group order, the original index of each sorted decision,
+            the float32 lower bounds of the groups, shape (num_groups, num_params), and the group size.
+    """
+    num_functions, num_params = planes.shape
+
+    order = torch.argsort(planes.float().sum(dim=1))
+    sorted_planes = planes[order].contiguous()
+
+    # Pad the last group with copies of the last decision, which do not change its lower bound
+    num_groups = (num_functions + group_size - 1) // group_size
+    num_padding = num_groups * group_size - num_functions
+    padded_planes = torch.cat([sorted_planes, sorted_planes[-1:].expand(num_padding, num_params)])
+    lower_bounds = padded_planes.view(num_groups, group_size, num_params).amin(dim=1).float()
+
+    return (sorted_planes, order, lower_bounds, group_size)
+
+def pruned_minimization_query(*, index, inputs: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor, tile_size: int = 16):
+    """
+    Computes the minimum cost and the index of the minimal decision for each nonnegative workload in the batch,
+    skipping the groups of decisions whose lower bound certifies that they cannot beat the best known decision.
+
+    The best known decision of a workload is the minimum of the group with its lowest bound. The batch is processed in tiles of workloads,
+    and every other group is evaluated for a tile only if its lower bound is below the best known cost of a workload of the tile. Hence, the result is exact.
+    Bounds and costs are computed in float32, and the comparison allows for its rounding error, s.t., low-precision planes cannot prune the minimum.
+    Ties are broken by the lowest index of the decisions like in `minimization_query`.
+
+    Args:
+        index: The pruning index of `init_index`.
+        inputs (torch.Tensor): The nonnegative workloads, shape (batch_size, num_params).
+        outputs (torch.Tensor): The minimum costs, shape (batch_size, 1).
+        outputs_index (torch.Tensor): The indexes of the minimal decisions, shape (batch_size, 1).
+        tile_size (int): The number of workloads that share the evaluated groups, where 1 prunes per workload.
+
+    Returns:
+        (outputs, outputs_index, pruning_ratio): The minimum costs, the indexes of the minimal decisions,
+            and the fraction of the costs of decisions per workload that were skipped.
+    """
+    (sorted_planes, order, lower_bounds, group_size) = index
+    (num_functions, num_params) = sorted_planes.shape
+    batch_size = inputs.shape[0]
+    group_offsets = torch.arange(group_size, device=inputs.device)
+    workloads = inputs.float()
+
+    # Lower bound of the cost of each group per workload, shape (batch_size, num_groups)
+    bounds = torch.matmul(workloads, lower_bounds.t())
+
+    # Best known decision per workload from the group with the lowest bound, shape (batch_size, group_size)
+    seed_rows = (bounds.argmin(dim=1, keepdim=True) * group_size + group_offsets).clamp(max=num_functions - 1)
+    seed_costs = torch.matmul(sorted_planes[seed_rows].float(), workloads.unsqueeze(2)).squeeze(2)
+    best_values = seed_costs.min(dim=1, keepdim=True).values
+    best_indexes = torch.where(seed_costs == best_values, order[seed_rows], num_functions).amin(dim=1, keepdim=True)
+
+    # Groups that may contain a better decision per workload, up to the rounding error of float32
+    slack = best_values.abs() * num_params * torch.finfo(torch.float32).eps
+    is_candidate = bounds <= best_values + slack
+
+    num_evaluated = 0
+    for start in range(0, batch_size, tile_size):
+        tile = slice(start, start + tile_size)
+
+        # Evaluate all decisions of the candidate groups of any workload of the tile
+        candidate_groups = is_candidate[tile].any(dim=0).nonzero().squeeze(1)
+        candidate_rows = (candidate_groups.unsqueeze(1) * group_size + group_offsets).view(-1)
+        candidate_rows = candidate_rows[candidate_rows < num_functions]
+        num_evaluated += candidate_rows.shape[0] * workloads[tile].shape[0]
+        if candidate_rows.shape[0] == 0:
+            continue
+
+        # Lowest index among the minimal candidates, since the sorted order does not preserve the order of the decisions
+        costs = torch.matmul(workloads[tile], sorted_planes[candidate_rows].float().t())
+        candidate_values = costs.min(dim=1, keepdim=True).values
+        candidate_indexes = torch.where(costs == candidate_values, order[candidate_rows], num_functions).amin(dim=1, keepdim=True)
+
+        is_better = (candidate_values < best_values[tile]) | ((candidate_values == best_values[tile]) & (candidate_indexes < best_indexes[tile]))
+        best_values[tile] = torch.where(is_better, candidate_values, best_values[tile])
+        best_indexes[tile] = torch.where(is_better, candidate_indexes, best_indexes[tile])
+
+    outputs.copy_(best_values)
+    outputs_index.copy_(best_indexes)
+
+    pruning_ratio = 1.0 - num_evaluated / (batch_size * num_functions)
+
+    return (outputs, outputs_index, pruning_ratio)
@@ -0,0 +1,96 @@
+import torch
+
+def init_index(*, planes: torch.Tensor, granularity: str = "row"):
+    """
+    Quantizes the planes symmetrically to int8, which halves the memory compared to float16.
+
+    Args:
+        planes (torch.Tensor): The planes of all decisions, shape (num_functions, num_params).
+        granularity (str): Either "row" for a scale per decision, or "column" for a scale per parameter.
+
+    Returns:
+        (quantized_planes, row_scales, column_scales, l1_norms): The int8 planes, shape (num_functions, num_params),
+            the float32 scales of shape (num_functions, 1) and (num_params,), where the scales of the other granularity are one,
+            and the L1 norms of the int8 planes for the error bounds, shape (num_functions,).
+    """
+    points = planes.float()
+    if granularity == "row":
+        row_scales = points.abs().amax(dim=1, keepdim=True).clamp(min=torch.finfo(torch.float32).tiny) / 127
+        column_scales = torch.ones(points.shape[1], device=planes.device)
+    elif granularity == "column":
+        row_scales = torch.ones((points.shape[0], 1), device=planes.device)
+        column_scales = points.abs().amax(dim=0).clamp(min=torch.finfo(torch.float32).tiny) / 127
+    else:
+        raise ValueError(f"Unknown granularity {granularity}")
+
+    quantized_planes = (points / row_scales / column_scales).round().clamp(-127, 127).to(torch.int8)
+    l1_norms = quantized_planes.float().abs().sum(dim=1)
+
+    return (quantized_planes, row_scales, column_scales, l1_norms)
+
+def quantized_minimization_query(*, index, inputs: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor, planes_exact: torch.Tensor = None, chunk_size: int = 2**14):
+    """
+    Computes the minimum cost and the index of the minimal decision for each workload in the batch with int8 planes.
+
+    The workloads are quantized to int8 as well and the products are accumulated in float32, which is exact up to
+    2^24 / 127^2 parameters and uses the float32 matmul on every device, since the int32 matmul of the CPU is not BLAS-backed.
+    The int8 planes are converted to float32 in chunks of decisions, s.t., no float32 copy of the oracle is built.
+    Every decision whose quantized cost is within the quantization error of the best decision is a candidate,
+    and the union of the candidates of the batch is rescored in float32 with a single matmul, s.t., near-ties are resolved exactly.
+
+    The result is only exact with respect to the original planes if these are given as `planes_exact`.
+
+    Args:
+        index: The quantized planes of `init_index`.
+        inputs (torch.Tensor): The workloads, shape (batch_size, num_params).
+        outputs (torch.Tensor): The minimum costs, shape (batch_size, 1).
+        outputs_index (torch.Tensor): The indexes of the minimal decisions, shape (batch_size, 1).
+        planes_exact (torch.Tensor): The unquantized planes for rescoring, e.g., memory-mapped from an oracle file.
+            Defaults to the dequantized planes, i.e., the decision is only exact with respect to the dequantized oracle.
+        chunk_size (int): The number of decisions converted to float32 at once.
+
+    Returns:
+        (outputs, outputs_index, rescoring_ratio): The minimum costs, the indexes of the minimal decisions, and the mean fraction of rescored decisions.
+    """
+    (quantized_planes, row_scales, column_scales, l1_norms) = index
+    (num_functions, num_params) = quantized_planes.shape
+
+    # Fold the column scales into the workloads and quantize them with a scale per workload
+    workloads = inputs.float()
+    scaled_workloads = workloads * column_scales
+    input_scales = scaled_workloads.abs().amax(dim=1, keepdim=True).clamp(min=torch.finfo(torch.float32).tiny) / 127
+    quantized_inputs = (scaled_workloads / input_scales).round().clamp(-127, 127)
+
+    # Float32 accumulation of the int8 products, which only rounds beyond 2^24
+    accumulated = torch.empty((inputs.shape[0], num_functions), device=inputs.device, dtype=torch.float32)
+    for start in range(0, num_functions, chunk_size):
+        accumulated[:, start:start + chunk_size] = torch.matmul(quantized_inputs, quantized_planes[start:start + chunk_size].float().t())
+    accumulation_error = 0.0 if num_params * 127 * 127 <= 2**24 else num_params * 127 * 127 * torch.finfo(torch.float32).eps
+
+    row_scales_t = row_scales.t()
+    costs = accumulated * input_scales * row_scales_t
+
+    # Bound of the quantization error of the workloads and the planes, shape (batch_size, num_functions)
+    error_bounds = row_scales_t * (input_scales / 2 * l1_norms.unsqueeze(0) + torch.matmul(workloads.abs(), column_scales).unsqueeze(1) / 2 + input_scales * accumulation_error)
+
+    # Candidates with a lower bound below the best upper bound
+    best_upper_bounds = (costs + error_bounds).amin(dim=1, keepdim=True)
+    is_candidate = costs - error_bounds <= best_upper_bounds
+
+    # Union of the candidates of the batch, shape (num_candidates,)
+    candidates = is_candidate.any(dim=0).nonzero().squeeze(1)
+
+    # Rescore the union in float32 and mask the decisions that are no candidates of a workload, shape (batch_size, num_candidates)
+    if planes_exact is None:
+        candidate_planes = quantized_planes[candidates].float() * row_scales[candidates] * column_scales
+    else:
+        candidate_planes = planes_exact[candidates.to(planes_exact.device)].to(inputs.device, torch.float32)
+    exact_costs = torch.matmul(workloads, candidate_planes.t())
+    exact_costs.masked_fill_(~is_candidate[:, candidates], float("inf"))
+    values, positions = exact_costs.min(dim=1, keepdim=True)
+
+    outputs.copy_(values)
+    outputs_index.copy_(candidates[positions])
+    rescoring_ratio = is_candidate.sum(dim=1).float().mean().item() / num_functions
+
+    return (outputs, outputs_index, rescoring_ratio)
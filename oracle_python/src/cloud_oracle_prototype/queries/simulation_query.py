@@ -1,11 +1,19 @@
 import torch
 
-def init_query(*, planes: torch.Tensor, planes_other: torch.Tensor, batch_size: int, num_params: int, device: torch.device, dtype: torch.dtype):
+from cloud_oracle_prototype.traces import load_trace
+
+def init_query(*, planes: torch.Tensor, planes_other: torch.Tensor, batch_size: int, num_params: int, device: torch.device, dtype: torch.dtype, trace: str = None):
     # Verify that planes have the correct number of parameters
     assert planes.shape[1] == num_params+1
     assert planes_other.shape[1] == num_params+1
     
     outputs = torch.zeros((batch_size, 1), device=device, dtype=dtype)
+
+    # Replay the first samples of a historic trace file, see traces.iter_trace
+    if trace is not None:
+        inputs = load_trace(trace, device=device, dtype=dtype, num_samples=batch_size)
+        assert inputs.shape == (batch_size, num_params+1), f"Trace has shape {tuple(inputs.shape)} but should have shape {(batch_size, num_params+1)}"
+        return (outputs, inputs)
     
     # Allocate inputs without additional dimension. This is deferred to the query.
     inputs = torch.empty((batch_size, planes.shape[1]), device=device, dtype=dtype)
@@ -50,16 +58,169 @@ def simulation_query(*, planes: torch.Tensor, planes_other: torch.Tensor, inputs
     #torch.sub(min_other.values, min_new.values, out=outputs)
     torch.divide(min_new.values, min_other.values, out=outputs)
 
+    return compute_percentiles(outputs)
+
+@torch.compile(options={"trace.graph_diagram": False, "trace.enabled": False}, fullgraph=False, dynamic=False)
+def baseline_query(*, planes_other: torch.Tensor, inputs: torch.Tensor):
+    """
+    Computes the minimum cost of each sample of the trace with the other planes, i.e., the baseline of the savings.
+
+    Args:
+        planes_other (torch.Tensor): The other planes tensor.
+        inputs (torch.Tensor): The inputs tensor.
+
+    Returns:
+        torch.Tensor: The minimum costs with the other planes, shape (batch_size, 1).
+    """
+
+    inputs_batch = inputs.view(inputs.shape[0], inputs.shape[1], 1)
+
+    planes_batch_other = planes_other.view(1, planes_other.shape[0], planes_other.shape[1])
+    intermediate_other = torch.matmul(planes_batch_other, inputs_batch)
+    min_other = intermediate_other.min(dim=1, keepdim=False)
+
+    return min_other.values
+
+@torch.compile(options={"trace.graph_diagram": False, "trace.enabled": False}, fullgraph=False, dynamic=False)
+def cached_simulation_query(*, planes: torch.Tensor, baseline: torch.Tensor, inputs: torch.Tensor, outputs: torch.Tensor):
+    """
+    Perform a simulation query with the precomputed baseline of `baseline_query`, s.t., only the new planes are evaluated.
+
+    Args:
+        planes (torch.Tensor): The new planes tensor.
+        baseline (torch.Tensor): The minimum costs with the other planes, shape (batch_size, 1).
+        inputs (torch.Tensor): The inputs tensor.
+        outputs (torch.Tensor): The outputs tensor.
+
+    Returns:
+        torch.Tensor: The outputs with the savings of the new planes.
+    """
+
+    inputs_batch = inputs.view(inputs.shape[0], inputs.shape[1], 1)
+
+    planes_batch = planes.view(1, planes.shape[0], planes.shape[1])
+    intermediate = torch.matmul(planes_batch, inputs_batch)
+    min_new = intermediate.min(dim=1, keepdim=False)
+
+    torch.divide(min_new.values, baseline, out=outputs)
+
+    return compute_percentiles(outputs)
+
+class SimulationSession:
+    """
+    Keeps the baseline of a trace across the evaluation of several scenarios of new planes.
+
+    The baseline is recomputed if the trace is replaced with `set_trace`, or if the owner of the trace and the other planes passes
+    a new version, e.g., a counter incremented on every in-place modification. Otherwise, in-place modifications require `invalidate`.
+    """
+
+    def __init__(self, *, planes_other: torch.Tensor, inputs: torch.Tensor):
+        self.planes_other = planes_other
+        self.inputs = inputs
+        self.baseline = None
+        self.version = None
+
+    def set_trace(self, inputs: torch.Tensor):
+        self.inputs = inputs
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Discards the baseline, e.g., after the trace or the other planes were modified in place.
+        """
+        self.baseline = None
+
+    def get_baseline(self, *, version: int = None) -> torch.Tensor:
+        """
+        Args:
+            version: The version of the trace and the other planes as maintained by their owner, which invalidates the baseline when it changes.
+
+        Returns:
+            torch.Tensor: The minimum costs with the other planes, shape (batch_size, 1).
+        """
+        if version != self.version:
+            self.invalidate()
+            self.version = version
+        if self.baseline is None:
+            self.baseline = baseline_query(planes_other=self.planes_other, inputs=self.inputs)
+        return self.baseline
+
+    def simulate(self, *, planes: torch.Tensor, outputs: torch.Tensor, version: int = None):
+        """
+        Simulates the savings of the new planes over the trace.
+
+        Args:
+            version: The version of the trace and the other planes, see `get_baseline`.
+
+        Returns:
+            List[float]: The 2.5th, 50th and 97.5th percentile of the ratios.
+        """
+        return cached_simulation_query(planes=planes, baseline=self.get_baseline(version=version), inputs=self.inputs, outputs=outputs)
+
+def percentile_indexes(num_samples: int, *, percentiles=(0.025, 0.50, 0.975), device: torch.device = None) -> torch.Tensor:
+    """
+    Returns the indexes of the percentiles in num_samples sorted ratios, i.e., the nearest ranks.
+    """
+    indexes = (num_samples-1) * torch.tensor(percentiles, device=device, dtype=torch.float32)
+    return indexes.round().long()
+
+def compute_percentiles(outputs: torch.Tensor, percentiles=(0.025, 0.50, 0.975)):
+    """
+    Computes the percentiles of the simulated ratios by sorting.
+
+    Args:
+        outputs (torch.Tensor): The simulated ratios, shape (batch_size, 1).
+        percentiles: The percentiles to compute.
+
+    Returns:
+        List[float]: The values of the percentiles.
+    """
+
     # Compute quantiles by sorting
-    percentiles = [0.025, 0.50, 0.975]
     sorted_outputs = torch.sort(outputs, dim=0, descending=False).values
 
-    # Compute indexes of percentiles
-    indexes = (sorted_outputs.shape[0]-1) * torch.tensor(percentiles, device=outputs.device, dtype=torch.float32)
-    indexes = indexes.round().long()
-    percentile_values = sorted_outputs[indexes]
+    # Select the percentiles by their indexes
+    percentile_values = sorted_outputs[percentile_indexes(sorted_outputs.shape[0], percentiles=percentiles, device=outputs.device)]
 
     # Flatten the percentile values to a single dimension
-    percentile_values = percentile_values.view((3,))
+    percentile_values = percentile_values.view((len(percentiles),))
+
+    return percentile_values.cpu().tolist()
+
+def bootstrap_intervals(outputs: torch.Tensor, *, num_bootstrap: int, percentiles=(0.025, 0.50, 0.975), confidence: float = 0.95, max_elements: int = 2**26, seed: int = 42):
+    """
+    Computes bootstrap confidence intervals of the percentiles of the simulated ratios.
+
+    All resamples of a chunk are drawn as one batch of indexes and their percentiles are selected with `torch.kthvalue`
+    instead of sorting every resample. The chunks bound the memory to `max_elements` resampled ratios.
+
+    Args:
+        outputs (torch.Tensor): The simulated ratios, shape (batch_size, 1).
+        num_bootstrap (int): The number of resamples.
+        percentiles: The percentiles, with the same indexes as `compute_percentiles`.
+        confidence (float): The confidence level of the intervals.
+        max_elements (int): The maximum number of resampled ratios per chunk.
+        seed (int): The seed of the resampling.
+
+    Returns:
+        List[Tuple[float, float]]: The lower and upper bound of each percentile.
+    """
+    ratios = outputs.view(-1).float()
+    batch_size = ratios.shape[0]
+    generator = torch.Generator(device=ratios.device).manual_seed(seed)
+    ranks = [round((batch_size - 1) * percentile) + 1 for percentile in percentiles]
+
+    # Percentiles of every resample, shape (num_bootstrap, num_percentiles)
+    estimates = []
+    chunk_size = max(1, max_elements // batch_size)
+    for start in range(0, num_bootstrap, chunk_size):
+        indexes = torch.randint(batch_size, (min(chunk_size, num_bootstrap - start), batch_size), device=ratios.device, generator=generator)
+        resamples = ratios[indexes]
+        estimates.append(torch.stack([resamples.kthvalue(rank, dim=1).values for rank in ranks], dim=1))
+    estimates = torch.cat(estimates)
+
+    # Percentile intervals of the bootstrap distribution
+    levels = torch.tensor([(1 - confidence) / 2, (1 + confidence) / 2], device=ratios.device)
+    bounds = torch.quantile(estimates, levels, dim=0)
 
-    return percentile_values.cpu().tolist()
\ No newline at end of file
+    return list(zip(bounds[0].cpu().tolist(), bounds[1].cpu().tolist()))
\ No newline at end of file
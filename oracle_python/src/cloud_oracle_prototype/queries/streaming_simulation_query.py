@@ -0,0 +1,58 @@
+import torch
+
+from cloud_oracle_prototype.quantile_sketch import KLLSketch
+from cloud_oracle_prototype.traces import iter_trace
+
+def generate_chunks(*, num_samples: int, chunk_size: int, num_params: int, device: torch.device, dtype: torch.dtype, mean: float = 1000, std: float = 100, seed: int = 42):
+    """
+    Generates a synthetic historic trace in chunks like `simulation_query.init_query`, without materializing the whole trace.
+
+    Yields:
+        torch.Tensor: The workloads of a chunk, shape (chunk_size, num_params+1), where the last chunk may be smaller.
+    """
+    generator = torch.Generator(device=device).manual_seed(seed)
+    for start in range(0, num_samples, chunk_size):
+        inputs = torch.empty((min(chunk_size, num_samples - start), num_params + 1), device=device, dtype=dtype)
+        yield inputs.normal_(mean=mean, std=std, generator=generator)
+
+def load_chunks(filename: str, *, chunk_size: int, device: torch.device, dtype: torch.dtype, columns=None):
+    """
+    Reads a trace from a .npy, Arrow or Parquet file in chunks with `traces.iter_trace`, s.t., only one chunk is resident at a time.
+
+    Yields:
+        torch.Tensor: The workloads of a chunk, shape (chunk_size, num_params+1), where the last chunk may be smaller.
+    """
+    return iter_trace(filename, chunk_size=chunk_size, device=device, dtype=dtype, columns=columns)
+
+@torch.compile(options={"trace.graph_diagram": False, "trace.enabled": False}, fullgraph=False, dynamic=False)
+def _simulation_ratios(*, planes: torch.Tensor, planes_other: torch.Tensor, inputs: torch.Tensor):
+    # Same ratios as simulation_query, without sorting the outputs
+    min_new = torch.matmul(inputs, planes.t()).amin(dim=1)
+    min_other = torch.matmul(inputs, planes_other.t()).amin(dim=1)
+    return min_new / min_other
+
+def streaming_simulation_query(*, planes: torch.Tensor, planes_other: torch.Tensor, chunks, sketch: KLLSketch = None, k: int = 200, percentiles=(0.025, 0.50, 0.975)):
+    """
+    Perform a simulation query over a trace that is consumed in chunks, e.g., from a generator or a file larger than memory.
+
+    The ratios of each chunk are added to a mergeable quantile sketch instead of sorting all ratios,
+    hence the memory is bounded by the chunk size and the size of the sketch.
+
+    Args:
+        planes (torch.Tensor): The new planes tensor.
+        planes_other (torch.Tensor): The other planes tensor.
+        chunks: An iterable of the workloads of each chunk, shape (chunk_size, num_params+1).
+        sketch (KLLSketch): A sketch to continue, e.g., of previous chunks of the trace. Defaults to a new sketch.
+        k (int): The size of a new sketch.
+        percentiles: The percentiles to compute.
+
+    Returns:
+        (percentile_values, rank_error, sketch): The approximate percentiles of the ratios, their normalized rank error with 99% confidence, and the sketch.
+    """
+    if sketch is None:
+        sketch = KLLSketch(k=k)
+
+    for inputs in chunks:
+        sketch.update(_simulation_ratios(planes=planes, planes_other=planes_other, inputs=inputs))
+
+    return (sketch.quantiles(percentiles), sketch.rank_error(), sketch)
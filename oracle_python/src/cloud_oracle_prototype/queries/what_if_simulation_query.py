@@ -0,0 +1,66 @@
+import torch
+
+from cloud_oracle_prototype.queries.simulation_query import compute_percentiles
+
+def init_query(*, planes: torch.Tensor, inputs: torch.Tensor):
+    """
+    Initializes the state of what-if simulations against a base oracle.
+
+    Args:
+        planes (torch.Tensor): The planes of the base oracle, shape (num_functions, num_params+1).
+        inputs (torch.Tensor): The trace, shape (batch_size, num_params+1).
+
+    Returns:
+        (costs, baseline, outputs): The cost of every decision per sample, shape (batch_size, num_functions),
+            the minimum cost per sample with the base oracle, shape (batch_size, 1), and the outputs, shape (batch_size, 1).
+    """
+    assert planes.shape[1] == inputs.shape[1], f"Planes has {planes.shape[1]} parameters but inputs has {inputs.shape[1]}"
+
+    costs = torch.matmul(inputs, planes.t())
+    baseline = costs.amin(dim=1, keepdim=True)
+    outputs = torch.zeros_like(baseline)
+
+    return (costs, baseline, outputs)
+
+def scale_columns(*, planes: torch.Tensor, columns: torch.Tensor, scale: float) -> torch.Tensor:
+    """
+    Returns the delta of the planes when scaling the given columns, e.g., the read and write costs of a subset of data centers.
+
+    Returns:
+        torch.Tensor: The delta of the columns, shape (num_functions, num_changed).
+    """
+    return planes[:, columns] * (scale - 1)
+
+@torch.compile(options={"trace.graph_diagram": False, "trace.enabled": False}, fullgraph=False, dynamic=False)
+def what_if_simulation_query(*, costs: torch.Tensor, baseline: torch.Tensor, inputs: torch.Tensor, columns: torch.Tensor, deltas: torch.Tensor, outputs: torch.Tensor):
+    """
+    Simulates the savings of a column-scoped change of the base oracle without recomputing the costs of the unchanged columns,
+    s.t., the cost of a what-if query scales with the number of changed columns instead of with num_params.
+
+    Args:
+        costs (torch.Tensor): The cost of every decision per sample of the base oracle, shape (batch_size, num_functions).
+        baseline (torch.Tensor): The minimum cost per sample with the base oracle, shape (batch_size, 1).
+        inputs (torch.Tensor): The trace, shape (batch_size, num_params+1).
+        columns (torch.Tensor): The indexes of the changed columns, shape (num_changed,).
+        deltas (torch.Tensor): The change of the changed columns of the planes, shape (num_functions, num_changed).
+        outputs (torch.Tensor): The outputs tensor, shape (batch_size, 1).
+
+    Returns:
+        List[float]: The 2.5th, 50th and 97.5th percentile of the ratios of the changed to the base oracle.
+    """
+
+    # Costs of the changed oracle, shape (batch_size, num_functions)
+    changed_costs = costs + torch.matmul(inputs[:, columns], deltas.t())
+    min_new = changed_costs.amin(dim=1, keepdim=True)
+
+    torch.divide(min_new, baseline, out=outputs)
+
+    return compute_percentiles(outputs)
+
+def apply_delta(*, planes: torch.Tensor, costs: torch.Tensor, baseline: torch.Tensor, inputs: torch.Tensor, columns: torch.Tensor, deltas: torch.Tensor):
+    """
+    Commits a column-scoped change to the base oracle, i.e., the planes, the costs, and the baseline are updated in place.
+    """
+    costs.add_(torch.matmul(inputs[:, columns], deltas.t()))
+    planes[:, columns] += deltas
+    torch.amin(costs, dim=1, keepdim=True, out=baseline)
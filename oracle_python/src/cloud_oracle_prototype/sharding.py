@@ -0,0 +1,198 @@
+import queue
+import time
+import traceback
+import torch
+import torch.multiprocessing as mp
+
+from cloud_oracle_prototype.queries.minimization_query import minimization_query
+from cloud_oracle_prototype.queries.simulation_query import compute_percentiles
+
+_OP_MINIMIZE = 1
+_OP_SIMULATE = 2
+
+# Interval in seconds at which the calling process checks that the workers are alive while waiting for a batch
+_POLL_INTERVAL_S = 1.0
+
+class ShardedOracle:
+    """
+    Executes queries on worker processes that each hold a row-wise shard of the planes on the CPU.
+
+    The planes, the inputs and the per-shard results live in shared memory, s.t., only the opcode and batch size are sent to the workers.
+    Every batch is sent to all shards and the per-shard minima are reduced by the calling process.
+    With a single intra-op thread per worker, this scales better than intra-op threads for small batches.
+
+    A query that fails on a worker is re-raised by the calling process once all shards replied.
+    If a worker exits or does not reply within `timeout_s`, the workers are stopped and the query raises.
+    """
+
+    def __init__(self, *, planes: torch.Tensor, planes_other: torch.Tensor = None, num_workers: int, max_batch_size: int, threads_per_worker: int = 1, timeout_s: float = None):
+        assert num_workers <= planes.shape[0], f"Cannot split {planes.shape[0]} decisions into {num_workers} shards"
+        assert planes_other is None or num_workers <= planes_other.shape[0], f"Cannot split {planes_other.shape[0]} decisions into {num_workers} shards"
+
+        self.num_workers = num_workers
+        self.max_batch_size = max_batch_size
+        self.threads_per_worker = threads_per_worker
+        self.timeout_s = timeout_s
+
+        self.planes = planes.cpu().contiguous().share_memory_()
+        self.planes_other = planes_other.cpu().contiguous().share_memory_() if planes_other is not None else None
+
+        # Shared buffers for the inputs and the minimum and its index of each shard
+        dtype = self.planes.dtype
+        self.inputs = torch.zeros((max_batch_size, self.planes.shape[1]), dtype=dtype).share_memory_()
+        self.values = torch.zeros((num_workers, max_batch_size, 1), dtype=dtype).share_memory_()
+        self.indexes = torch.zeros((num_workers, max_batch_size, 1), dtype=torch.int64).share_memory_()
+        self.values_other = torch.zeros((num_workers, max_batch_size, 1), dtype=dtype).share_memory_()
+
+        self.workers = []
+        self.commands = []
+        self.done = None
+
+    def start(self):
+        context = mp.get_context("spawn")
+        self.done = context.Queue()
+
+        offsets = shard_offsets(self.planes.shape[0], self.num_workers)
+        offsets_other = shard_offsets(self.planes_other.shape[0], self.num_workers) if self.planes_other is not None else None
+
+        for rank in range(self.num_workers):
+            shard = self.planes[offsets[rank]:offsets[rank + 1]]
+            shard_other = self.planes_other[offsets_other[rank]:offsets_other[rank + 1]] if self.planes_other is not None else None
+
+            commands = context.Queue()
+            worker = context.Process(target=_run_worker, kwargs=dict(rank=rank, offset=offsets[rank], planes=shard, planes_other=shard_other, inputs=self.inputs, values=self.values, indexes=self.indexes, values_other=self.values_other, threads=self.threads_per_worker, commands=commands, done=self.done), daemon=True)
+            worker.start()
+
+            self.workers.append(worker)
+            self.commands.append(commands)
+
+    def stop(self):
+        for commands in self.commands:
+            commands.put(None)
+        for worker in self.workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+
+        self.workers = []
+        self.commands = []
+
+    def minimization_query(self, *, inputs: torch.Tensor, outputs: torch.Tensor, outputs_index: torch.Tensor):
+        """
+        Computes the minimum cost and the index of the minimal decision for each workload in the batch over all shards.
+
+        Args:
+            inputs (torch.Tensor): The workloads, shape (batch_size, num_params).
+            outputs (torch.Tensor): The minimum costs, shape (batch_size, 1).
+            outputs_index (torch.Tensor): The indexes of the minimal decisions, shape (batch_size, 1).
+
+        Returns:
+            (outputs, outputs_index): The minimum costs and the indexes of the minimal decisions.
+        """
+        batch_size = self._execute(_OP_MINIMIZE, inputs)
+
+        # Reduce the minima of the shards
+        values, shards = self.values[:, :batch_size].min(dim=0)
+        indexes = self.indexes[:, :batch_size].gather(0, shards.unsqueeze(0)).squeeze(0)
+        outputs.copy_(values)
+        outputs_index.copy_(indexes)
+
+        return (outputs, outputs_index)
+
+    def simulation_query(self, *, inputs: torch.Tensor, outputs: torch.Tensor):
+        """
+        Simulates the ratio of the minimum cost with the planes to the minimum cost with the other planes over all shards.
+
+        Args:
+            inputs (torch.Tensor): The workloads, shape (batch_size, num_params+1).
+            outputs (torch.Tensor): The ratios, shape (batch_size, 1).
+
+        Returns:
+            List[float]: The 2.5th, 50th and 97.5th percentile of the ratios.
+        """
+        assert self.planes_other is not None, "Simulation requires other planes"
+        batch_size = self._execute(_OP_SIMULATE, inputs)
+
+        # Reduce the minima of the shards
+        min_new = self.values[:, :batch_size].amin(dim=0)
+        min_other = self.values_other[:, :batch_size].amin(dim=0)
+        torch.divide(min_new, min_other, out=outputs)
+
+        return compute_percentiles(outputs)
+
+    def _execute(self, opcode, inputs):
+        batch_size = inputs.shape[0]
+        assert batch_size <= self.max_batch_size, f"Batch size {batch_size} exceeds the maximum batch size {self.max_batch_size}"
+
+        self.inputs[:batch_size].copy_(inputs)
+        for commands in self.commands:
+            commands.put((opcode, batch_size))
+
+        # Wait for all shards, s.t., no reply of this batch is left for the next one
+        deadline = time.perf_counter() + self.timeout_s if self.timeout_s is not None else None
+        errors = []
+        for _ in range(self.num_workers):
+            (rank, error) = self._wait_for_reply(deadline)
+            if error is not None:
+                errors.append((rank, error))
+
+        if errors:
+            (rank, error) = errors[0]
+            raise RuntimeError(f"Query failed on worker {rank}:\n{error}")
+
+        return batch_size
+
+    def _wait_for_reply(self, deadline):
+        while True:
+            try:
+                return self.done.get(timeout=_POLL_INTERVAL_S)
+            except queue.Empty:
+                pass
+
+            for (rank, worker) in enumerate(self.workers):
+                if not worker.is_alive():
+                    self.stop()
+                    raise RuntimeError(f"Worker {rank} exited with code {worker.exitcode}")
+            if deadline is not None and time.perf_counter() > deadline:
+                self.stop()
+                raise TimeoutError(f"Workers did not reply within {self.timeout_s} seconds")
+
+def shard_offsets(num_functions: int, num_shards: int):
+    """
+    Splits the decisions row-wise as evenly as possible, where the first shards hold one more decision.
+
+    Returns:
+        List[int]: The offsets of the shards, where shard i holds the decisions offsets[i] to offsets[i+1].
+    """
+    size, remainder = divmod(num_functions, num_shards)
+    offsets = [0]
+    for rank in range(num_shards):
+        offsets.append(offsets[-1] + size + (1 if rank < remainder else 0))
+    return offsets
+
+def _run_worker(*, rank, offset, planes, planes_other, inputs, values, indexes, values_other, threads, commands, done):
+    torch.set_num_threads(threads)
+    scratch_index = torch.zeros_like(indexes[rank])
+
+    while True:
+        command = commands.get()
+        if command is None:
+            break
+
+        (opcode, batch_size) = command
+        try:
+            if opcode == _OP_MINIMIZE:
+                minimization_query(planes=planes, inputs=inputs[:batch_size], outputs=values[rank, :batch_size], outputs_index=indexes[rank, :batch_size])
+                indexes[rank, :batch_size] += offset
+            elif opcode == _OP_SIMULATE:
+                minimization_query(planes=planes, inputs=inputs[:batch_size], outputs=values[rank, :batch_size], outputs_index=scratch_index[:batch_size])
+                minimization_query(planes=planes_other, inputs=inputs[:batch_size], outputs=values_other[rank, :batch_size], outputs_index=scratch_index[:batch_size])
+            else:
+                raise ValueError(f"Unknown opcode {opcode}")
+        except Exception:
+            # Reply with the error, s.t., the calling process does not wait forever
+            done.put((rank, traceback.format_exc()))
+            continue
+
+        done.put((rank, None))
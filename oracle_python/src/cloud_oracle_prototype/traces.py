@@ -0,0 +1,135 @@
+import os
+import numpy as np
+import torch
+
+# Extensions of the supported trace formats
+NUMPY_EXTENSIONS = (".npy",)
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+PARQUET_EXTENSIONS = (".parquet",)
+
+def _import_pyarrow():
+    # pyarrow is an optional dependency, which is only required for Arrow and Parquet traces
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError("Arrow and Parquet traces require pyarrow, install it with `pip install cloud_oracle_prototype[traces]`") from error
+    return pyarrow
+
+def _to_inputs(columns, *, device: torch.device, dtype: torch.dtype) -> torch.Tensor:
+    """
+    Maps the columns of a trace into the layout of the inputs, i.e., the interleaved write and read frequency of each client data center
+    followed by the additional dimension of planes, which is one.
+
+    A trace with an odd number of columns already contains the additional dimension. Such a trace is wrapped without copying
+    if it is on the CPU and has the dtype of the inputs.
+
+    Args:
+        columns: The columns of the trace as 1-D arrays, or a 2-D array of shape (num_samples, num_columns).
+
+    Returns:
+        torch.Tensor: The workloads, shape (num_samples, 2 * num_client_data_centers + 1).
+    """
+    if isinstance(columns, np.ndarray):
+        if columns.shape[1] % 2 == 1:
+            return torch.from_numpy(columns).to(device=device, dtype=dtype)
+
+        inputs = torch.empty((columns.shape[0], columns.shape[1] + 1), dtype=dtype)
+        inputs[:, :-1].copy_(torch.from_numpy(columns))
+        inputs[:, -1] = 1
+        return inputs.to(device=device)
+
+    num_samples = columns[0].shape[0]
+    num_params = len(columns) - len(columns) % 2
+
+    # Copy column by column into the layout of the inputs
+    inputs = torch.empty((num_samples, num_params + 1), dtype=dtype)
+    for (index, column) in enumerate(columns):
+        inputs[:, index].copy_(torch.from_numpy(np.asarray(column)))
+    if len(columns) == num_params:
+        inputs[:, -1] = 1
+
+    return inputs.to(device=device)
+
+def iter_trace(filename: str, *, chunk_size: int, device: torch.device, dtype: torch.dtype, columns=None):
+    """
+    Reads a trace of read and write frequencies in chunks, s.t., traces larger than memory feed the simulation incrementally.
+
+    .npy files are memory-mapped copy-on-write, Arrow IPC files are memory-mapped, and Parquet files are decoded one chunk at a time.
+    The columns are the interleaved write and read frequency of each client data center, optionally followed by the additional dimension of planes.
+
+    Args:
+        filename (str): The path of the trace file.
+        chunk_size (int): The number of samples per chunk.
+        device (torch.device): The device of the chunks.
+        dtype (torch.dtype): The dtype of the chunks.
+        columns: The names of the columns of Arrow and Parquet traces in the layout of the inputs. Defaults to all columns in the order of the file.
+
+    Yields:
+        torch.Tensor: The workloads of a chunk, shape (chunk_size, 2 * num_client_data_centers + 1), where the last chunk may be smaller.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+
+    if extension in NUMPY_EXTENSIONS:
+        assert columns is None, "Column names are not supported for .npy traces"
+        trace = np.load(filename, mmap_mode="c")
+        assert trace.ndim == 2, f"Trace has shape {trace.shape} but should have shape (num_samples, num_columns)"
+        for start in range(0, trace.shape[0], chunk_size):
+            yield _to_inputs(trace[start:start + chunk_size], device=device, dtype=dtype)
+
+    elif extension in ARROW_EXTENSIONS:
+        pyarrow = _import_pyarrow()
+        with pyarrow.memory_map(filename) as source:
+            table = pyarrow.ipc.open_file(source).read_all()
+            if columns is not None:
+                table = table.select(columns)
+
+            # Slices of the table reference the memory-mapped buffers
+            for start in range(0, table.num_rows, chunk_size):
+                chunk = table.slice(start, chunk_size)
+                yield _to_inputs([column.to_numpy() for column in chunk.columns], device=device, dtype=dtype)
+
+    elif extension in PARQUET_EXTENSIONS:
+        pyarrow = _import_pyarrow()
+        for batch in pyarrow.parquet.ParquetFile(filename).iter_batches(batch_size=chunk_size, columns=columns):
+            yield _to_inputs([column.to_numpy() for column in batch.columns], device=device, dtype=dtype)
+
+    else:
+        raise ValueError(f"Unknown trace format {extension}, supported are {NUMPY_EXTENSIONS + ARROW_EXTENSIONS + PARQUET_EXTENSIONS}")
+
+def load_trace(filename: str, *, device: torch.device, dtype: torch.dtype, columns=None, num_samples: int = None) -> torch.Tensor:
+    """
+    Loads a trace like `iter_trace` as a single batch.
+
+    Args:
+        num_samples (int): The number of samples from the start of the trace, or fewer if the trace is shorter. Defaults to the whole trace.
+
+    Returns:
+        torch.Tensor: The workloads, shape (num_samples, 2 * num_client_data_centers + 1).
+
+    Raises:
+        ValueError: If the trace has no samples.
+    """
+    chunk_size = num_samples if num_samples is not None else 2**20
+    chunks = iter_trace(filename, chunk_size=chunk_size, device=device, dtype=dtype, columns=columns)
+
+    # Chunks may be shorter than the chunk size, e.g., Parquet batches end at row groups
+    inputs = []
+    num_loaded = 0
+    try:
+        for chunk in chunks:
+            if num_samples is not None:
+                chunk = chunk[:num_samples - num_loaded]
+            inputs.append(chunk)
+            num_loaded += chunk.shape[0]
+            if num_samples is not None and num_loaded >= num_samples:
+                break
+    finally:
+        # Release the memory-mapped file of the remaining chunks
+        chunks.close()
+
+    if not inputs:
+        raise ValueError(f"Trace {filename} has no samples")
+
+    return inputs[0] if len(inputs) == 1 else torch.cat(inputs)
@@ -1,5 +1,6 @@
 import torch
 import os
+import tempfile
 
 DTYPE = torch.float16
 def load_device(device_name):
@@ -27,4 +28,71 @@ def check_device_type_available(device_name):
     elif "mps" in device_name and not torch.backends.mps.is_available():
         return False
     else:
-        return True
\ No newline at end of file
+        return True
+
+# Base directory of the on-disk cache of compiled kernels, None if disabled
+_compile_cache_dir = None
+
+def enable_compile_cache(cache_dir: str = None):
+    """
+    Enables the on-disk cache of the kernels compiled by torch.compile, s.t., restarts and repeated shapes skip compilation.
+    The compiled kernels are keyed by their graph and shapes, and `use_compile_cache` keeps a directory per device type.
+
+    Args:
+        cache_dir (str): The base directory of the cache. Defaults to $CLOUD_ORACLE_COMPILE_CACHE or ~/.cache/cloud_oracle_prototype/inductor.
+    """
+    global _compile_cache_dir
+    if cache_dir is None:
+        cache_dir = os.environ.get("CLOUD_ORACLE_COMPILE_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "cloud_oracle_prototype", "inductor"))
+    _compile_cache_dir = cache_dir
+
+    # Cache the compiled FX graphs in addition to the generated code, if supported by the installed version
+    try:
+        import torch._inductor.config as inductor_config
+        if hasattr(inductor_config, "fx_graph_cache"):
+            inductor_config.fx_graph_cache = True
+    except ImportError:
+        pass
+
+def use_compile_cache(device_name: str, *, cold: bool = False):
+    """
+    Points the compile cache to the directory of the device type, or to a new empty directory for measuring a cold start.
+
+    Args:
+        device_name (str): The device the next kernels are compiled for.
+        cold (bool): Whether to discard all compiled kernels in memory and start with an empty cache directory.
+
+    Returns:
+        str: The cache directory, or None if the compile cache is not enabled.
+    """
+    if cold:
+        torch._dynamo.reset()
+        directory = tempfile.mkdtemp(prefix="cloud_oracle_cold_cache_")
+    elif _compile_cache_dir is not None:
+        directory = os.path.join(_compile_cache_dir, torch.device(device_name).type)
+        os.makedirs(directory, exist_ok=True)
+    else:
+        return None
+
+    set_compile_cache_dir(directory)
+    return directory
+
+def set_compile_cache_dir(directory: str = None):
+    """
+    Points the compile cache to the directory, e.g., to restore the directory that was active before `use_compile_cache`.
+
+    Args:
+        directory (str): The cache directory, or None for the default directory of torch.
+    """
+    if directory is None:
+        os.environ.pop("TORCHINDUCTOR_CACHE_DIR", None)
+    else:
+        os.environ["TORCHINDUCTOR_CACHE_DIR"] = directory
+
+    # Some versions memoize the cache directory
+    try:
+        from torch._inductor import codecache
+        if hasattr(getattr(codecache, "cache_dir", None), "cache_clear"):
+            codecache.cache_dir.cache_clear()
+    except ImportError:
+        pass
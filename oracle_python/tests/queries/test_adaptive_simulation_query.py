@@ -0,0 +1,59 @@
+import unittest
+import torch
+from cloud_oracle_prototype.dummy_data import load_planes_with_savings
+from cloud_oracle_prototype.queries.adaptive_simulation_query import SamplerType, WorkloadSampler, adaptive_simulation_query, merge_sorted, percentile_intervals
+
+LOAD_ARGS = dict(
+    num_functions = 100,
+    num_functions_other = 100,
+    num_params = 10,
+    percent_data_centers_A = 0.3,
+    percent_data_centers_B = 0.3,
+    percent_change_A = 0.5,
+    percent_change_B = 0.1,
+    dtype = torch.float32,
+)
+
+class TestAdaptiveSimulationQuery(unittest.TestCase):
+
+    def test_percentile_intervals(self):
+        sorted_ratios = torch.arange(10000, dtype=torch.float32) / 10000
+        (lower, upper) = percentile_intervals(sorted_ratios)
+
+        # The intervals contain the percentiles of the uniform distribution
+        for (percentile, low, high) in zip([0.025, 0.50, 0.975], lower.tolist(), upper.tolist()):
+            self.assertLessEqual(low, percentile)
+            self.assertGreaterEqual(high, percentile)
+            self.assertLess(high - low, 0.03)
+
+    def test_merge_sorted(self):
+        ratios = torch.tensor([0.5, 0.1, 0.9, 0.5, 0.3, 0.7, 0.5])
+        merged = merge_sorted(torch.sort(ratios[:4]).values, torch.sort(ratios[4:]).values)
+        self.assertTrue(torch.equal(merged, torch.sort(ratios).values))
+        self.assertTrue(torch.equal(merge_sorted(torch.empty(0), ratios[:1]), ratios[:1]))
+
+    def test_adaptive_simulation_query(self):
+        device = torch.device('cpu')
+        planes, planes_other = load_planes_with_savings(device=device, **LOAD_ARGS)
+
+        for sampler_type in SamplerType:
+            sampler = WorkloadSampler(sampler=sampler_type, num_params=LOAD_ARGS['num_params'], device=device, dtype=LOAD_ARGS['dtype'])
+            self.assertEqual(sampler.draw(5).shape, (5, LOAD_ARGS['num_params'] + 1))
+
+            (percentiles, intervals, num_samples) = adaptive_simulation_query(planes=planes, planes_other=planes_other, sampler=sampler, round_size=500, max_samples=20000, target_width=0.05)
+
+            # Stops in a multiple of the round size once the intervals are narrow enough, or at the maximum
+            self.assertEqual(num_samples % 500, 0)
+            self.assertLessEqual(num_samples, 20000)
+
+            # The last round is truncated to the maximum
+            (_, _, num_samples_truncated) = adaptive_simulation_query(planes=planes, planes_other=planes_other, sampler=sampler, round_size=500, max_samples=1234, target_width=0.0)
+            self.assertEqual(num_samples_truncated, 1234)
+            for (value, (lower, upper)) in zip(percentiles, intervals):
+                self.assertLessEqual(lower, value)
+                self.assertGreaterEqual(upper, value)
+                if num_samples < 20000:
+                    self.assertLessEqual(upper - lower, 0.05)
+
+if __name__ == '__main__':
+    unittest.main()
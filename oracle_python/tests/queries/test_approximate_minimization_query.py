@@ -0,0 +1,55 @@
+import unittest
+import torch
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+from cloud_oracle_prototype.queries.minimization_query import init_query, load_random_inputs
+from cloud_oracle_prototype.queries.approximate_minimization_query import init_index, approximate_minimization_query
+
+LOAD_ARGS = dict(
+    num_functions = 500,
+    num_params = 10,
+    dtype = torch.float32,
+    as_planes = False,
+    random = True
+)
+
+class TestApproximateMinimizationQuery(unittest.TestCase):
+
+    def test_init_index(self):
+        device = torch.device('cpu')
+        data = load_linear_functions(device=device, **LOAD_ARGS)
+
+        centroids, lists = init_index(planes=data, num_lists=16)
+
+        # Every decision is in exactly one list
+        self.assertEqual(centroids.shape, (16, LOAD_ARGS['num_params']))
+        decisions = lists[lists < LOAD_ARGS['num_functions']]
+        self.assertEqual(sorted(decisions.tolist()), list(range(LOAD_ARGS['num_functions'])))
+
+    def test_approximate_minimization_query(self):
+        batch_size = 16
+        device = torch.device('cpu')
+        data = load_linear_functions(device=device, **LOAD_ARGS)
+
+        (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=LOAD_ARGS['num_functions'], num_params=LOAD_ARGS['num_params'], device=device, dtype=LOAD_ARGS['dtype'])
+        load_random_inputs(inputs)
+        expected_outputs, expected_indexes = torch.matmul(inputs, data.t()).min(dim=1, keepdim=True)
+
+        index = init_index(planes=data, num_lists=16)
+
+        # A single probe returns the exact cost of the returned decision, which is at least the minimum
+        approximate_minimization_query(planes=data, index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes, num_probes=1)
+        self.assertTrue(torch.allclose(outputs, torch.matmul(inputs, data.t()).gather(1, output_indexes)))
+        self.assertTrue(torch.all(outputs >= expected_outputs - 1e-5))
+
+        # Each workload only returns a decision of its own probed list
+        (centroids, lists) = index
+        probes = torch.matmul(inputs, centroids.t()).argmin(dim=1)
+        self.assertTrue(torch.all((lists[probes] == output_indexes).any(dim=1)))
+
+        # Probing all lists is exact
+        approximate_minimization_query(planes=data, index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes, num_probes=16)
+        self.assertTrue(torch.allclose(outputs, expected_outputs))
+        self.assertTrue(torch.equal(output_indexes, expected_indexes))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import torch
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+from cloud_oracle_prototype.queries.backends import BackendType, autotune_backend, load_backend
+
+BACKENDS = [BackendType.COMPILED, BackendType.EAGER, BackendType.NUMPY]
+
+class TestBackends(unittest.TestCase):
+
+    def test_minimization_query(self):
+        planes = load_linear_functions(num_functions=100, num_params=6, dtype=torch.float32, device=torch.device('cpu'), random=True)
+        inputs = torch.empty((8, 6)).exponential_()
+        expected_outputs, expected_indexes = torch.matmul(inputs, planes.t()).min(dim=1, keepdim=True)
+
+        for backend in BACKENDS:
+            outputs = torch.zeros((8, 1))
+            outputs_index = torch.zeros((8, 1), dtype=torch.int64)
+            load_backend(backend).minimization_query(planes=planes, inputs=inputs, outputs=outputs, outputs_index=outputs_index)
+
+            self.assertTrue(torch.allclose(outputs, expected_outputs), backend)
+            self.assertTrue(torch.equal(outputs_index, expected_indexes), backend)
+
+    def test_invalidate(self):
+        planes = load_linear_functions(num_functions=100, num_params=6, dtype=torch.float32, device=torch.device('cpu'), random=True)
+        inputs = torch.empty((8, 6)).exponential_()
+        outputs = torch.zeros((8, 1))
+        outputs_index = torch.zeros((8, 1), dtype=torch.int64)
+
+        # Planes modified in place are used after invalidating the backend
+        for backend in BACKENDS:
+            instance = load_backend(backend)
+            modified_planes = planes.clone()
+            instance.minimization_query(planes=modified_planes, inputs=inputs, outputs=outputs, outputs_index=outputs_index)
+            modified_planes.mul_(2)
+            instance.invalidate()
+            instance.minimization_query(planes=modified_planes, inputs=inputs, outputs=outputs, outputs_index=outputs_index)
+            self.assertTrue(torch.allclose(outputs, torch.matmul(inputs, modified_planes.t()).amin(dim=1, keepdim=True)), backend)
+
+    def test_simulation_query(self):
+        planes = load_linear_functions(num_functions=100, num_params=6, dtype=torch.float32, device=torch.device('cpu'), as_planes=True, random=True)
+        planes_other = load_linear_functions(num_functions=80, num_params=6, dtype=torch.float32, device=torch.device('cpu'), as_planes=True, random=True)
+        inputs = torch.empty((100, 7)).exponential_()
+
+        results = []
+        for backend in BACKENDS:
+            outputs = torch.zeros((100, 1))
+            results.append(load_backend(backend).simulation_query(planes=planes, planes_other=planes_other, inputs=inputs, outputs=outputs))
+
+        for percentiles in results[1:]:
+            self.assertTrue(torch.allclose(torch.tensor(percentiles), torch.tensor(results[0])))
+
+    def test_conservative_drift_query(self):
+        planes = load_linear_functions(num_functions=100, num_params=6, dtype=torch.float32, device=torch.device('cpu'), as_planes=True, random=True)
+        # Planes with norm below one, s.t., all distances are finite
+        planes = planes / planes.norm(dim=1, keepdim=True) / 2
+
+        results = []
+        for backend in BACKENDS:
+            current_parameter = torch.ones((7,))
+            (distance, next_index) = load_backend(backend).conservative_drift_query(current_parameter=current_parameter, planes=planes.clone())
+            results.append((distance.item(), next_index.item()))
+
+        for (distance, next_index) in results[1:]:
+            self.assertAlmostEqual(distance, results[0][0], places=4)
+            self.assertEqual(next_index, results[0][1])
+
+    def test_directed_drift_query(self):
+        planes = load_linear_functions(num_functions=100, num_params=6, dtype=torch.float32, device=torch.device('cpu'), as_planes=True, random=True)
+        drift = torch.rand((7,))
+
+        results = []
+        for backend in BACKENDS:
+            current_parameter = torch.ones((7,))
+            (distance, next_index) = load_backend(backend).directed_drift_query(current_parameter=current_parameter, drift=drift, planes=planes.clone())
+            results.append((distance.item(), next_index.item()))
+
+        for (distance, next_index) in results[1:]:
+            self.assertAlmostEqual(distance, results[0][0], places=4)
+            self.assertEqual(next_index, results[0][1])
+
+    def test_batched_drift_queries(self):
+        planes = load_linear_functions(num_functions=100, num_params=6, dtype=torch.float32, device=torch.device('cpu'), as_planes=True, random=True)
+        # Planes with norm below one, s.t., all conservative distances are finite
+        planes = planes / planes.norm(dim=1, keepdim=True) / 2
+        drifts = torch.rand((4, 7))
+
+        results = []
+        for backend in BACKENDS:
+            instance = load_backend(backend)
+            directed = instance.batched_directed_drift_query(current_parameters=torch.ones((4, 7)), drifts=drifts, planes=planes)
+            conservative = instance.batched_conservative_drift_query(current_parameters=torch.ones((4, 7)), planes=planes)
+            results.append((directed, conservative))
+
+        for result in results[1:]:
+            for ((distances, next_indexes), (expected_distances, expected_indexes)) in zip(result, results[0]):
+                self.assertTrue(torch.allclose(distances.float(), expected_distances.float(), rtol=1e-4))
+                self.assertTrue(torch.equal(next_indexes, expected_indexes))
+
+    def test_drift_queries_keep_planes(self):
+        planes = load_linear_functions(num_functions=100, num_params=6, dtype=torch.float32, device=torch.device('cpu'), as_planes=True, random=True)
+        planes = planes / planes.norm(dim=1, keepdim=True) / 2
+        expected = planes.clone()
+
+        # The current minimum decision is masked without modifying the planes
+        for backend in BACKENDS:
+            instance = load_backend(backend)
+            instance.directed_drift_query(current_parameter=torch.ones((7,)), drift=torch.rand((7,)), planes=planes)
+            self.assertTrue(torch.equal(planes, expected), backend)
+            instance.conservative_drift_query(current_parameter=torch.ones((7,)), planes=planes)
+            self.assertTrue(torch.equal(planes, expected), backend)
+
+    def test_autotune_backend(self):
+        planes = load_linear_functions(num_functions=100, num_params=6, dtype=torch.float32, device=torch.device('cpu'), random=True)
+        inputs = torch.empty((8, 6)).exponential_()
+        outputs = torch.zeros((8, 1))
+        outputs_index = torch.zeros((8, 1), dtype=torch.int64)
+
+        (backend, timings) = autotune_backend(run=lambda instance: instance.minimization_query(planes=planes, inputs=inputs, outputs=outputs, outputs_index=outputs_index), device="cpu", num_iterations=1)
+
+        self.assertIn(backend, BACKENDS)
+        self.assertEqual(set(timings.keys()), set(BACKENDS))
+        self.assertEqual(timings[backend], min(timings.values()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 import torch
-from oracle.dummy_data import load_linear_functions
-from oracle.queries.conservative_drift_query import conservative_drift_query
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+from cloud_oracle_prototype.queries.conservative_drift_query import batched_conservative_drift_query, conservative_drift_query
 
 LOAD_ARGS = dict(
     num_functions = 200,
@@ -30,5 +30,21 @@ class TestConservativeQuery(unittest.TestCase):
 
             conservative_drift_query(current_parameter=current_parameter, planes=data)
 
+    def test_batched_conservative_drift_query(self):
+        batch_size = 8
+        planes = load_linear_functions(num_functions=100, num_params=6, dtype=torch.float32, device=torch.device('cpu'), as_planes=True, random=True)
+        # Planes with norm below one, s.t., all distances are finite
+        planes = planes / planes.norm(dim=1, keepdim=True) / 2
+        current_parameters = torch.rand((batch_size, 7))
+
+        expected = [conservative_drift_query(current_parameter=current_parameters[row].clone(), planes=planes.clone()) for row in range(batch_size)]
+        (distances, next_indexes) = batched_conservative_drift_query(current_parameters=current_parameters, planes=planes)
+
+        # Same results as one query per current parameter
+        self.assertEqual(distances.shape, (batch_size,))
+        for row in range(batch_size):
+            self.assertAlmostEqual(distances[row].item(), expected[row][0].item(), places=4)
+            self.assertEqual(next_indexes[row].item(), expected[row][1].item())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
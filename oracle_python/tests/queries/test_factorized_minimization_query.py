@@ -0,0 +1,40 @@
+import unittest
+import torch
+from cloud_oracle_prototype.dummy_data import load_latencies
+from cloud_oracle_prototype.queries.minimization_query import load_random_inputs
+from cloud_oracle_prototype.queries.factorized_minimization_query import init_query, factorized_minimization_query
+
+LOAD_ARGS = dict(
+    num_data_centers = 20,
+    num_client_data_centers = 5,
+    dtype = torch.float32,
+    random = True
+)
+
+class TestFactorizedMinimizationQuery(unittest.TestCase):
+
+    def test_factorized_minimization_query(self):
+        batch_size = 64
+        device = torch.device('cpu')
+        num_params = LOAD_ARGS['num_client_data_centers'] * 2
+        latencies = load_latencies(device=device, **LOAD_ARGS)
+
+        # Initialize query state
+        (outputs, output_indexes, inputs, pairs) = init_query(latencies=latencies, batch_size=batch_size, num_params=num_params, device=device, dtype=LOAD_ARGS['dtype'])
+        load_random_inputs(inputs)
+
+        # Materialize the planes of all pairs as reference
+        planes = torch.empty((pairs.shape[0], num_params), dtype=LOAD_ARGS['dtype'], device=device)
+        planes[:, 0::2] = torch.maximum(latencies[pairs[:, 0]], latencies[pairs[:, 1]])
+        planes[:, 1::2] = torch.minimum(latencies[pairs[:, 0]], latencies[pairs[:, 1]])
+        expected_outputs, expected_indexes = torch.matmul(inputs, planes.t()).min(dim=1, keepdim=True)
+
+        # Block size not dividing the number of pairs to also cover the last, partial block
+        for block_size in [7, pairs.shape[0]]:
+            factorized_minimization_query(latencies=latencies, pairs=pairs, inputs=inputs, outputs=outputs, outputs_index=output_indexes, block_size=block_size)
+
+            self.assertTrue(torch.allclose(outputs, expected_outputs, rtol=1e-4))
+            self.assertTrue(torch.equal(output_indexes, expected_indexes))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import torch
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+from cloud_oracle_prototype.queries.incremental_minimization_query import init_query, incremental_minimization_query
+
+LOAD_ARGS = dict(
+    num_functions = 200,
+    num_params = 10,
+    dtype = torch.float32,
+    as_planes = False,
+    random = True
+)
+
+class TestIncrementalMinimizationQuery(unittest.TestCase):
+
+    def test_incremental_minimization_query(self):
+        device = torch.device('cpu')
+        num_workloads = 8
+        data = load_linear_functions(device=device, **LOAD_ARGS)
+        inputs = torch.empty((num_workloads, LOAD_ARGS['num_params']), device=device, dtype=LOAD_ARGS['dtype']).exponential_()
+
+        (planes_t, costs, outputs, output_indexes) = init_query(planes=data, inputs=inputs)
+
+        # Change two parameters of some of the workloads
+        workload_indexes = torch.tensor([1, 4, 6], device=device)
+        columns = torch.tensor([0, 7], device=device)
+        values = torch.empty((3, 2), device=device, dtype=LOAD_ARGS['dtype']).exponential_()
+
+        expected_inputs = inputs.clone()
+        expected_inputs[workload_indexes.view(-1, 1), columns.view(1, -1)] = values
+
+        incremental_minimization_query(planes_t=planes_t, costs=costs, inputs=inputs, workload_indexes=workload_indexes, columns=columns, values=values, outputs=outputs, outputs_index=output_indexes)
+
+        expected_outputs, expected_indexes = torch.matmul(expected_inputs, data.t()).min(dim=1, keepdim=True)
+        self.assertTrue(torch.equal(inputs, expected_inputs))
+        self.assertTrue(torch.allclose(outputs, expected_outputs, rtol=1e-4))
+        self.assertTrue(torch.equal(output_indexes, expected_indexes))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 import torch
-from oracle.dummy_data import load_linear_functions
-from oracle.queries.minimization_query import init_query, minimization_query
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+from cloud_oracle_prototype.queries.minimization_query import SPARSE_THRESHOLD, init_query, load_random_inputs, minimization_query
 
 LOAD_ARGS = dict(
     num_functions = 200,
@@ -72,5 +72,43 @@ class TestDirectedDriftQuery(unittest.TestCase):
         else:
             print("CUDA not available")
 
+    def test_minimization_query_tiled(self):
+        batch_size = 64
+        device = torch.device('cpu')
+        dtype = torch.float32
+        data = load_linear_functions(device=device, **{**LOAD_ARGS, 'dtype': dtype, 'random': True})
+
+        (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=LOAD_ARGS['num_functions'], num_params=LOAD_ARGS['num_params'], device=device, dtype=dtype)
+        load_random_inputs(inputs)
+
+        expected_outputs, expected_indexes = minimization_query(planes=data, inputs=inputs, outputs=outputs.clone(), outputs_index=output_indexes.clone())
+
+        # Tile size not dividing the number of functions to also cover the last, partial tile
+        for tile_size in [1, 64, 199]:
+            tiled_outputs, tiled_indexes = minimization_query(planes=data, inputs=inputs, outputs=outputs.clone(), outputs_index=output_indexes.clone(), tile_size=tile_size)
+
+            self.assertTrue(torch.allclose(tiled_outputs, expected_outputs))
+            self.assertTrue(torch.equal(tiled_indexes, expected_indexes))
+
+    def test_minimization_query_sparse(self):
+        batch_size = 16
+        device = torch.device('cpu')
+        dtype = torch.float32
+        data = load_linear_functions(device=device, **{**LOAD_ARGS, 'dtype': dtype, 'random': True})
+
+        (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=LOAD_ARGS['num_functions'], num_params=LOAD_ARGS['num_params'], device=device, dtype=dtype)
+        load_random_inputs(inputs)
+        inputs[:, 2:].zero_()
+        inputs[0].zero_()
+
+        expected_outputs, expected_indexes = minimization_query(planes=data, inputs=inputs, outputs=outputs.clone(), outputs_index=output_indexes.clone())
+
+        # Dense inputs with few active parameters are processed like sparse inputs if enabled
+        for sparse_inputs, kwargs in [(inputs.to_sparse_csr(), {}), (inputs.to_sparse(), {}), (inputs, {'sparse_threshold': 0.5}), (inputs, {'sparse_threshold': SPARSE_THRESHOLD}), (inputs.to_sparse_csr(), {'tile_size': 64})]:
+            sparse_outputs, sparse_indexes = minimization_query(planes=data, inputs=sparse_inputs, outputs=outputs.clone(), outputs_index=output_indexes.clone(), **kwargs)
+
+            self.assertTrue(torch.allclose(sparse_outputs, expected_outputs))
+            self.assertTrue(torch.equal(sparse_indexes[1:], expected_indexes[1:]))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,44 @@
+import unittest
+import torch
+from cloud_oracle_prototype.dummy_data import load_scenarios_with_savings
+from cloud_oracle_prototype.queries.multi_scenario_simulation_query import init_query, multi_scenario_simulation_query
+from cloud_oracle_prototype.queries.simulation_query import baseline_query, simulation_query
+
+LOAD_ARGS = dict(
+    num_functions = 100,
+    num_functions_other = 100,
+    num_params = 10,
+    percent_data_centers_A = 0.3,
+    percent_data_centers_B = 0.3,
+    percent_changes_A = [0.5, 1.1, 2.0],
+    percent_changes_B = [0.1, 0.1, 0.5],
+    dtype = torch.float32,
+)
+
+class TestMultiScenarioSimulationQuery(unittest.TestCase):
+
+    def test_multi_scenario_simulation_query(self):
+        batch_size = 1000
+        device = torch.device('cpu')
+        planes, planes_other = load_scenarios_with_savings(device=device, **LOAD_ARGS)
+        self.assertEqual(planes.shape, (3, LOAD_ARGS['num_functions'], LOAD_ARGS['num_params'] + 1))
+
+        (outputs, inputs) = init_query(planes=planes, planes_other=planes_other, batch_size=batch_size, num_params=LOAD_ARGS['num_params'], device=device, dtype=LOAD_ARGS['dtype'])
+        baseline = baseline_query(planes_other=planes_other, inputs=inputs)
+
+        results = multi_scenario_simulation_query(planes=planes, baseline=baseline, inputs=inputs, outputs=outputs)
+
+        # Same percentiles as one simulation query per scenario
+        self.assertEqual(len(results), 3)
+        for scenario in range(3):
+            expected = simulation_query(planes=planes[scenario], planes_other=planes_other, inputs=inputs, outputs=torch.zeros((batch_size, 1)))
+            self.assertTrue(torch.allclose(torch.tensor(results[scenario]), torch.tensor(expected)))
+
+        # Chunks of the trace give the same ratios
+        chunked_outputs = torch.zeros_like(outputs)
+        chunked_results = multi_scenario_simulation_query(planes=planes, baseline=baseline, inputs=inputs, outputs=chunked_outputs, max_elements=3 * LOAD_ARGS['num_functions'] * 300)
+        self.assertTrue(torch.allclose(chunked_outputs, outputs))
+        self.assertTrue(torch.allclose(torch.tensor(chunked_results), torch.tensor(results)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import torch
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+from cloud_oracle_prototype.queries.minimization_query import init_query, load_random_inputs
+from cloud_oracle_prototype.queries.point_location_query import init_index, point_location_query
+
+LOAD_ARGS = dict(
+    num_functions = 1000,
+    num_params = 4,
+    dtype = torch.float32,
+    as_planes = False,
+    random = True
+)
+
+class TestPointLocationQuery(unittest.TestCase):
+
+    def test_point_location_query(self):
+        batch_size = 64
+        device = torch.device('cpu')
+        data = load_linear_functions(device=device, **LOAD_ARGS)
+
+        (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=LOAD_ARGS['num_functions'], num_params=LOAD_ARGS['num_params'], device=device, dtype=LOAD_ARGS['dtype'])
+        load_random_inputs(inputs)
+        expected_outputs, _ = torch.matmul(inputs, data.t()).min(dim=1, keepdim=True)
+
+        index = init_index(planes=data, leaf_size=4)
+        self.assertIsNotNone(index)
+        point_location_query(planes=data, index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes)
+
+        self.assertTrue(torch.allclose(outputs, expected_outputs))
+        self.assertTrue(torch.allclose(torch.matmul(inputs, data.t()).gather(1, output_indexes), expected_outputs))
+
+    def test_point_location_query_fallback(self):
+        batch_size = 8
+        device = torch.device('cpu')
+        data = load_linear_functions(device=device, **LOAD_ARGS)
+
+        (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=LOAD_ARGS['num_functions'], num_params=LOAD_ARGS['num_params'], device=device, dtype=LOAD_ARGS['dtype'])
+        load_random_inputs(inputs)
+        expected_outputs, expected_indexes = torch.matmul(inputs, data.t()).min(dim=1, keepdim=True)
+
+        index = init_index(planes=data, max_dim=2)
+        self.assertIsNone(index)
+        point_location_query(planes=data, index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes)
+
+        self.assertTrue(torch.allclose(outputs, expected_outputs))
+        self.assertTrue(torch.equal(output_indexes, expected_indexes))
+
+if __name__ == '__main__':
+    unittest.main()
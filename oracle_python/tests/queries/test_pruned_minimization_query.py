@@ -0,0 +1,72 @@
+import unittest
+import torch
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+from cloud_oracle_prototype.queries.minimization_query import init_query, load_random_inputs
+from cloud_oracle_prototype.queries.pruned_minimization_query import init_index, pruned_minimization_query
+
+LOAD_ARGS = dict(
+    num_functions = 1000,
+    num_params = 10,
+    dtype = torch.float32,
+    as_planes = False,
+    random = True
+)
+
+class TestPrunedMinimizationQuery(unittest.TestCase):
+
+    def test_pruned_minimization_query(self):
+        batch_size = 16
+        device = torch.device('cpu')
+        data = load_linear_functions(device=device, **LOAD_ARGS)
+
+        (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=LOAD_ARGS['num_functions'], num_params=LOAD_ARGS['num_params'], device=device, dtype=LOAD_ARGS['dtype'])
+        load_random_inputs(inputs)
+        expected_outputs, expected_indexes = torch.matmul(inputs, data.t()).min(dim=1, keepdim=True)
+
+        # Group size not dividing the number of functions to also cover the padded group, and tiles not dividing the batch
+        for group_size in [1, 64, 300]:
+            for tile_size in [1, 5, batch_size]:
+                index = init_index(planes=data, group_size=group_size)
+                _, _, pruning_ratio = pruned_minimization_query(index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes, tile_size=tile_size)
+
+                self.assertTrue(torch.allclose(outputs, expected_outputs))
+                self.assertTrue(torch.equal(output_indexes, expected_indexes))
+                self.assertGreaterEqual(pruning_ratio, 0.0)
+                self.assertLess(pruning_ratio, 1.0)
+
+    def test_pruned_minimization_query_ties(self):
+        batch_size = 16
+        device = torch.device('cpu')
+        data = load_linear_functions(device=device, **LOAD_ARGS)
+
+        # Every decision has a duplicate, s.t., each minimum is a tie of two decisions
+        data = torch.cat([data, data])
+        inputs = torch.empty((batch_size, LOAD_ARGS['num_params'])).exponential_()
+        outputs = torch.zeros((batch_size, 1))
+        output_indexes = torch.zeros((batch_size, 1), dtype=torch.int64)
+        expected_indexes = torch.matmul(inputs, data.t()).argmin(dim=1, keepdim=True)
+
+        for tile_size in [1, batch_size]:
+            index = init_index(planes=data, group_size=64)
+            pruned_minimization_query(index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes, tile_size=tile_size)
+            self.assertTrue(torch.equal(output_indexes, expected_indexes))
+            self.assertTrue((output_indexes < LOAD_ARGS['num_functions']).all())
+
+    def test_pruned_minimization_query_float16(self):
+        batch_size = 16
+        device = torch.device('cpu')
+        data = load_linear_functions(device=device, **{**LOAD_ARGS, 'dtype': torch.float16})
+        inputs = torch.empty((batch_size, LOAD_ARGS['num_params']), dtype=torch.float16).exponential_()
+        outputs = torch.zeros((batch_size, 1), dtype=torch.float16)
+        output_indexes = torch.zeros((batch_size, 1), dtype=torch.int64)
+
+        # The minimum in float32 of the float16 planes, which the float16 bounds must not prune
+        expected_indexes = torch.matmul(inputs.float(), data.float().t()).argmin(dim=1, keepdim=True)
+
+        index = init_index(planes=data, group_size=64)
+        self.assertEqual(index[3], 64)
+        pruned_minimization_query(index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes)
+        self.assertTrue(torch.equal(output_indexes, expected_indexes))
+
+if __name__ == '__main__':
+    unittest.main()
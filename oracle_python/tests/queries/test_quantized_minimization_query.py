@@ -0,0 +1,54 @@
+import unittest
+import torch
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+from cloud_oracle_prototype.queries.minimization_query import init_query, load_random_inputs
+from cloud_oracle_prototype.queries.quantized_minimization_query import init_index, quantized_minimization_query
+
+LOAD_ARGS = dict(
+    num_functions = 1000,
+    num_params = 20,
+    dtype = torch.float32,
+    as_planes = False,
+    random = True
+)
+
+class TestQuantizedMinimizationQuery(unittest.TestCase):
+
+    def test_quantized_minimization_query(self):
+        batch_size = 16
+        device = torch.device('cpu')
+        data = load_linear_functions(device=device, **LOAD_ARGS)
+
+        (outputs, output_indexes, inputs) = init_query(planes=data, batch_size=batch_size, num_functions=LOAD_ARGS['num_functions'], num_params=LOAD_ARGS['num_params'], device=device, dtype=LOAD_ARGS['dtype'])
+        load_random_inputs(inputs)
+        expected_outputs, expected_indexes = torch.matmul(inputs, data.t()).min(dim=1, keepdim=True)
+
+        for granularity in ["row", "column"]:
+            index = init_index(planes=data, granularity=granularity)
+            self.assertEqual(index[0].dtype, torch.int8)
+
+            # Rescoring with the exact planes finds the exact minimal decision
+            _, _, rescoring_ratio = quantized_minimization_query(index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes, planes_exact=data)
+            self.assertTrue(torch.allclose(outputs, expected_outputs))
+            self.assertTrue(torch.equal(output_indexes, expected_indexes))
+            self.assertGreater(rescoring_ratio, 0.0)
+            self.assertLessEqual(rescoring_ratio, 1.0)
+
+            # Rescoring with the dequantized planes finds the minimal decision of the quantized oracle
+            (quantized_planes, row_scales, column_scales, l1_norms) = index
+            dequantized_planes = quantized_planes.float() * row_scales * column_scales
+            expected_dequantized_outputs, _ = torch.matmul(inputs, dequantized_planes.t()).min(dim=1, keepdim=True)
+            quantized_minimization_query(index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes)
+            self.assertTrue(torch.allclose(outputs, expected_dequantized_outputs))
+
+            # Chunks of the int8 planes give the same result
+            quantized_minimization_query(index=index, inputs=inputs, outputs=outputs, outputs_index=output_indexes, chunk_size=300)
+            self.assertTrue(torch.allclose(outputs, expected_dequantized_outputs))
+
+    def test_invalid_granularity(self):
+        data = load_linear_functions(device=torch.device('cpu'), **LOAD_ARGS)
+        with self.assertRaises(ValueError):
+            init_index(planes=data, granularity="tensor")
+
+if __name__ == '__main__':
+    unittest.main()
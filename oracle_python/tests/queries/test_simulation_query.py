@@ -1,7 +1,7 @@
 import unittest
 import torch
-from oracle.dummy_data import load_planes_with_savings
-from oracle.queries.simulation_query import init_query, simulation_query
+from cloud_oracle_prototype.dummy_data import load_planes_with_savings
+from cloud_oracle_prototype.queries.simulation_query import SimulationSession, bootstrap_intervals, init_query, simulation_query
 
 LOAD_ARGS = dict(
     num_functions = 100,
@@ -80,5 +80,59 @@ class TestSimulationQuery(unittest.TestCase):
         else:
             print("CUDA not available")
 
+    def test_simulation_session(self):
+        batch_size = 1000
+        device = torch.device('cpu')
+        planes, planes_other = load_planes_with_savings(num_functions=LOAD_ARGS['num_functions'], num_functions_other=LOAD_ARGS['num_functions_other'], num_params=LOAD_ARGS['num_params'], device=device, dtype=torch.float32, percent_data_centers_A=0.3, percent_data_centers_B=0.3, percent_change_A=1.1, percent_change_B=0.1)
+        (outputs, inputs) = init_query(planes=planes, planes_other=planes_other, batch_size=batch_size, num_params=LOAD_ARGS['num_params'], device=device, dtype=torch.float32)
+
+        expected = simulation_query(planes=planes, planes_other=planes_other, inputs=inputs, outputs=outputs)
+        expected_outputs = outputs.clone()
+
+        session = SimulationSession(planes_other=planes_other, inputs=inputs)
+        result = session.simulate(planes=planes, outputs=outputs)
+        baseline = session.baseline
+
+        self.assertTrue(torch.allclose(torch.tensor(result), torch.tensor(expected)))
+        self.assertTrue(torch.allclose(outputs, expected_outputs))
+
+        # The baseline is reused for other scenarios and recomputed after invalidating a modified trace
+        session.simulate(planes=planes * 0.5, outputs=outputs)
+        self.assertIs(session.baseline, baseline)
+        inputs.mul_(2)
+        session.invalidate()
+        session.simulate(planes=planes, outputs=outputs)
+        self.assertIsNot(session.baseline, baseline)
+
+        # A new version of the trace or a new trace recompute the baseline
+        baseline = session.baseline
+        session.simulate(planes=planes, outputs=outputs, version=1)
+        self.assertIsNot(session.baseline, baseline)
+        baseline = session.baseline
+        session.simulate(planes=planes, outputs=outputs, version=1)
+        self.assertIs(session.baseline, baseline)
+        session.set_trace(inputs.clone())
+        session.simulate(planes=planes, outputs=outputs, version=1)
+        self.assertIsNot(session.baseline, baseline)
+
+    def test_simulation_query_bootstrap(self):
+        batch_size = 1000
+        device = torch.device('cpu')
+        planes, planes_other = load_planes_with_savings(num_functions=LOAD_ARGS['num_functions'], num_functions_other=LOAD_ARGS['num_functions_other'], num_params=LOAD_ARGS['num_params'], device=device, dtype=torch.float32, percent_data_centers_A=0.3, percent_data_centers_B=0.3, percent_change_A=1.1, percent_change_B=0.1)
+        (outputs, inputs) = init_query(planes=planes, planes_other=planes_other, batch_size=batch_size, num_params=LOAD_ARGS['num_params'], device=device, dtype=torch.float32)
+
+        result = simulation_query(planes=planes, planes_other=planes_other, inputs=inputs, outputs=outputs)
+        intervals = bootstrap_intervals(outputs, num_bootstrap=200)
+
+        # Each percentile within its interval
+        self.assertEqual(len(intervals), 3)
+        for (value, (lower, upper)) in zip(result, intervals):
+            self.assertLessEqual(lower, value)
+            self.assertGreaterEqual(upper, value)
+
+        # Chunked resampling yields valid intervals
+        for (lower, upper) in bootstrap_intervals(outputs, num_bootstrap=200, max_elements=batch_size * 7):
+            self.assertLessEqual(lower, upper)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import torch
+from cloud_oracle_prototype.dummy_data import load_planes_with_savings
+from cloud_oracle_prototype.queries.streaming_simulation_query import generate_chunks, load_chunks, streaming_simulation_query
+
+LOAD_ARGS = dict(
+    num_functions = 100,
+    num_functions_other = 100,
+    num_params = 10,
+    percent_data_centers_A = 0.3,
+    percent_data_centers_B = 0.3,
+    percent_change_A = 1.1,
+    percent_change_B = 0.1,
+    dtype = torch.float32,
+)
+
+class TestStreamingSimulationQuery(unittest.TestCase):
+
+    def test_streaming_simulation_query(self):
+        device = torch.device('cpu')
+        planes, planes_other = load_planes_with_savings(device=device, **LOAD_ARGS)
+        num_samples = 10**4
+
+        # Same trace in one piece for exact percentiles
+        trace = torch.cat(list(generate_chunks(num_samples=num_samples, chunk_size=3000, num_params=LOAD_ARGS['num_params'], device=device, dtype=LOAD_ARGS['dtype'])))
+        self.assertEqual(trace.shape, (num_samples, LOAD_ARGS['num_params'] + 1))
+        ratios = torch.matmul(trace, planes.t()).amin(dim=1) / torch.matmul(trace, planes_other.t()).amin(dim=1)
+        sorted_ratios = ratios.sort().values
+
+        chunks = generate_chunks(num_samples=num_samples, chunk_size=3000, num_params=LOAD_ARGS['num_params'], device=device, dtype=LOAD_ARGS['dtype'])
+        (percentiles, rank_error, sketch) = streaming_simulation_query(planes=planes, planes_other=planes_other, chunks=chunks, k=200)
+
+        self.assertEqual(sketch.num_values, num_samples)
+        for percentile, value in zip([0.025, 0.5, 0.975], percentiles):
+            # Value lies between the exact values at the quantile minus and plus the rank error
+            lower = sorted_ratios[max(0, int((percentile - rank_error) * num_samples) - 1)].item()
+            upper = sorted_ratios[min(num_samples - 1, int((percentile + rank_error) * num_samples))].item()
+            self.assertGreaterEqual(value, lower - 1e-6)
+            self.assertLessEqual(value, upper + 1e-6)
+
+    def test_load_chunks(self):
+        trace = np.random.default_rng(0).random((1000, 5), dtype=np.float32)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "trace.npy")
+            np.save(filename, trace)
+
+            chunks = list(load_chunks(filename, chunk_size=300, device=torch.device('cpu'), dtype=torch.float32))
+
+        self.assertEqual([chunk.shape[0] for chunk in chunks], [300, 300, 300, 100])
+        self.assertTrue(torch.equal(torch.cat(chunks), torch.from_numpy(trace)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+import torch
+from cloud_oracle_prototype.dummy_data import load_planes_with_savings
+from cloud_oracle_prototype.queries.simulation_query import init_query as init_simulation_query, simulation_query
+from cloud_oracle_prototype.queries.what_if_simulation_query import init_query, scale_columns, what_if_simulation_query, apply_delta
+
+LOAD_ARGS = dict(
+    num_functions = 100,
+    num_functions_other = 100,
+    num_params = 10,
+    percent_data_centers_A = 0.3,
+    percent_data_centers_B = 0.3,
+    percent_change_A = 0.5,
+    percent_change_B = 0.1,
+    dtype = torch.float32,
+)
+
+class TestWhatIfSimulationQuery(unittest.TestCase):
+
+    def test_what_if_simulation_query(self):
+        batch_size = 1000
+        device = torch.device('cpu')
+        planes, planes_other = load_planes_with_savings(device=device, **LOAD_ARGS)
+        (_, inputs) = init_simulation_query(planes=planes, planes_other=planes_other, batch_size=batch_size, num_params=LOAD_ARGS['num_params'], device=device, dtype=LOAD_ARGS['dtype'])
+
+        (costs, baseline, outputs) = init_query(planes=planes_other, inputs=inputs)
+        columns = torch.tensor([1, 4, 7])
+        deltas = scale_columns(planes=planes_other, columns=columns, scale=0.5)
+
+        results = what_if_simulation_query(costs=costs, baseline=baseline, inputs=inputs, columns=columns, deltas=deltas, outputs=outputs)
+
+        # Same percentiles as a full simulation with the changed planes
+        planes_changed = planes_other.clone()
+        planes_changed[:, columns] *= 0.5
+        expected = simulation_query(planes=planes_changed, planes_other=planes_other, inputs=inputs, outputs=torch.zeros((batch_size, 1)))
+        self.assertTrue(torch.allclose(torch.tensor(results), torch.tensor(expected)))
+
+        # Committing the change updates the base oracle
+        apply_delta(planes=planes_other, costs=costs, baseline=baseline, inputs=inputs, columns=columns, deltas=deltas)
+        self.assertTrue(torch.allclose(planes_other, planes_changed))
+        self.assertTrue(torch.allclose(costs, torch.matmul(inputs, planes_changed.t()), rtol=1e-4))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import asyncio
+import unittest
+import torch
+from cloud_oracle_prototype.batching import MinimizationBatcher
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+
+class TestMinimizationBatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.device = torch.device('cpu')
+        self.planes = load_linear_functions(num_functions=50, num_params=6, dtype=torch.float32, device=self.device, random=True)
+
+    def test_minimize(self):
+        workloads = torch.empty((20, 6)).exponential_()
+        batcher = MinimizationBatcher(planes=self.planes, max_batch_size=8, max_wait_s=0.05, device=self.device, dtype=torch.float32)
+
+        async def run():
+            await batcher.start()
+            # Warmup, which is excluded from the statistics
+            await batcher.minimize(workloads[0])
+            batcher.reset_stats()
+
+            results = await asyncio.gather(*[batcher.minimize(workload) for workload in workloads])
+            await batcher.stop()
+            return results
+
+        results = asyncio.run(run())
+
+        expected_costs, expected_indexes = torch.matmul(workloads, self.planes.t()).min(dim=1)
+        self.assertEqual([index for (index, _) in results], expected_indexes.tolist())
+        self.assertTrue(torch.allclose(torch.tensor([cost for (_, cost) in results]), expected_costs))
+
+        # Concurrent requests are coalesced into full batches
+        stats = batcher.get_stats()
+        self.assertEqual(stats["num_requests"], 20)
+        self.assertLess(stats["num_batches"], 20)
+        self.assertGreater(stats["mean_batch_size"], 1)
+        self.assertGreater(stats["throughput"], 0)
+
+    def test_failed_batch(self):
+        workloads = torch.empty((4, 6)).exponential_()
+        batcher = MinimizationBatcher(planes=self.planes, max_batch_size=8, max_wait_s=0.01, device=self.device, dtype=torch.float32)
+        execute = batcher._execute
+
+        def fail_once(batch):
+            batcher._execute = execute
+            raise RuntimeError("Failed batch")
+
+        async def run():
+            await batcher.start()
+
+            # Mis-shaped workloads are rejected before they are queued
+            with self.assertRaises(ValueError):
+                await batcher.minimize(torch.ones(5))
+
+            # A failed batch fails its requests, and the batcher keeps serving
+            batcher._execute = fail_once
+            with self.assertRaises(RuntimeError):
+                await batcher.minimize(workloads[0])
+
+            # A second failed request behind it is still served, i.e., clearing the frames of the first error did not close the batcher
+            batcher._execute = fail_once
+            with self.assertRaisesRegex(RuntimeError, "Batch failed"):
+                await asyncio.wait_for(batcher.minimize(workloads[0]), timeout=5)
+            results = await asyncio.wait_for(asyncio.gather(*[batcher.minimize(workload) for workload in workloads]), timeout=5)
+
+            await batcher.stop()
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual([index for (index, _) in results], torch.matmul(workloads, self.planes.t()).argmin(dim=1).tolist())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import torch
+from cloud_oracle_prototype.bucketing import BATCH_BUCKETS, bucket_size, pad_planes
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+from cloud_oracle_prototype.queries.minimization_query import init_query, minimization_query
+
+class TestBucketing(unittest.TestCase):
+
+    def test_bucket_size(self):
+        self.assertEqual(bucket_size(1, BATCH_BUCKETS), 1)
+        self.assertEqual(bucket_size(3, BATCH_BUCKETS), 8)
+        self.assertEqual(bucket_size(64, BATCH_BUCKETS), 64)
+        self.assertEqual(bucket_size(5000, BATCH_BUCKETS), 8192)
+        self.assertEqual(bucket_size(4950), 8192)
+        self.assertEqual(bucket_size(1), 1)
+
+    def test_padding_keeps_minimal_decisions(self):
+        batch_size = 3
+        device = torch.device('cpu')
+        planes = load_linear_functions(num_functions=45, num_params=6, dtype=torch.float16, device=device, random=True)
+
+        (outputs, outputs_index, inputs) = init_query(planes=planes, batch_size=batch_size, num_functions=45, num_params=6, device=device, dtype=torch.float16)
+        inputs.exponential_()
+        minimization_query(planes=planes, inputs=inputs, outputs=outputs, outputs_index=outputs_index)
+
+        # Padded like the experiment, where the padding decisions overflow to inf in float16 and the padding workloads are zero
+        padded_planes = pad_planes(planes, size=bucket_size(planes.shape[0]))
+        query_batch_size = bucket_size(batch_size, BATCH_BUCKETS)
+        self.assertEqual(padded_planes.shape, (64, 6))
+        self.assertEqual(query_batch_size, 8)
+
+        (padded_outputs, padded_outputs_index, padded_inputs) = init_query(planes=padded_planes, batch_size=query_batch_size, num_functions=64, num_params=6, device=device, dtype=torch.float16)
+        padded_inputs.zero_()
+        padded_inputs[:batch_size] = inputs
+        minimization_query(planes=padded_planes, inputs=padded_inputs, outputs=padded_outputs, outputs_index=padded_outputs_index)
+
+        self.assertTrue(torch.isinf(torch.matmul(inputs, padded_planes[45:].t())).all())
+        self.assertTrue(torch.equal(padded_outputs[:batch_size], outputs))
+        self.assertTrue(torch.equal(padded_outputs_index[:batch_size], outputs_index))
+
+if __name__ == '__main__':
+    unittest.main()
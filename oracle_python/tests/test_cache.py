@@ -0,0 +1,71 @@
+import unittest
+import torch
+from cloud_oracle_prototype.cache import MinimizationCache
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+from cloud_oracle_prototype.queries.minimization_query import init_query
+
+class TestMinimizationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.device = torch.device('cpu')
+        self.planes = load_linear_functions(num_functions=50, num_params=6, dtype=torch.float32, device=self.device, random=True)
+        (self.outputs, self.outputs_index, self.inputs) = init_query(planes=self.planes, batch_size=4, num_functions=50, num_params=6, device=self.device, dtype=torch.float32)
+        self.inputs.exponential_()
+
+    def test_hits_and_misses(self):
+        cache = MinimizationCache(max_size=10)
+
+        cache.query(planes=self.planes, inputs=self.inputs, outputs=self.outputs, outputs_index=self.outputs_index)
+        self.assertEqual((cache.hits, cache.misses), (0, 4))
+
+        expected_outputs, expected_indexes = torch.matmul(self.inputs, self.planes.t()).min(dim=1, keepdim=True)
+        outputs, outputs_index = cache.query(planes=self.planes, inputs=self.inputs, outputs=torch.zeros_like(self.outputs), outputs_index=torch.zeros_like(self.outputs_index))
+        self.assertEqual((cache.hits, cache.misses), (4, 4))
+        self.assertTrue(torch.allclose(outputs, expected_outputs))
+        self.assertTrue(torch.equal(outputs_index, expected_indexes))
+
+    def test_lru_eviction(self):
+        cache = MinimizationCache(max_size=2)
+
+        cache.query(planes=self.planes, inputs=self.inputs, outputs=self.outputs, outputs_index=self.outputs_index)
+        self.assertEqual(len(cache.entries), 2)
+
+        # Only the two most recently used workloads are cached
+        cache.query(planes=self.planes, inputs=self.inputs.flip(0), outputs=self.outputs, outputs_index=self.outputs_index)
+        self.assertEqual(cache.hits, 2)
+
+    def test_quantization(self):
+        cache = MinimizationCache(max_size=10, quantization=1000.0)
+
+        # All workloads fall into the same bucket
+        cache.query(planes=self.planes, inputs=self.inputs * 0.001, outputs=self.outputs, outputs_index=self.outputs_index)
+        self.assertEqual(len(cache.entries), 1)
+
+    def test_invalidation(self):
+        cache = MinimizationCache(max_size=10)
+        cache.query(planes=self.planes, inputs=self.inputs, outputs=self.outputs, outputs_index=self.outputs_index)
+
+        # Modifying the planes in place requires an explicit invalidation
+        self.planes.mul_(2)
+        cache.invalidate()
+        cache.query(planes=self.planes, inputs=self.inputs, outputs=self.outputs, outputs_index=self.outputs_index)
+        self.assertEqual((cache.hits, cache.misses), (0, 8))
+
+        # Replacing the planes invalidates the cache
+        cache.query(planes=self.planes.clone(), inputs=self.inputs, outputs=self.outputs, outputs_index=self.outputs_index)
+        self.assertEqual((cache.hits, cache.misses), (0, 12))
+
+    def test_planes_version(self):
+        cache = MinimizationCache(max_size=10)
+        cache.query(planes=self.planes, inputs=self.inputs, outputs=self.outputs, outputs_index=self.outputs_index, planes_version=0)
+        cache.query(planes=self.planes, inputs=self.inputs, outputs=self.outputs, outputs_index=self.outputs_index, planes_version=0)
+        self.assertEqual((cache.hits, cache.misses), (4, 4))
+
+        # A new version of the planes invalidates the cache
+        self.planes.mul_(2)
+        outputs, outputs_index = cache.query(planes=self.planes, inputs=self.inputs, outputs=self.outputs, outputs_index=self.outputs_index, planes_version=1)
+        self.assertEqual((cache.hits, cache.misses), (4, 8))
+        self.assertTrue(torch.allclose(outputs, torch.matmul(self.inputs, self.planes.t()).min(dim=1, keepdim=True).values))
+
+if __name__ == '__main__':
+    unittest.main()
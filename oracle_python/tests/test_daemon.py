@@ -0,0 +1,54 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+import torch
+from cloud_oracle_prototype.daemon import OracleDaemon, OracleClient
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self):
+        # Cleanups run in reverse order, also if setUp or a test fails
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.address = os.path.join(self.directory.name, "oracle.sock")
+
+        self.planes = load_linear_functions(num_functions=50, num_params=6, dtype=torch.float32, device=torch.device('cpu'), random=True)
+        self.daemon = OracleDaemon(planes=self.planes, device=torch.device('cpu'), dtype=torch.float32)
+        thread = threading.Thread(target=self.daemon.serve, args=(self.address,), daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, timeout=10)
+        self.addCleanup(self.daemon.shutdown)
+
+        # Wait for the daemon to listen on the socket
+        for _ in range(1000):
+            if os.path.exists(self.address):
+                break
+            time.sleep(0.01)
+        self.client = OracleClient(self.address)
+        self.addCleanup(self.client.close)
+
+    def test_minimize(self):
+        inputs = torch.empty((8, 6)).exponential_()
+
+        outputs, outputs_index, latency, round_trip_latency = self.client.minimize(inputs)
+
+        expected_outputs, expected_indexes = torch.matmul(inputs, self.planes.t()).min(dim=1, keepdim=True)
+        self.assertTrue(torch.allclose(outputs, expected_outputs))
+        self.assertTrue(torch.equal(outputs_index, expected_indexes))
+        self.assertGreater(latency, 0)
+        self.assertGreaterEqual(round_trip_latency, latency)
+        self.assertEqual(self.daemon.get_latency_stats()[1]["count"], 1)
+
+    def test_invalid_request(self):
+        with self.assertRaises(RuntimeError):
+            self.client.minimize(torch.ones((1, 3)))
+
+        # The connection remains usable after a failed request
+        outputs, _, _, _ = self.client.minimize(torch.ones((1, 6)))
+        self.assertEqual(outputs.shape, (1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
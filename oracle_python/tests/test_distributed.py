@@ -0,0 +1,91 @@
+import os
+import tempfile
+import threading
+import unittest
+import torch
+from cloud_oracle_prototype.daemon import OracleDaemon
+from cloud_oracle_prototype.distributed import DistributedOracle, load_oracle_shard, _find_free_port
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+from cloud_oracle_prototype.oracle_file import save_oracle
+
+class TestDistributedOracle(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.num_shards = 3
+
+        # Number of shards not dividing the number of decisions
+        self.planes = load_linear_functions(num_functions=101, num_params=6, dtype=torch.float32, device=torch.device('cpu'), random=True)
+        self.planes_other = load_linear_functions(num_functions=80, num_params=6, dtype=torch.float32, device=torch.device('cpu'), random=True)
+        filename = os.path.join(self.directory.name, "oracle.bin")
+        filename_other = os.path.join(self.directory.name, "oracle_other.bin")
+        save_oracle(filename, planes=self.planes)
+        save_oracle(filename_other, planes=self.planes_other)
+
+        # Serve every shard in a thread instead of a process on another node
+        self.daemons = []
+        addresses = []
+        offsets = []
+        for rank in range(self.num_shards):
+            planes, offset = load_oracle_shard(filename, rank=rank, num_shards=self.num_shards)
+            planes_other, _ = load_oracle_shard(filename_other, rank=rank, num_shards=self.num_shards)
+            daemon = OracleDaemon(planes=planes, planes_other=planes_other, device=torch.device('cpu'), dtype=torch.float32)
+            address = ("127.0.0.1", _find_free_port("127.0.0.1"))
+            threading.Thread(target=daemon.serve, args=(address,), daemon=True).start()
+
+            self.daemons.append(daemon)
+            addresses.append(address)
+            offsets.append(offset)
+
+        self.oracle = DistributedOracle(addresses=addresses, offsets=offsets, connect_timeout_s=10.0)
+        self.oracle.start()
+
+    def tearDown(self):
+        self.oracle.stop()
+        for daemon in self.daemons:
+            daemon.shutdown()
+        self.directory.cleanup()
+
+    def test_load_oracle_shard(self):
+        filename = os.path.join(self.directory.name, "oracle.bin")
+        shards = [load_oracle_shard(filename, rank=rank, num_shards=self.num_shards) for rank in range(self.num_shards)]
+
+        self.assertEqual([offset for (_, offset) in shards], [0, 34, 68])
+        self.assertTrue(torch.equal(torch.cat([planes for (planes, _) in shards]), self.planes))
+
+    def test_minimization_query(self):
+        inputs = torch.empty((8, 6)).exponential_()
+        outputs = torch.zeros((8, 1))
+        outputs_index = torch.zeros((8, 1), dtype=torch.int64)
+
+        self.oracle.minimization_query(inputs=inputs, outputs=outputs, outputs_index=outputs_index)
+
+        expected_outputs, expected_indexes = torch.matmul(inputs, self.planes.t()).min(dim=1, keepdim=True)
+        self.assertTrue(torch.allclose(outputs, expected_outputs))
+        self.assertTrue(torch.equal(outputs_index, expected_indexes))
+
+    def test_simulation_query(self):
+        inputs = torch.empty((100, 6)).exponential_()
+        outputs = torch.zeros((100, 1))
+
+        percentiles = self.oracle.simulation_query(inputs=inputs, outputs=outputs)
+
+        expected_outputs = torch.matmul(inputs, self.planes.t()).amin(dim=1, keepdim=True) / torch.matmul(inputs, self.planes_other.t()).amin(dim=1, keepdim=True)
+        self.assertTrue(torch.allclose(outputs, expected_outputs))
+        self.assertEqual(len(percentiles), 3)
+
+    def test_failed_query(self):
+        outputs = torch.zeros((8, 1))
+        outputs_index = torch.zeros((8, 1), dtype=torch.int64)
+
+        # Inputs of the wrong shape fail on every node
+        with self.assertRaises(RuntimeError):
+            self.oracle.minimization_query(inputs=torch.ones((8, 5)), outputs=outputs, outputs_index=outputs_index)
+
+        # The next query receives the responses of its own batch
+        inputs = torch.empty((8, 6)).exponential_()
+        self.oracle.minimization_query(inputs=inputs, outputs=outputs, outputs_index=outputs_index)
+        self.assertTrue(torch.equal(outputs_index, torch.matmul(inputs, self.planes.t()).argmin(dim=1, keepdim=True)))
+
+if __name__ == '__main__':
+    unittest.main()
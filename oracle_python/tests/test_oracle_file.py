@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+import torch
+from cloud_oracle_prototype.oracle_file import save_oracle, load_oracle, load_oracle_header
+from cloud_oracle_prototype.precomputation import enumerate_data_center_pairs
+
+class TestOracleFile(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "oracle.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save_and_load_oracle(self):
+        device = torch.device('cpu')
+        pairs = enumerate_data_center_pairs(num_data_centers=10, device=device)
+        for dtype in [torch.float16, torch.bfloat16, torch.float32]:
+            planes = torch.rand((pairs.shape[0], 7), device=device).to(dtype)
+
+            save_oracle(self.filename, planes=planes, pairs=pairs, as_planes=True, num_data_centers=10)
+            loaded_planes, loaded_pairs, header = load_oracle(self.filename)
+
+            self.assertEqual(loaded_planes.dtype, dtype)
+            self.assertTrue(torch.equal(loaded_planes, planes))
+            self.assertTrue(torch.equal(loaded_pairs, pairs))
+            self.assertTrue(header["as_planes"])
+            self.assertFalse(header["normalized"])
+            self.assertEqual(header["metadata"]["num_data_centers"], 10)
+            self.assertEqual(header["planes_offset"] % 64, 0)
+
+    def test_load_oracle_copy_on_write(self):
+        planes = torch.ones((4, 3))
+        save_oracle(self.filename, planes=planes)
+
+        loaded_planes, loaded_pairs, _ = load_oracle(self.filename)
+        self.assertIsNone(loaded_pairs)
+
+        # Modifications of a loaded oracle are not written back to the file
+        loaded_planes.zero_()
+        reloaded_planes, _, _ = load_oracle(self.filename)
+        self.assertTrue(torch.equal(reloaded_planes, planes))
+
+    def test_load_invalid_file(self):
+        with open(self.filename, "wb") as f:
+            f.write(b"not an oracle")
+
+        with self.assertRaises(ValueError):
+            load_oracle_header(self.filename)
+
+if __name__ == '__main__':
+    unittest.main()
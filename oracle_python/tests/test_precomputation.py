@@ -0,0 +1,56 @@
+import unittest
+import torch
+from cloud_oracle_prototype.dummy_data import load_latencies
+from cloud_oracle_prototype.precomputation import enumerate_data_center_pairs, apply_distance_constraint, compute_planes, find_dominated, precompute_oracle
+
+class TestPrecomputation(unittest.TestCase):
+
+    def test_apply_distance_constraint(self):
+        device = torch.device('cpu')
+        pairs = enumerate_data_center_pairs(num_data_centers=4, device=device)
+        self.assertEqual(pairs.shape, (6, 2))
+
+        # Only data centers 0 and 3 are far enough apart
+        distances = torch.zeros((4, 4), device=device)
+        distances[0, 3] = 300
+        valid_pairs = apply_distance_constraint(pairs=pairs, distances=distances, distance_constraint=200)
+        self.assertEqual(valid_pairs.tolist(), [[0, 3]])
+
+    def test_compute_planes(self):
+        device = torch.device('cpu')
+        latencies = torch.tensor([[1.0, 4.0], [2.0, 3.0]], device=device)
+        pairs = enumerate_data_center_pairs(num_data_centers=2, device=device)
+
+        planes = compute_planes(latencies=latencies, pairs=pairs, as_planes=True)
+
+        # Interleaved write (max) and read (min) latency per client data center, and zero intercept
+        self.assertEqual(planes.tolist(), [[2.0, 1.0, 4.0, 3.0, 0.0]])
+
+    def test_find_dominated(self):
+        device = torch.device('cpu')
+        planes = torch.tensor([[1.0, 1.0], [2.0, 1.0], [1.0, 1.0], [0.5, 3.0]], device=device)
+
+        # Only the second plane is dominated, identical planes do not dominate each other
+        for block_size in [1, 3, 4]:
+            is_dominated = find_dominated(planes=planes, block_size=block_size)
+            self.assertEqual(is_dominated.tolist(), [False, True, False, False])
+
+    def test_precompute_oracle(self):
+        device = torch.device('cpu')
+        num_data_centers = 10
+        latencies = load_latencies(num_data_centers=num_data_centers, num_client_data_centers=3, dtype=torch.float32, device=device, random=True)
+        distances = torch.full((num_data_centers, num_data_centers), 500.0, device=device)
+
+        planes, pairs = precompute_oracle(latencies=latencies, distances=distances, distance_constraint=200, dtype=torch.float32, block_size=7)
+        all_planes, all_pairs = precompute_oracle(latencies=latencies, distances=distances, distance_constraint=200, dtype=torch.float32, filter_dominated=False)
+
+        self.assertEqual(planes.shape, (pairs.shape[0], 6))
+        self.assertEqual(all_pairs.shape[0], 45)
+        self.assertLessEqual(pairs.shape[0], all_pairs.shape[0])
+
+        # Filtering dominated placements does not change the minimum for nonnegative workloads
+        inputs = torch.empty((64, 6), device=device).exponential_()
+        self.assertTrue(torch.allclose(torch.matmul(inputs, planes.t()).min(dim=1).values, torch.matmul(inputs, all_planes.t()).min(dim=1).values))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import torch
+from cloud_oracle_prototype.quantile_sketch import KLLSketch
+
+class TestKLLSketch(unittest.TestCase):
+
+    def test_exact_before_compaction(self):
+        sketch = KLLSketch(k=200)
+        sketch.update(torch.arange(1, 101, dtype=torch.float32))
+
+        self.assertEqual(sketch.rank_error(), 0.0)
+        self.assertEqual(sketch.quantiles([0.0, 0.5, 1.0]), [1.0, 50.0, 100.0])
+
+    def test_quantiles_within_rank_error(self):
+        num_values = 10**5
+        values = torch.rand(num_values, generator=torch.Generator().manual_seed(0))
+        sketch = KLLSketch(k=200)
+        for chunk in values.split(10**4):
+            sketch.update(chunk)
+
+        self.assertEqual(sketch.num_values, num_values)
+        self.assertLess(sketch.num_retained(), num_values // 10)
+
+        # The rank of uniform values is their value
+        quantiles = [0.025, 0.5, 0.975]
+        for quantile, value in zip(quantiles, sketch.quantiles(quantiles)):
+            self.assertLessEqual(abs(value - quantile), sketch.rank_error())
+
+    def test_merge(self):
+        values = torch.rand(2 * 10**4, generator=torch.Generator().manual_seed(0))
+        sketch = KLLSketch(k=200, seed=1)
+        sketch.update(values[:10**4])
+        other = KLLSketch(k=200, seed=2)
+        other.update(values[10**4:])
+
+        sketch.merge(other)
+
+        self.assertEqual(sketch.num_values, 2 * 10**4)
+        self.assertLessEqual(abs(sketch.quantiles([0.5])[0] - 0.5), sketch.rank_error())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import torch
+from cloud_oracle_prototype.dummy_data import load_linear_functions
+from cloud_oracle_prototype.sharding import ShardedOracle, _OP_MINIMIZE
+
+class TestShardedOracle(unittest.TestCase):
+
+    def test_minimization_query(self):
+        batch_size = 8
+        planes = load_linear_functions(num_functions=101, num_params=6, dtype=torch.float32, device=torch.device('cpu'), random=True)
+        inputs = torch.empty((batch_size, 6)).exponential_()
+        outputs = torch.zeros((batch_size, 1))
+        outputs_index = torch.zeros((batch_size, 1), dtype=torch.int64)
+
+        # Number of workers not dividing the number of decisions
+        oracle = ShardedOracle(planes=planes, num_workers=3, max_batch_size=batch_size)
+        oracle.start()
+        try:
+            oracle.minimization_query(inputs=inputs, outputs=outputs, outputs_index=outputs_index)
+        finally:
+            oracle.stop()
+
+        expected_outputs, expected_indexes = torch.matmul(inputs, planes.t()).min(dim=1, keepdim=True)
+        self.assertTrue(torch.allclose(outputs, expected_outputs))
+        self.assertTrue(torch.equal(outputs_index, expected_indexes))
+
+    def test_simulation_query(self):
+        batch_size = 100
+        planes = load_linear_functions(num_functions=50, num_params=5, dtype=torch.float32, device=torch.device('cpu'), random=True)
+        planes_other = load_linear_functions(num_functions=40, num_params=5, dtype=torch.float32, device=torch.device('cpu'), random=True)
+        inputs = torch.empty((batch_size, 5)).exponential_()
+        outputs = torch.zeros((batch_size, 1))
+
+        oracle = ShardedOracle(planes=planes, planes_other=planes_other, num_workers=4, max_batch_size=batch_size)
+        oracle.start()
+        try:
+            percentiles = oracle.simulation_query(inputs=inputs, outputs=outputs)
+        finally:
+            oracle.stop()
+
+        expected_outputs = torch.matmul(inputs, planes.t()).amin(dim=1, keepdim=True) / torch.matmul(inputs, planes_other.t()).amin(dim=1, keepdim=True)
+        self.assertTrue(torch.allclose(outputs, expected_outputs))
+        self.assertEqual(len(percentiles), 3)
+        self.assertLessEqual(percentiles[0], percentiles[1])
+        self.assertLessEqual(percentiles[1], percentiles[2])
+
+    def test_failed_query(self):
+        batch_size = 4
+        planes = load_linear_functions(num_functions=20, num_params=4, dtype=torch.float32, device=torch.device('cpu'), random=True)
+        inputs = torch.empty((batch_size, 4)).exponential_()
+        outputs = torch.zeros((batch_size, 1))
+        outputs_index = torch.zeros((batch_size, 1), dtype=torch.int64)
+
+        oracle = ShardedOracle(planes=planes, num_workers=2, max_batch_size=batch_size)
+        oracle.start()
+        self.addCleanup(oracle.stop)
+
+        # An error on the workers is re-raised and the next query gets the replies of its own batch
+        with self.assertRaises(RuntimeError):
+            oracle._execute(-1, inputs)
+        oracle.minimization_query(inputs=inputs, outputs=outputs, outputs_index=outputs_index)
+        self.assertTrue(torch.equal(outputs_index, torch.matmul(inputs, planes.t()).argmin(dim=1, keepdim=True)))
+
+        # A worker that exited raises instead of blocking
+        oracle.workers[0].terminate()
+        oracle.workers[0].join()
+        with self.assertRaises(RuntimeError):
+            oracle._execute(_OP_MINIMIZE, inputs)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+import numpy as np
+import torch
+from cloud_oracle_prototype.traces import iter_trace, load_trace
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+class TestTraces(unittest.TestCase):
+
+    def setUp(self):
+        # Interleaved write and read frequencies of 3 client data centers
+        self.frequencies = np.random.default_rng(0).random((1000, 6), dtype=np.float32)
+        self.expected = torch.cat([torch.from_numpy(self.frequencies), torch.ones((1000, 1))], dim=1)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_npy(self):
+        filename = os.path.join(self.directory.name, "trace.npy")
+        np.save(filename, self.frequencies)
+
+        chunks = list(iter_trace(filename, chunk_size=300, device=torch.device('cpu'), dtype=torch.float32))
+        self.assertEqual([chunk.shape[0] for chunk in chunks], [300, 300, 300, 100])
+        self.assertTrue(torch.equal(torch.cat(chunks), self.expected))
+
+        # A trace in the layout of the inputs is loaded without copying
+        np.save(filename, self.expected.numpy())
+        inputs = load_trace(filename, device=torch.device('cpu'), dtype=torch.float32, num_samples=100)
+        self.assertTrue(torch.equal(inputs, self.expected[:100]))
+
+    def test_empty(self):
+        filename = os.path.join(self.directory.name, "trace.npy")
+        np.save(filename, np.empty((0, 6), dtype=np.float32))
+
+        with self.assertRaisesRegex(ValueError, "no samples"):
+            load_trace(filename, device=torch.device('cpu'), dtype=torch.float32)
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_arrow_and_parquet(self):
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+
+        names = [f"{kind}_{client}" for client in range(3) for kind in ["write", "read"]]
+        table = pyarrow.table({name: self.frequencies[:, index] for (index, name) in enumerate(names)})
+
+        arrow_filename = os.path.join(self.directory.name, "trace.arrow")
+        with pyarrow.ipc.new_file(arrow_filename, table.schema) as writer:
+            writer.write_table(table)
+        parquet_filename = os.path.join(self.directory.name, "trace.parquet")
+        pyarrow.parquet.write_table(table, parquet_filename)
+
+        for filename in [arrow_filename, parquet_filename]:
+            inputs = torch.cat(list(iter_trace(filename, chunk_size=300, device=torch.device('cpu'), dtype=torch.float32)))
+            self.assertTrue(torch.equal(inputs, self.expected))
+
+            # Columns are selected by name in the layout of the inputs
+            inputs = load_trace(filename, device=torch.device('cpu'), dtype=torch.float32, columns=names[:2])
+            self.assertTrue(torch.equal(inputs, self.expected[:, [0, 1, 6]]))
+
+        # Parquet batches end at row groups, s.t., the samples span several batches
+        pyarrow.parquet.write_table(table, parquet_filename, row_group_size=150)
+        inputs = load_trace(parquet_filename, device=torch.device('cpu'), dtype=torch.float32, num_samples=400)
+        self.assertTrue(torch.equal(inputs, self.expected[:400]))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            next(iter_trace("trace.csv", chunk_size=10, device=torch.device('cpu'), dtype=torch.float32))
+
+if __name__ == '__main__':
+    unittest.main()